@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the ArXiv API that serves synthetic Atom feed pages.
+
+Run it, then point the collector at it:
+
+    python scripts/benchmarks/arxiv_standin_server.py --port 8765 &
+    python scripts/data_collection_arxiv.py --base-url http://127.0.0.1:8765/api/query \
+        --rate 50 --burst 10 --workers 8 --out-dir /tmp/arxiv_raw
+"""
+import argparse
+import hashlib
+import itertools
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+LATEST = datetime(2025, 12, 31)
+WINDOW_PATTERN = re.compile(r"^\((.*)\) AND submittedDate:\[(\d{12}) TO (\d{12})\]$")
+
+
+def published_at(index: int) -> datetime:
+    return LATEST - timedelta(days=index)
+
+
+def matching_indices(search_query: str, papers_per_query: int) -> tuple[str, list[int]]:
+    """Apply an optional submittedDate window; index 0 is the newest paper."""
+    match = WINDOW_PATTERN.match(search_query)
+    if not match:
+        return search_query, list(range(papers_per_query))
+    query, lo, hi = match.groups()
+    lo_dt, hi_dt = datetime.strptime(lo, "%Y%m%d%H%M"), datetime.strptime(hi, "%Y%m%d%H%M")
+    return query, [i for i in range(papers_per_query) if lo_dt <= published_at(i) <= hi_dt]
+
+
+def synthetic_entry(query: str, index: int) -> str:
+    published = published_at(index)
+    digest = int(hashlib.sha1(f"{query}:{published:%Y%m%d}".encode()).hexdigest(), 16)
+    # Roughly 1 in 5 results overlaps with another query to exercise deduplication.
+    paper = digest % 5000 if digest % 5 == 0 else digest % 10**7
+    arxiv_id = f"{published:%y%m}.{paper % 100000:05d}v{1 + digest % 2}"
+    words = " ".join(f"term{(digest >> s) % 997}" for s in range(0, 120, 4))
+    return f"""
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}</id>
+    <published>{published:%Y-%m-%dT%H:%M:%SZ}</published>
+    <title>Synthetic paper {published:%Y-%m-%d} for {escape(query)}</title>
+    <summary>{escape(query)} {words}</summary>
+    <author><name>A. Author</name></author>
+    <author><name>B. Author</name></author>
+    <arxiv:primary_category term="astro-ph.EP" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="astro-ph.EP" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="q-bio.PE" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>"""
+
+
+def make_handler(papers_per_query: int, latency: float, fail_rate: float, fail_after: int | None):
+    counter = itertools.count(1)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            time.sleep(latency)
+            if random.random() < fail_rate or (fail_after is not None and next(counter) > fail_after):
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            params = parse_qs(urlparse(self.path).query)
+            query, indices = matching_indices(params.get("search_query", [""])[0], papers_per_query)
+            start = int(params.get("start", ["0"])[0])
+            size = int(params.get("max_results", ["100"])[0])
+            entries = "".join(synthetic_entry(query, i) for i in indices[start : start + size])
+            body = f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>{len(indices)}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>
+  <opensearch:itemsPerPage>{size}</opensearch:itemsPerPage>{entries}
+</feed>""".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--papers-per-query", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Artificial response latency in seconds.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503.")
+    parser.add_argument("--fail-after", type=int, default=None, help="Answer every request after the first N with HTTP 503.")
+    parser.add_argument("--latest", default="2025-12-31", help="Submission date of the newest synthetic paper.")
+    args = parser.parse_args()
+
+    global LATEST
+    LATEST = datetime.fromisoformat(args.latest)
+
+    handler = make_handler(args.papers_per_query, args.latency, args.fail_rate, args.fail_after)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Serving synthetic ArXiv feed on http://127.0.0.1:{args.port}/api/query")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-row category filtering against the vectorized CategoryMatrix engine.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from utils.category_utils import ASTRO_CATEGORIES, CS_CATEGORIES, category_flags  # noqa: E402
+
+
+POOL = [
+    "astro-ph.EP", "astro-ph.SR", "astro-ph.GA", "astro-ph.IM", "astro-ph.CO", "astro-ph.HE",
+    "physics.bio-ph", "q-bio.PE", "q-bio.BM", "physics.geo-ph", "physics.space-ph", "physics.ao-ph",
+    "cs.LG", "cs.CV", "cs.AI", "cs.CL", "stat.ML", "cs.NE", "cs.IR", "cs.RO", "gr-qc", "hep-ph",
+    "cond-mat.soft", "physics.chem-ph", "math.DS", "nlin.AO",
+]
+
+
+def legacy_flags(categories: pd.Series) -> pd.DataFrame:
+    """The original DataFrame.apply implementations, kept here as the baseline."""
+
+    def has_cs_primary(categories_str: str) -> bool:
+        cats = str(categories_str).split()
+        primary = cats[0] if cats else ""
+        return any(tag in primary for tag in CS_CATEGORIES)
+
+    def has_astro_secondary(categories_str: str) -> bool:
+        cats = str(categories_str).split()
+        return any(any(astro in c for astro in ASTRO_CATEGORIES) for c in cats)
+
+    def has_astro_category(categories_str: str) -> bool:
+        cats = str(categories_str).split()
+        return any(c.startswith("astro-ph") or c == "physics.space-ph" for c in cats)
+
+    return pd.DataFrame(
+        {
+            "is_cs_primary": categories.apply(has_cs_primary),
+            "has_astro_secondary": categories.apply(has_astro_secondary),
+            "is_astro_related": categories.apply(has_astro_category),
+        }
+    )
+
+
+def synthetic_categories(rows: int, seed: int) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    combos = []
+    for _ in range(5000):
+        k = rng.integers(1, 5)
+        combos.append(" ".join(rng.choice(POOL, size=k, replace=False)))
+    combos.append("")
+    return pd.Series(np.array(combos, dtype=object)[rng.integers(0, len(combos), size=rows)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    categories = synthetic_categories(args.rows, args.seed)
+
+    t0 = time.perf_counter()
+    expected = legacy_flags(categories)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    flags = category_flags(categories)
+    engine_s = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(flags, expected, check_dtype=False)
+    print(f"Rows: {args.rows:,}")
+    print(f"Per-row apply:    {legacy_s:8.3f}s")
+    print(f"CategoryMatrix:   {engine_s:8.3f}s")
+    print(f"Speedup:          {legacy_s / engine_s:8.1f}x (results identical)")
+
+
+if __name__ == "__main__":
+    main()
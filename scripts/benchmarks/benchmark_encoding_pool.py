@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark sentence-embedding throughput (docs/sec): the single-process, corpus-order
+baseline (batch_size=32) against the length-bucketed EncodingPool over a grid of
+worker counts and token budgets. Embeddings are checked against the baseline.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.encoding_pool import EncodingPool, load_sentence_transformer  # noqa: E402
+
+
+def benchmark_texts(docs: int, seed: int) -> list[str]:
+    """
+    `docs` texts from the processed data (or the sample). Small datasets are expanded
+    into word spans of realistic, varied abstract lengths (20-300 words).
+    """
+    texts = load_main_or_sample(columns=["text"])["text"].astype(str).tolist()
+    rng = np.random.default_rng(seed)
+    if len(texts) >= docs:
+        return [texts[i] for i in rng.choice(len(texts), size=docs, replace=False)]
+    words = " ".join(texts).split()
+    out = []
+    for n in rng.integers(20, 300, size=docs):
+        start = int(rng.integers(0, len(words)))
+        out.append(" ".join(words[(start + k) % len(words)] for k in range(n)))
+    return out
+
+
+def min_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float(np.sum(a * b, axis=1).min())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--token-budgets", type=int, nargs="+", default=[4096, 8192, 16384])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="Optional JSON report path.")
+    args = parser.parse_args()
+
+    texts = benchmark_texts(args.docs, args.seed)
+    print(f"Documents: {len(texts):,}")
+
+    model = load_sentence_transformer(args.model)
+    model.encode(texts[:8], batch_size=8)
+    t0 = time.perf_counter()
+    baseline = model.encode(texts, batch_size=32, convert_to_numpy=True)
+    baseline_s = time.perf_counter() - t0
+    del model
+    rows = [{"config": "baseline", "workers": 1, "token_budget": None, "seconds": baseline_s, "min_cosine": 1.0}]
+    print(f"{'config':<28}{'seconds':>9}{'docs/s':>9}{'speedup':>9}{'min cos':>10}")
+    print(f"{'single process, bs=32':<28}{baseline_s:>9.2f}{len(texts) / baseline_s:>9.1f}{1.0:>9.2f}{1.0:>10.6f}")
+
+    for workers in args.workers:
+        for budget in args.token_budgets:
+            with EncodingPool(args.model, workers=workers, token_budget=budget) as pool:
+                pool.encode(texts[: 8 * workers])  # start workers and load replicas outside the timing
+                t0 = time.perf_counter()
+                vectors = pool.encode(texts)
+                seconds = time.perf_counter() - t0
+            cos = min_cosine(baseline, vectors)
+            label = f"pool w={workers}, budget={budget}"
+            print(f"{label:<28}{seconds:>9.2f}{len(texts) / seconds:>9.1f}{baseline_s / seconds:>9.2f}{cos:>10.6f}")
+            rows.append(
+                {"config": "pool", "workers": workers, "token_budget": budget, "seconds": seconds, "min_cosine": cos}
+            )
+
+    for row in rows:
+        row["docs_per_second"] = len(texts) / row["seconds"]
+        row["speedup"] = baseline_s / row["seconds"]
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        with args.out.open("w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "documents": len(texts), "runs": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
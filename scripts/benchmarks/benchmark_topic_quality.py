@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the topic-quality metrics in utils.topic_quality on a synthetic, memory-mapped
+float16 embedding snapshot: wall time of the blocked dispersion pass and of the sampled
+silhouette, and the silhouette's largest deviation from sklearn on a small subsample.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from utils.embedding_matrix import EmbeddingMatrix  # noqa: E402
+from utils.topic_quality import dispersion, silhouette_sample, silhouette_scores  # noqa: E402
+
+
+def write_synthetic(path: Path, rows: int, dim: int, topics: int, seed: int, block: int = 100_000) -> np.ndarray:
+    """Gaussian topic clusters written block by block to a float16 .npy; returns labels (10% outliers)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, rows)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float16, shape=(rows, dim))
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        out[start : start + n] = centers[labels[start : start + n]] + rng.normal(scale=1.5, size=(n, dim))
+    out.flush()
+    del out
+    labels[rng.random(rows) < 0.1] = -1
+    return labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=23)
+    parser.add_argument("--sample-size", type=int, default=10000)
+    parser.add_argument("--check-rows", type=int, default=2000, help="Subsample compared with sklearn (0 skips).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "embeddings.npy"
+        t0 = time.perf_counter()
+        labels = write_synthetic(path, args.rows, args.dim, args.topics, args.seed)
+        print(f"Synthetic snapshot: {args.rows:,} x {args.dim} float16 in {time.perf_counter() - t0:.1f}s")
+        embeddings = EmbeddingMatrix(path)
+        topic_ids = sorted(set(labels.tolist()) - {-1})
+
+        t0 = time.perf_counter()
+        table = dispersion(embeddings, labels, topic_ids)
+        print(f"dispersion: {time.perf_counter() - t0:.1f}s (mean {table['dispersion_mean'].mean():.3f})")
+
+        t0 = time.perf_counter()
+        sample = silhouette_sample(labels, topic_ids, args.sample_size)
+        scores = silhouette_scores(embeddings[sample], labels[sample])
+        print(f"silhouette: {time.perf_counter() - t0:.1f}s over {len(sample):,} papers (mean {scores.mean():.3f})")
+
+        if args.check_rows:
+            from sklearn.metrics import silhouette_samples
+
+            check = sample[: args.check_rows]
+            ours = silhouette_scores(embeddings[check], labels[check])
+            ref = silhouette_samples(embeddings[check], labels[check], metric="cosine")
+            print(f"max |silhouette - sklearn| on {len(check):,} papers: {np.abs(ours - ref).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark exact blocked search against IVF search in utils.vector_index on synthetic,
+clustered embeddings: build time, query throughput and recall@k relative to exact search.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from utils.vector_index import VectorIndex  # noqa: E402
+
+
+def synthetic_embeddings(rows: int, dim: int, clusters: int, seed: int, block: int = 100_000) -> np.ndarray:
+    """Gaussian clusters around random directions, generated block by block as float16."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    out = np.empty((rows, dim), dtype=np.float16)
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        out[start : start + n] = centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.8, size=(n, dim))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default: 4*sqrt(rows)).")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = synthetic_embeddings(args.rows, args.dim, args.clusters, args.seed)
+    ids = [f"doc-{i}" for i in range(args.rows)]
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.choice(args.rows, size=args.queries, replace=False)].astype(np.float32)
+    queries += rng.normal(scale=0.1, size=queries.shape).astype(np.float32)
+    print(f"Rows: {args.rows:,} x {args.dim} (float16), queries: {args.queries:,}, k={args.k}")
+
+    t0 = time.perf_counter()
+    exact = VectorIndex.build(vectors, ids)
+    print(f"Exact build:  {time.perf_counter() - t0:8.2f}s")
+    nlist = args.nlist or int(4 * args.rows**0.5)
+    t0 = time.perf_counter()
+    ivf = VectorIndex.build(vectors, ids, nlist=nlist)
+    print(f"IVF build:    {time.perf_counter() - t0:8.2f}s (nlist={nlist})")
+    del vectors
+
+    t0 = time.perf_counter()
+    truth, _ = exact.search(queries, k=args.k)
+    exact_s = time.perf_counter() - t0
+    print(f"\n{'mode':<16}{'seconds':>9}{'queries/s':>11}{'recall@' + str(args.k):>11}")
+    print(f"{'exact':<16}{exact_s:>9.3f}{args.queries / exact_s:>11.1f}{1.0:>11.3f}")
+    for nprobe in args.nprobe:
+        t0 = time.perf_counter()
+        found, _ = ivf.search(queries, k=args.k, nprobe=nprobe)
+        seconds = time.perf_counter() - t0
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(truth, found)])
+        print(f"{'ivf nprobe=' + str(nprobe):<16}{seconds:>9.3f}{args.queries / seconds:>11.1f}{recall:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
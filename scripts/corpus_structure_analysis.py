@@ -2,27 +2,27 @@
 """
 Compute clustered/unclustered and astrobiology-relevance corpus structure.
 """
+import sys
 from pathlib import Path
 
 import pandas as pd
 
 
-def has_astro_category(categories_str: str) -> bool:
-    categories = str(categories_str).split()
-    return any(c.startswith("astro-ph") or c == "physics.space-ph" for c in categories)
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.category_utils import category_flags  # noqa: E402
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.storage_utils import read_table, write_table  # noqa: E402
 
 
 def main() -> None:
     root = Path(__file__).resolve().parents[1]
-    doc_topics = pd.read_csv(root / "results" / "topics" / "document_topics.csv")
-    papers_path = root / "data" / "processed" / "preprocessed_papers.csv"
-    if not papers_path.exists():
-        papers_path = root / "data" / "sample_data.csv"
-    papers = pd.read_csv(papers_path)
+    doc_topics = read_table(root / "results" / "topics" / "document_topics.parquet", columns=["arxiv_id", "topic"])
+    papers = load_main_or_sample(columns=["arxiv_id", "categories"])
 
     df = papers.merge(doc_topics[["arxiv_id", "topic"]], on="arxiv_id", how="inner")
     df["is_clustered"] = df["topic"] != -1
-    df["is_astro_related"] = df["categories"].apply(has_astro_category)
+    df["is_astro_related"] = category_flags(df["categories"])["is_astro_related"]
 
     total = len(df)
     summary = pd.DataFrame(
@@ -46,8 +46,7 @@ def main() -> None:
     summary["Percentage of Total"] = (summary["Count"] / total * 100).round(1).astype(str) + "%"
 
     out_dir = root / "results" / "validation"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    summary.to_csv(out_dir / "corpus_structure_numbers.csv", index=False)
+    write_table(summary, out_dir / "corpus_structure_numbers.parquet")
     print(f"Saved corpus structure summary to {out_dir}.")
 
 
@@ -1,15 +1,37 @@
 #!/usr/bin/env python3
 """
 Collect astrobiology-related metadata from the ArXiv API.
+
+Queries and result pages are fetched concurrently behind one shared
+token-bucket rate limiter (default: one request every 3 seconds).
+Records are streamed into size-bounded CSV shards (data/raw/shards/) and
+progress is checkpointed per query whenever a shard is committed, so an
+interrupted run resumes where it stopped; --incremental only fetches
+papers submitted since the last completed run.
 """
+import argparse
 import json
-import time
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
-import arxiv
 import pandas as pd
 
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.harvest_utils import (  # noqa: E402
+    ARXIV_API_URL,
+    ARXIV_EPOCH,
+    ArxivHarvester,
+    load_checkpoints,
+    save_checkpoints,
+    windowed_query,
+)
+from utils.id_index import ArxivIdIndex  # noqa: E402
+from utils.shard_utils import ShardWriter, has_shards, iter_shards, shard_signature  # noqa: E402
+
+
 QUERIES = {
     "astrobiology": {"goal": "All", "rationale": "Core astrobiology term"},
     "biosignature": {"goal": "Goal 7", "rationale": "Life signatures"},
@@ -32,61 +54,183 @@ QUERIES = {
 }
 
 
+def entry_to_record(entry: dict, query_text: str, goal: str) -> dict:
+    published = entry["published"][:10]
+    return {
+        "arxiv_id": entry["entry_id"].split("/")[-1],
+        "title": entry["title"],
+        "abstract": entry["summary"],
+        "authors": ", ".join(entry["authors"]),
+        "published_date": published,
+        "year": int(published[:4]) if published else None,
+        "primary_category": entry["primary_category"],
+        "categories": " ".join(entry["categories"]),
+        "source_query": query_text,
+        "nasa_goal": goal,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=ARXIV_API_URL, help="ArXiv API endpoint (or a local stand-in server).")
+    parser.add_argument("--page-size", type=int, default=100, help="Results requested per API page.")
+    parser.add_argument("--max-results", type=int, default=10000, help="Maximum results per query.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent page fetches.")
+    parser.add_argument("--rate", type=float, default=1 / 3, help="Shared request budget in requests/second.")
+    parser.add_argument("--burst", type=float, default=1.0, help="Token-bucket capacity.")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per page before giving up.")
+    parser.add_argument("--backoff", type=float, default=3.0, help="Base backoff in seconds (doubles per retry).")
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "data" / "raw", help="Output folder for raw files.")
+    parser.add_argument("--shard-rows", type=int, default=50000, help="Maximum rows per raw shard.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch papers submitted since each query's checkpoint and append them to the raw store.",
+    )
+    return parser.parse_args()
+
+
+def plan_run(checkpoints: dict, incremental: bool) -> tuple[dict, bool]:
+    """
+    Return (per-query checkpoints for this run, resuming).
+    An unfinished previous run is always resumed with its original date windows.
+    """
+    previous = checkpoints.get("queries", {})
+    resuming = any(not cp.get("complete", True) for cp in previous.values())
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    planned = {}
+    for query_text in QUERIES:
+        prev = previous.get(query_text, {})
+        if resuming and prev:
+            planned[query_text] = prev
+            continue
+        last = prev.get("last_submitted") if incremental else None
+        planned[query_text] = {
+            "window_start": last or ARXIV_EPOCH.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "window_end": now,
+            "next_start": 0,
+            "complete": False,
+            "last_submitted": last,
+            "window_latest": last,
+            "total_found": 0,
+            "new_papers": 0,
+        }
+    return planned, resuming
+
+
+def migrate_legacy_csv(legacy_csv: Path, writer: ShardWriter) -> None:
+    """Copy a single-file raw CSV from older runs into the shard store."""
+    for chunk in pd.read_csv(legacy_csv, chunksize=writer.max_rows):
+        writer.add(chunk.to_dict("records"))
+    writer.flush()
+
+
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
-    raw_dir = root / "data" / "raw"
+    args = parse_args()
+    raw_dir = args.out_dir
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    all_papers = []
-    seen_ids = set()
-    query_stats = {}
+    harvester = ArxivHarvester(
+        base_url=args.base_url,
+        page_size=args.page_size,
+        max_results=args.max_results,
+        rate=args.rate,
+        burst=args.burst,
+        max_workers=args.workers,
+        max_retries=args.max_retries,
+        backoff=args.backoff,
+    )
 
-    for query_text, query_info in QUERIES.items():
-        search = arxiv.Search(
-            query=query_text,
-            max_results=10000,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-        )
+    shard_dir = raw_dir / "shards"
+    legacy_csv = raw_dir / "arxiv_astrobiology_raw.csv"
+    checkpoint_path = raw_dir / "checkpoints.json"
+    checkpoints = load_checkpoints(checkpoint_path)
+    plan, resuming = plan_run(checkpoints, args.incremental)
 
-        total_found = 0
-        new_found = 0
-
-        for result in search.results():
-            total_found += 1
-            arxiv_id = result.entry_id.split("/")[-1]
-            if arxiv_id in seen_ids:
-                continue
-
-            all_papers.append(
-                {
-                    "arxiv_id": arxiv_id,
-                    "title": result.title,
-                    "abstract": result.summary,
-                    "authors": ", ".join([a.name for a in result.authors]),
-                    "published_date": result.published.strftime("%Y-%m-%d"),
-                    "year": result.published.year,
-                    "primary_category": result.primary_category,
-                    "categories": " ".join(result.categories),
-                    "source_query": query_text,
-                    "nasa_goal": query_info["goal"],
-                }
-            )
-            seen_ids.add(arxiv_id)
-            new_found += 1
-
-        query_stats[query_text] = {
-            "total_found": total_found,
-            "new_papers": new_found,
-            "goal": query_info["goal"],
-        }
-        time.sleep(3)
+    store_exists = has_shards(shard_dir)
+    index_path = raw_dir / "arxiv_ids.sqlite"
+    index_exists = index_path.exists()
+    writer = ShardWriter(shard_dir, max_rows=args.shard_rows)
+    id_index = ArxivIdIndex(index_path)
+    if not resuming and not args.incremental:
+        writer.reset()
+        id_index.clear()
+    else:
+        if not store_exists and legacy_csv.exists():
+            migrate_legacy_csv(legacy_csv, writer)
+        if not index_exists or not len(id_index):
+            for shard in iter_shards(shard_dir, columns=["arxiv_id"]):
+                id_index.add_many(shard["arxiv_id"])
+            id_index.set_meta("raw_store", shard_signature(shard_dir))
+            id_index.commit()
+    mode = checkpoints.get("mode", "full") if resuming else ("incremental" if args.incremental else "full")
+    checkpoints = {"mode": mode, "queries": plan}
+    save_checkpoints(checkpoint_path, checkpoints)
+
+    pending = {q: cp for q, cp in plan.items() if not cp["complete"]}
+    searches = {q: windowed_query(q, cp["window_start"], cp["window_end"]) for q, cp in pending.items()}
+    offsets = {q: cp["next_start"] for q, cp in pending.items()}
+    collected = 0
 
-    df = pd.DataFrame(all_papers)
-    df.to_csv(raw_dir / "arxiv_astrobiology_raw.csv", index=False)
+    try:
+        for query_text, start, total, entries in harvester.iter_pages(searches, offsets):
+            page = {}
+            for entry in entries:
+                record = entry_to_record(entry, query_text, QUERIES[query_text]["goal"])
+                # Skips known papers and older versions; a newer version of a known paper is kept.
+                if record["arxiv_id"] not in page and id_index.is_new(record["arxiv_id"]):
+                    page[record["arxiv_id"]] = record
 
+            # Checkpoints and the ID index only advance once their pages are in a committed shard.
+            if writer.would_overflow(len(page)):
+                writer.flush()
+                id_index.set_meta("raw_store", shard_signature(shard_dir))
+                id_index.commit()
+                save_checkpoints(checkpoint_path, checkpoints)
+            writer.add(list(page.values()))
+            id_index.add_many(page)
+            collected += len(page)
+
+            cp = plan[query_text]
+            cp["total_found"] += len(entries)
+            cp["new_papers"] += len(page)
+            published = [e["published"] for e in entries if e["published"]]
+            cp["window_latest"] = max(published + [cp.get("window_latest") or cp.get("last_submitted") or ""]) or None
+            cp["next_start"] = start + len(entries)
+            if cp["next_start"] >= min(total, args.max_results):
+                cp["complete"] = True
+                cp["last_submitted"] = cp["window_latest"]
+
+        writer.flush()
+        id_index.set_meta("raw_store", shard_signature(shard_dir))
+        id_index.commit()
+        save_checkpoints(checkpoint_path, checkpoints)
+    finally:
+        harvester.close()
+        id_index.close()
+
+    query_stats = {
+        q: {"total_found": cp["total_found"], "new_papers": cp["new_papers"], "goal": QUERIES[q]["goal"]}
+        for q, cp in plan.items()
+    }
     with (raw_dir / "query_statistics.json").open("w", encoding="utf-8") as f:
         json.dump(query_stats, f, indent=2)
 
+    report = harvester.stats.report()
+    report.update(
+        {
+            "mode": mode,
+            "resumed": resuming,
+            "new_papers": collected,
+            "page_size": args.page_size,
+            "workers": args.workers,
+            "rate_limit": args.rate,
+        }
+    )
+    with (raw_dir / "harvest_report.json").open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
     query_mapping = []
     for query, info in QUERIES.items():
         query_mapping.append(
@@ -100,7 +244,11 @@ def main() -> None:
         )
     pd.DataFrame(query_mapping).to_csv(raw_dir / "query_mapping.csv", index=False)
 
-    print(f"Collected {len(df):,} unique papers.")
+    print(f"Collected {collected:,} new papers ({writer.total_rows:,} rows in {len(writer.manifest['shards'])} shards).")
+    print(
+        f"Harvest: {report['requests']} requests in {report['elapsed_seconds']:.1f}s "
+        f"({report['requests_per_second']:.2f} req/s, {report['retries']} retries)."
+    )
     print(f"Saved raw data to {raw_dir}.")
 
 
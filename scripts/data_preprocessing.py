@@ -1,41 +1,173 @@
 #!/usr/bin/env python3
 """
 Preprocess raw ArXiv metadata and apply multi-category filtering.
+
+The raw store is streamed in fixed-size chunks (--chunk-size), so peak memory
+is bounded by the chunk size rather than the corpus size. Filtering counts are
+accumulated across chunks and the output is appended chunk by chunk.
+
+Near-duplicate texts (cross-lists, replacements, journal twins) are removed with
+MinHash signatures and LSH banding; removed papers and the representative kept
+for each are written to duplicate_groups.parquet.
 """
+import argparse
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import pandas as pd
 
 
-CS_CATEGORIES = ["cs.LG", "cs.CV", "cs.RO", "stat.ML", "cs.CL", "cs.AI", "cs.NE", "cs.IR"]
-ASTRO_CATEGORIES = ["astro-ph", "physics.bio-ph", "q-bio", "physics.geo-ph", "physics.space-ph"]
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.category_utils import category_flags  # noqa: E402
+from utils.data_utils import iter_raw_frames, raw_store_signature  # noqa: E402
+from utils.dedup_utils import NearDuplicateFilter  # noqa: E402
+from utils.id_index import ArxivIdIndex, keep_latest_versions, split_arxiv_ids  # noqa: E402
+from utils.path_utils import duplicate_groups_path, id_index_path, processed_data_path  # noqa: E402
+from utils.storage_utils import TableWriter, write_table  # noqa: E402
+
+
+FILTER_STEPS = [
+    ("1", "Remove missing title/abstract"),
+    ("2", "Remove duplicate ArXiv IDs and superseded versions"),
+    ("3", "Filter pure CS/ML papers without astro relevance"),
+    ("4", "Remove invalid dates"),
+    ("5", "Remove very short documents"),
+    ("6", "Remove near-duplicate texts (MinHash/LSH)"),
+]
+
+
+def open_id_index(path: Path, raw_store: dict, chunk_size: int) -> ArxivIdIndex:
+    """
+    The ID index of the raw store. The collector's index is used when it is non-empty and
+    covers `raw_store`; otherwise it is rebuilt from the store (ID column only) into a
+    temporary file that replaces `path` only once the build is complete.
+    """
+    if path.exists():
+        id_index = ArxivIdIndex(path)
+        if len(id_index) and id_index.get_meta("raw_store") == raw_store:
+            return id_index
+        id_index.close()
+
+    tmp = path.with_name(path.name + ".tmp")
+    for stale in (tmp, tmp.with_name(tmp.name + "-wal"), tmp.with_name(tmp.name + "-shm")):
+        stale.unlink(missing_ok=True)
+    with ArxivIdIndex(tmp) as id_index:
+        for chunk in iter_raw_frames(columns=["arxiv_id"], chunksize=chunk_size):
+            id_index.add_many(chunk["arxiv_id"])
+        id_index.set_meta("raw_store", raw_store)
+        id_index.commit()
+    os.replace(tmp, path)
+    return ArxivIdIndex(path)
+
+
+def filter_chunk(
+    df: pd.DataFrame, id_index: ArxivIdIndex, emitted: set, near_dups: NearDuplicateFilter | None
+) -> tuple[pd.DataFrame, list[int]]:
+    """
+    Apply the filtering steps to one chunk.
+    Returns the filtered chunk and its row count before step 1 and after each step.
+    `emitted` holds base IDs already written by earlier chunks; `near_dups` carries
+    the LSH index across chunks (None disables step 6).
+    """
+    sizes = [len(df)]
 
+    df = df.dropna(subset=["title", "abstract"])
+    sizes.append(len(df))
 
-def has_cs_primary(categories_str: str) -> bool:
-    categories = str(categories_str).split()
-    primary = categories[0] if categories else ""
-    return any(tag in primary for tag in CS_CATEGORIES)
+    df = keep_latest_versions(df, id_index)
+    base, _ = split_arxiv_ids(df["arxiv_id"])
+    fresh = ~base.isin(emitted)
+    df = df[fresh]
+    emitted.update(base[fresh])
+    sizes.append(len(df))
 
+    flags = category_flags(df["categories"])
+    df = df[~(flags["is_cs_primary"] & ~flags["has_astro_secondary"])].copy()
+    sizes.append(len(df))
 
-def has_astro_secondary(categories_str: str) -> bool:
-    categories = str(categories_str).split()
-    return any(any(astro in c for astro in ASTRO_CATEGORIES) for c in categories)
+    df["published_date"] = pd.to_datetime(df["published_date"], errors="coerce")
+    df = df.dropna(subset=["published_date"])
+    df["year"] = df["published_date"].dt.year.astype(int)
+    sizes.append(len(df))
+
+    df["text"] = df["title"].fillna("") + " " + df["abstract"].fillna("")
+    df["text_word_count"] = df["text"].str.split().str.len()
+    df = df[df["text_word_count"] >= 20]
+    sizes.append(len(df))
+
+    if near_dups is not None:
+        df = near_dups.filter(df)
+    sizes.append(len(df))
+    return df, sizes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Raw rows processed per chunk.")
+    parser.add_argument(
+        "--near-dup-threshold",
+        type=float,
+        default=0.8,
+        help="Estimated Jaccard similarity of word 3-grams at which texts are near-duplicates (0 disables).",
+    )
+    parser.add_argument("--num-perm", type=int, default=128, help="MinHash permutations per signature.")
+    parser.add_argument("--bands", type=int, default=16, help="LSH bands (num-perm must be divisible by bands).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for MinHash signatures.")
+    return parser.parse_args()
 
 
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
-    raw_path = root / "data" / "raw" / "arxiv_astrobiology_raw.csv"
-    processed_dir = root / "data" / "processed"
+    args = parse_args()
+    processed_dir = processed_data_path().parent
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    if not raw_path.exists():
-        raise FileNotFoundError(f"Missing input file: {raw_path}")
+    id_index = open_id_index(id_index_path(), raw_store_signature(), args.chunk_size)
+
+    step_before = [0] * len(FILTER_STEPS)
+    step_after = [0] * len(FILTER_STEPS)
+    emitted: set = set()
+    total = 0
+    word_sum = 0
+    year_min, year_max = None, None
+    categories: set = set()
+
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    near_dups = None
+    if args.near_dup_threshold > 0:
+        near_dups = NearDuplicateFilter(
+            num_perm=args.num_perm, bands=args.bands, threshold=args.near_dup_threshold, executor=executor
+        )
 
-    df = pd.read_csv(raw_path)
-    log = []
+    try:
+        with TableWriter(processed_data_path()) as out:
+            for chunk in iter_raw_frames(chunksize=args.chunk_size):
+                df, sizes = filter_chunk(chunk, id_index, emitted, near_dups)
+                for i in range(len(FILTER_STEPS)):
+                    step_before[i] += sizes[i]
+                    step_after[i] += sizes[i + 1]
+
+                out.write(df)
+                if df.empty:
+                    continue
+                total += len(df)
+                word_sum += int(df["text_word_count"].sum())
+                year_min = min(year_min, int(df["year"].min())) if year_min is not None else int(df["year"].min())
+                year_max = max(year_max, int(df["year"].max())) if year_max is not None else int(df["year"].max())
+                categories.update(df["primary_category"].dropna().unique())
+    finally:
+        id_index.close()
+        if executor is not None:
+            executor.shutdown()
+
+    if near_dups is not None:
+        write_table(near_dups.groups(), duplicate_groups_path())
 
-    def add_log(step: str, before: int, after: int, description: str) -> None:
+    log = []
+    for (step, description), before, after in zip(FILTER_STEPS, step_before, step_after):
         removed = before - after
         log.append(
             {
@@ -47,48 +179,20 @@ def main() -> None:
                 "description": description,
             }
         )
-
-    before = len(df)
-    df = df.dropna(subset=["title", "abstract"])
-    add_log("1", before, len(df), "Remove missing title/abstract")
-
-    before = len(df)
-    df = df.drop_duplicates(subset=["arxiv_id"])
-    add_log("2", before, len(df), "Remove duplicate ArXiv IDs")
-
-    df["is_cs_primary"] = df["categories"].apply(has_cs_primary)
-    df["has_astro_secondary"] = df["categories"].apply(has_astro_secondary)
-    before = len(df)
-    df = df[~(df["is_cs_primary"] & ~df["has_astro_secondary"])]
-    add_log("3", before, len(df), "Filter pure CS/ML papers without astro relevance")
-
-    before = len(df)
-    df["published_date"] = pd.to_datetime(df["published_date"], errors="coerce")
-    df = df.dropna(subset=["published_date"])
-    df["year"] = df["published_date"].dt.year.astype(int)
-    add_log("4", before, len(df), "Remove invalid dates")
-
-    df["text"] = df["title"].fillna("") + " " + df["abstract"].fillna("")
-    df["text_word_count"] = df["text"].str.split().str.len()
-    before = len(df)
-    df = df[df["text_word_count"] >= 20]
-    add_log("5", before, len(df), "Remove very short documents")
-
-    df = df.drop(columns=["is_cs_primary", "has_astro_secondary"])
-    df.to_csv(processed_dir / "preprocessed_papers.csv", index=False)
     pd.DataFrame(log).to_csv(processed_dir / "filtering_log.csv", index=False)
 
     stats = {
-        "total_papers": int(len(df)),
-        "date_range": f"{df['year'].min()}-{df['year'].max()}",
-        "years_covered": int(df["year"].max() - df["year"].min() + 1),
-        "unique_categories": int(df["primary_category"].nunique()),
-        "avg_text_length": float(df["text_word_count"].mean()),
+        "total_papers": int(total),
+        "date_range": f"{year_min}-{year_max}",
+        "years_covered": int(year_max - year_min + 1) if total else 0,
+        "unique_categories": len(categories),
+        "avg_text_length": float(word_sum / total) if total else 0.0,
+        "near_duplicates_removed": step_before[-1] - step_after[-1],
     }
     with (processed_dir / "preprocessing_statistics.json").open("w", encoding="utf-8") as f:
         json.dump(stats, f, indent=2)
 
-    print(f"Preprocessing complete: {len(df):,} papers")
+    print(f"Preprocessing complete: {total:,} papers")
     print(f"Saved outputs in {processed_dir}")
 
 
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Sharded embedding jobs coordinated through a shared filesystem.
+
+  encode --shard k --num-shards N   encode shard k of N on any node (one job per shard)
+  merge --num-shards N              validate all N shards and add them to the embedding store
+  status --num-shards N             list finished and pending shards
+
+Documents are assigned to shards by a hash of their arxiv_id, so every node computes the
+same split without a queue. A shard holds only documents that were missing from the
+embedding store when it ran, so after a model change every document is re-encoded, and
+otherwise only new papers are. Once merged, topic_modeling_bertopic.py finds every vector
+in the store and encodes nothing.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.embedding_shards import (  # noqa: E402
+    corpus_fingerprint,
+    embedding_shards_dir,
+    merge_shards,
+    read_descriptor,
+    shard_of,
+    write_shard,
+)
+from utils.embedding_store import EmbeddingStore, text_hashes  # noqa: E402
+from utils.encoding_pool import EncodingPool, encoder_id  # noqa: E402
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["encode", "merge", "status"])
+    parser.add_argument("--num-shards", type=int, required=True)
+    parser.add_argument("--shard", type=int, help="Shard index k (0-based) for `encode`.")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--quantization", choices=["int8"], help="Use the int8 dynamically-quantized encoder.")
+    parser.add_argument(
+        "--shard-dir", type=Path, help="Shared directory for shard files (default: models/embedding_shards/<model>)."
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Encoding processes on this node.")
+    parser.add_argument("--force", action="store_true", help="Re-encode a shard that is already complete.")
+    parser.add_argument("--compact", action="store_true", help="Compact the store into one segment after merging.")
+    args = parser.parse_args()
+    if args.num_shards < 1:
+        parser.error("--num-shards must be at least 1")
+    if args.command == "encode" and (args.shard is None or not 0 <= args.shard < args.num_shards):
+        parser.error("encode needs --shard k with 0 <= k < --num-shards")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    model_id = encoder_id(args.model, args.quantization)
+    shard_dir = args.shard_dir or embedding_shards_dir(model_id)
+
+    df = load_main_or_sample(columns=["arxiv_id", "text"])
+    ids = df["arxiv_id"].astype(str).tolist()
+    hashes = text_hashes(df["text"].tolist())
+    fingerprint = corpus_fingerprint(ids, hashes)
+    store = EmbeddingStore(model_id)
+
+    if args.command == "status":
+        for k in range(args.num_shards):
+            d = read_descriptor(shard_dir, k, args.num_shards)
+            stale = d is not None and d["corpus_fingerprint"] != fingerprint
+            state = "pending" if d is None else ("stale" if stale else f"done ({d['rows']:,} rows on {d['host']})")
+            print(f"shard {k:>4}/{args.num_shards}: {state}")
+        return
+
+    if args.command == "merge":
+        added = merge_shards(shard_dir, args.num_shards, ids, hashes, store)
+        if args.compact:
+            store.compact()
+        print(f"Merged {args.num_shards} shards: {added:,} vectors added to {store.dir} ({len(store):,} total)")
+        return
+
+    existing = read_descriptor(shard_dir, args.shard, args.num_shards)
+    if existing and existing["corpus_fingerprint"] == fingerprint and not args.force:
+        print(f"Shard {args.shard}/{args.num_shards} is already complete ({existing['rows']:,} rows)")
+        return
+    in_shard = shard_of(ids, args.num_shards) == args.shard
+    todo = df.assign(text_hash=hashes)[in_shard & ~store.contains(ids, hashes)]
+    with EncodingPool(args.model, workers=args.workers, quantization=args.quantization) as encoder:
+        vectors = encoder.encode(todo["text"].tolist(), show_progress_bar=True)
+    write_shard(
+        shard_dir,
+        args.shard,
+        args.num_shards,
+        model_id,
+        fingerprint,
+        todo["arxiv_id"].astype(str).tolist(),
+        todo["text_hash"].tolist(),
+        vectors,
+        assigned=int(in_shard.sum()),
+    )
+    print(f"Shard {args.shard}/{args.num_shards}: encoded {len(todo):,} of {int(in_shard.sum()):,} assigned documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,28 +15,21 @@ from sklearn.metrics.pairwise import cosine_similarity
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
+from utils.storage_utils import read_table, table_exists, write_table  # noqa: E402
+from utils.topic_artifact import TopicArtifact  # noqa: E402
 
 
 def main() -> None:
-    emb_path = ROOT / "models" / "embeddings.npy"
-    doc_topics_path = ROOT / "results" / "topics" / "document_topics.csv"
     labels_path = ROOT / "results" / "topics" / "topic_labels_updated.csv"
-    if not labels_path.exists():
-        labels_path = ROOT / "results" / "validation" / "topic_labels.csv"
+    if not table_exists(labels_path):
+        labels_path = ROOT / "results" / "validation" / "topic_labels.parquet"
 
-    embeddings = np.load(emb_path)
-    doc_topics = pd.read_csv(doc_topics_path)
-    labels_df = pd.read_csv(labels_path)
+    artifact = TopicArtifact(ROOT / "models" / "topic_artifact")
+    labels_df = read_table(labels_path, columns=["topic_id", "label"])
 
-    topic_embeddings = {}
-    for topic_id in sorted(doc_topics["topic"].unique()):
-        if topic_id == -1:
-            continue
-        mask = doc_topics["topic"] == topic_id
-        topic_embeddings[topic_id] = embeddings[mask].mean(axis=0)
-
-    topic_ids = sorted(topic_embeddings.keys())
-    topic_matrix = np.array([topic_embeddings[t] for t in topic_ids])
+    # Topic centroids (mean document embedding per topic) come precomputed with the artifact.
+    topic_ids = artifact.meta["centroid_topic_ids"]
+    topic_matrix = artifact.centroids
 
     sim = cosine_similarity(topic_matrix)
     dist = 1 - sim
@@ -59,9 +52,7 @@ def main() -> None:
 
     clusters = fcluster(linkage_matrix, t=linkage_matrix[:, 2].max() * 0.5, criterion="distance")
     out = pd.DataFrame({"topic_id": topic_ids, "cluster": clusters})
-    out_dir = ROOT / "results" / "hierarchy"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out.to_csv(out_dir / "topic_clusters.csv", index=False)
+    write_table(out, ROOT / "results" / "hierarchy" / "topic_clusters.parquet")
     print(f"Saved dendrogram and {out['cluster'].nunique()} clusters.")
 
 
@@ -3,25 +3,31 @@
 Generate Table 4: Top2Vec vs BERTopic comparison.
 """
 import json
+import sys
 from pathlib import Path
 
 import pandas as pd
 
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from utils.storage_utils import read_table  # noqa: E402
+
+
 def load_json(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def main() -> None:
-    root = Path(__file__).resolve().parents[2]
+    root = ROOT
 
-    bertopic_topic_info = pd.read_csv(root / "results" / "topics" / "topic_info.csv")
-    bertopic_doc_topics = pd.read_csv(root / "results" / "topics" / "document_topics.csv")
+    bertopic_topic_info = read_table(root / "results" / "topics" / "topic_info.parquet", columns=["Topic"])
+    bertopic_doc_topics = read_table(root / "results" / "topics" / "document_topics.parquet", columns=["topic"])
     bertopic_coherence_path = root / "results" / "validation" / "coherence_scores.json"
 
-    top2vec_topic_info = pd.read_csv(root / "results_top2vec" / "topics" / "topic_info.csv")
-    top2vec_doc_topics = pd.read_csv(root / "results_top2vec" / "topics" / "document_topics.csv")
+    top2vec_topic_info = read_table(root / "results_top2vec" / "topics" / "topic_info.parquet", columns=["Topic"])
+    top2vec_doc_topics = read_table(root / "results_top2vec" / "topics" / "document_topics.parquet", columns=["topic"])
     top2vec_coherence_path = root / "results_top2vec" / "validation" / "coherence_scores.json"
 
     bertopic_num_topics = int((bertopic_topic_info["Topic"] != -1).sum())
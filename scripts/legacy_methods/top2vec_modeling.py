@@ -17,11 +17,16 @@ except Exception:  # pragma: no cover
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT))
-from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.data_utils import dataset_path, load_main_or_sample  # noqa: E402
+from utils.stage_cache import StageCache  # noqa: E402
+from utils.storage_utils import write_table  # noqa: E402
+
+
+TOP2VEC_PARAMS = {"speed": "learn", "embedding_model": "distiluse-base-multilingual-cased"}
 
 
 def main() -> None:
-    df = load_main_or_sample()
+    df = load_main_or_sample(columns=["arxiv_id", "year", "text"])
     texts = df["text"].fillna("").tolist()
 
     models_dir = ROOT / "models_top2vec"
@@ -33,18 +38,21 @@ def main() -> None:
     use_gpu = bool(torch and torch.cuda.is_available())
     workers = max(1, (os.cpu_count() or 4) - 1)
 
-    if model_path.exists():
+    model_cache = StageCache(
+        "top2vec_model", inputs=[dataset_path()], outputs=[model_path], params=TOP2VEC_PARAMS
+    )
+    if model_cache.is_fresh():
         model = Top2Vec.load(str(model_path))
     else:
         model = Top2Vec(
             documents=texts,
-            speed="learn",
-            embedding_model="distiluse-base-multilingual-cased",
             workers=workers,
             gpu_umap=use_gpu,
             gpu_hdbscan=use_gpu,
+            **TOP2VEC_PARAMS,
         )
         model.save(str(model_path))
+        model_cache.commit()
 
     num_topics = model.get_num_topics()
     topic_sizes, topic_nums = model.get_topic_sizes()
@@ -57,7 +65,7 @@ def main() -> None:
             "Keywords": [", ".join(words[:10]) for words in topic_words],
         }
     )
-    topic_info.to_csv(results_dir / "topic_info.csv", index=False)
+    write_table(topic_info, results_dir / "topic_info.parquet")
 
     doc_topics = pd.DataFrame(
         {
@@ -66,7 +74,7 @@ def main() -> None:
             "year": df["year"],
         }
     )
-    doc_topics.to_csv(results_dir / "document_topics.csv", index=False)
+    write_table(doc_topics, results_dir / "document_topics.parquet")
 
     print(f"Top2Vec topics: {num_topics}")
     print(f"Saved outputs to {results_dir}")
@@ -6,47 +6,39 @@ import json
 import sys
 from pathlib import Path
 
-import pandas as pd
-from gensim.corpora import Dictionary
-from gensim.models.coherencemodel import CoherenceModel
-
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT))
-from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.coherence import topic_coherence  # noqa: E402
+from utils.storage_utils import read_table, table_exists, write_table  # noqa: E402
+from utils.token_corpus import load_token_corpus  # noqa: E402
 
 
 def main() -> None:
-    topic_info_path = ROOT / "results_top2vec" / "topics" / "topic_info.csv"
-    if not topic_info_path.exists():
+    topic_info_path = ROOT / "results_top2vec" / "topics" / "topic_info.parquet"
+    if not table_exists(topic_info_path):
         raise FileNotFoundError("Missing Top2Vec topic info. Run top2vec_modeling.py first.")
 
-    topic_info = pd.read_csv(topic_info_path)
+    topic_info = read_table(topic_info_path, columns=["Keywords"])
     topics = [kw.split(", ") for kw in topic_info["Keywords"]]
 
-    df = load_main_or_sample()
-    texts = [text.split() for text in df["text"].fillna("")]
-    dictionary = Dictionary(texts)
-    dictionary.filter_extremes(no_below=2, no_above=0.5)
-
-    coherence_model = CoherenceModel(
-        topics=topics,
-        texts=texts,
-        dictionary=dictionary,
-        coherence="c_v",
-        processes=1,
-    )
-    coherence_score = coherence_model.get_coherence()
+    corpus = load_token_corpus()
+    # Topic words outside the filtered dictionary are ignored, as in gensim's CoherenceModel.
+    vocabulary = corpus.filter_extremes(no_below=2, no_above=0.5)
+    scores = topic_coherence(topics, corpus, vocabulary=vocabulary)
+    coherence_score = float(scores["c_v"].mean())
 
     out_dir = ROOT / "results_top2vec" / "validation"
     out_dir.mkdir(parents=True, exist_ok=True)
+    scores.insert(0, "topic_id", range(len(topics)))
+    write_table(scores, out_dir / "topic_coherence.parquet")
     with (out_dir / "coherence_scores.json").open("w", encoding="utf-8") as f:
         json.dump(
             {
                 "coherence_cv": coherence_score,
                 "num_topics": len(topics),
-                "num_documents": len(texts),
-                "dictionary_size": len(dictionary),
+                "num_documents": len(corpus),
+                "dictionary_size": len(vocabulary),
             },
             f,
             indent=2,
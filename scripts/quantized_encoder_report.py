@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Fidelity report for the int8 dynamically-quantized encoder against fp32 embeddings.
+
+On a reference subset, both encoders' embeddings are compared by cosine agreement,
+by the agreement (ARI) of their nearest-topic assignments to the fitted topic centroids,
+and by the C_v coherence of topic words derived from each assignment. Encoding speed of
+both encoders is timed on the same texts. topic_modeling_bertopic.py uses the quantized
+encoder only when this report passed.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.embedding_store import EmbeddingStore, embed_documents  # noqa: E402
+from utils.encoder_fidelity import encoder_fidelity, fidelity_passes, quantized_report_path  # noqa: E402
+from utils.encoding_pool import EncodingPool, encoder_id  # noqa: E402
+from utils.topic_artifact import TopicArtifact  # noqa: E402
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reference-docs", type=int, default=2000, help="Size of the reference subset.")
+    parser.add_argument("--timing-docs", type=int, default=256, help="Texts encoded by both encoders for timing.")
+    parser.add_argument("--workers", type=int, default=None, help="Encoding processes per encoder.")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Gate: minimum mean cosine to fp32.")
+    parser.add_argument("--min-ari", type=float, default=0.9, help="Gate: minimum topic-assignment ARI.")
+    parser.add_argument("--max-coherence-drop", type=float, default=0.01, help="Gate: maximum C_v decrease.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    artifact = TopicArtifact(ROOT / "models" / "topic_artifact")
+    df = load_main_or_sample(columns=["arxiv_id", "text"])
+    if len(df) > args.reference_docs:
+        df = df.sample(n=args.reference_docs, random_state=args.seed).sort_index()
+    ids, texts = df["arxiv_id"].tolist(), df["text"].tolist()
+
+    quantized_id = encoder_id(EMBEDDING_MODEL, "int8")
+    timings = {}
+    vectors = {}
+    for name, model_id, quantization in [("fp32", EMBEDDING_MODEL, None), ("int8", quantized_id, "int8")]:
+        with EncodingPool(EMBEDDING_MODEL, workers=args.workers, quantization=quantization) as encoder:
+            # Both subsets go through their own store, so reruns only encode new reference docs.
+            vectors[name], _ = embed_documents(ids, texts, EmbeddingStore(model_id), encoder)
+            timing_texts = texts[: args.timing_docs]
+            encoder.encode(timing_texts[:8])
+            t0 = time.perf_counter()
+            encoder.encode(timing_texts)
+            timings[name] = time.perf_counter() - t0
+
+    report = encoder_fidelity(
+        vectors["fp32"], vectors["int8"], texts, artifact.centroids, artifact.meta["centroid_topic_ids"]
+    )
+    gates = {"min_cosine": args.min_cosine, "min_ari": args.min_ari, "max_coherence_drop": args.max_coherence_drop}
+    report.update(
+        {
+            "reference_model": EMBEDDING_MODEL,
+            "candidate_model": quantized_id,
+            "timing_docs": len(texts[: args.timing_docs]),
+            "seconds": timings,
+            "speedup": timings["fp32"] / timings["int8"],
+            "gates": gates,
+            "passed": fidelity_passes(report, **gates),
+        }
+    )
+
+    out = quantized_report_path()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Cosine to fp32: mean={report['cosine']['mean']:.5f}, min={report['cosine']['min']:.5f}")
+    print(f"Topic assignment ARI: {report['topic_ari']:.4f} (agreement {report['topic_agreement']:.1%})")
+    print(f"C_v coherence delta: {report['coherence_cv_delta']:+.4f}")
+    print(f"Speedup: {report['speedup']:.2f}x -> {'PASSED' if report['passed'] else 'FAILED'} ({out})")
+
+
+if __name__ == "__main__":
+    main()
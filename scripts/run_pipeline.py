@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Run the analysis scripts as one in-process DAG.
+
+Each script's main() is a stage with declared input and output artifacts. Independent
+stages run concurrently; tables written by one stage are handed to the next in memory,
+and embeddings are shared through the memory-mapped snapshot. Heavy libraries are imported once, and there is one interpreter start-up
+for the whole run. Per-stage wall time is printed and saved to results/pipeline_timing.json.
+
+Stages whose input contents and code are unchanged since their last successful run are
+skipped (see results/stage_manifest.json); --force re-runs everything.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.data_utils import dataset_path  # noqa: E402
+from utils.pipeline import Stage, run_stages, topological_order  # noqa: E402
+
+
+DATA = "data/processed/preprocessed_papers"
+TOKENS = "data/processed/tokens"
+EMBEDDINGS = "models/embeddings.npy"
+BERTOPIC_MODEL = "models/bertopic_model"
+TOPIC_ARTIFACT = "models/topic_artifact"
+TOPIC_INFO = "results/topics/topic_info"
+DOC_TOPICS = "results/topics/document_topics"
+TOPIC_LABELS = "results/validation/topic_labels"
+CURATED_LABELS = "results/topics/topic_labels_updated"
+BERTOPIC_COHERENCE = "results/validation/coherence_scores.json"
+TOPIC_COHERENCE = "results/validation/topic_coherence"
+TOPIC_VALIDATION = "results/validation/topic_validation_23topics"
+TOP2VEC_TOPIC_INFO = "results_top2vec/topics/topic_info"
+TOP2VEC_DOC_TOPICS = "results_top2vec/topics/document_topics"
+TOP2VEC_COHERENCE = "results_top2vec/validation/coherence_scores.json"
+TABLE4 = "paper_outputs/tables/table4_method_comparison.csv"
+
+STAGES = [
+    Stage(
+        "topic_modeling",
+        "scripts/topic_modeling_bertopic.py",
+        inputs=[DATA],
+        outputs=[
+            EMBEDDINGS,
+            BERTOPIC_MODEL,
+            TOPIC_ARTIFACT,
+            TOPIC_INFO,
+            DOC_TOPICS,
+            "results/topics/outlier_papers_for_review",
+        ],
+        groups=["manuscript"],
+        env=["PIPELINE_ENCODER_QUANTIZATION"],
+    ),
+    Stage(
+        "tokenize_corpus",
+        "scripts/tokenize_corpus.py",
+        inputs=[DATA],
+        outputs=[TOKENS],
+        groups=["manuscript", "legacy"],
+    ),
+    Stage(
+        "topic_validation",
+        "scripts/topic_validation.py",
+        inputs=[TOKENS, TOPIC_ARTIFACT],
+        outputs=[BERTOPIC_COHERENCE, TOPIC_COHERENCE, TOPIC_LABELS],
+        groups=["manuscript"],
+    ),
+    Stage(
+        "topic_quality",
+        "scripts/topic_quality_metrics.py",
+        inputs=[EMBEDDINGS, DOC_TOPICS, TOPIC_ARTIFACT, TOPIC_COHERENCE, TOPIC_LABELS],
+        outputs=[TOPIC_VALIDATION, "results/validation/topic_quality.json"],
+        groups=["manuscript"],
+    ),
+    Stage(
+        "hierarchical_clustering",
+        "scripts/hierarchical_clustering_topics.py",
+        inputs=[TOPIC_ARTIFACT, TOPIC_LABELS, CURATED_LABELS],
+        outputs=["results/hierarchy/topic_clusters", "figures/hierarchy/hierarchical_dendrogram.pdf"],
+        groups=["manuscript"],
+        uses_pyplot=True,
+    ),
+    Stage(
+        "temporal_trends",
+        "scripts/temporal_trend_analysis.py",
+        inputs=[DOC_TOPICS, TOPIC_LABELS, CURATED_LABELS],
+        outputs=[
+            "results/temporal/topic_prevalence_over_time",
+            "results/temporal/all_trends",
+            "figures/temporal/topic_evolution_top10.pdf",
+        ],
+        groups=["manuscript"],
+        uses_pyplot=True,
+    ),
+    Stage(
+        "corpus_structure",
+        "scripts/corpus_structure_analysis.py",
+        inputs=[DATA, DOC_TOPICS],
+        outputs=["results/validation/corpus_structure_numbers"],
+        groups=["manuscript"],
+    ),
+    Stage(
+        "semantic_distance",
+        "scripts/semantic_distance_figure.py",
+        inputs=[EMBEDDINGS, DOC_TOPICS],
+        outputs=["figures/validation/semantic_distance_distribution.pdf"],
+        groups=["manuscript"],
+        uses_pyplot=True,
+    ),
+    Stage(
+        "unclustered_temporal",
+        "scripts/unclustered_temporal_figure.py",
+        inputs=[DOC_TOPICS],
+        outputs=["results/temporal/unclustered_temporal_trend", "figures/temporal/unclustered_temporal_trend.pdf"],
+        groups=["manuscript"],
+        uses_pyplot=True,
+    ),
+    Stage(
+        "pipeline_diagram",
+        "scripts/pipeline_diagram.py",
+        outputs=["figures/paper/pipeline_diagram.pdf"],
+        groups=["manuscript"],
+        uses_pyplot=True,
+    ),
+    Stage(
+        "top2vec_modeling",
+        "scripts/legacy_methods/top2vec_modeling.py",
+        inputs=[DATA],
+        outputs=["models_top2vec/top2vec_model", TOP2VEC_TOPIC_INFO, TOP2VEC_DOC_TOPICS],
+        groups=["legacy"],
+    ),
+    Stage(
+        "top2vec_validation",
+        "scripts/legacy_methods/top2vec_validation.py",
+        inputs=[TOKENS, TOP2VEC_TOPIC_INFO],
+        outputs=[TOP2VEC_COHERENCE],
+        groups=["legacy"],
+    ),
+    Stage(
+        "table4_comparison",
+        "scripts/legacy_methods/generate_table4_method_comparison.py",
+        inputs=[TOPIC_INFO, DOC_TOPICS, BERTOPIC_COHERENCE, TOP2VEC_TOPIC_INFO, TOP2VEC_DOC_TOPICS, TOP2VEC_COHERENCE],
+        outputs=[TABLE4],
+        groups=["legacy"],
+    ),
+    Stage(
+        "paper_outputs",
+        "scripts/generate_paper_outputs.py",
+        inputs=[TOPIC_INFO, DOC_TOPICS],
+        optional_inputs=[TABLE4, TOPIC_VALIDATION],
+        outputs=["paper_outputs/reports/paper_bundle_checklist.json"],
+        groups=["bundle"],
+    ),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    groups = sorted({g for s in STAGES for g in s.groups})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("groups", nargs="*", default=groups, help=f"Stage groups to run (default: {' '.join(groups)}).")
+    parser.add_argument("--only", nargs="+", help="Run only these stages (by name).")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Concurrent stages.")
+    parser.add_argument("--force", action="store_true", help="Re-run stages even when their fingerprint matches.")
+    parser.add_argument("--list", action="store_true", help="Print the stages in dependency order and exit.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    selected = [s for s in STAGES if set(s.groups) & set(args.groups)]
+    if args.only:
+        unknown = set(args.only) - {s.name for s in STAGES}
+        if unknown:
+            raise SystemExit(f"Unknown stages: {sorted(unknown)}")
+        selected = [s for s in STAGES if s.name in args.only]
+
+    # Fingerprint whichever dataset the scripts will actually load (full data or the sample).
+    try:
+        data = str(dataset_path().relative_to(ROOT))
+    except (FileNotFoundError, ValueError):
+        data = DATA
+    selected = [dataclasses.replace(s, inputs=[data if i == DATA else i for i in s.inputs]) for s in selected]
+
+    if args.list:
+        for name in topological_order(selected):
+            print(name)
+        return
+
+    t0 = time.perf_counter()
+    results = run_stages(selected, ROOT, max_workers=args.workers, use_cache=not args.force)
+    total = time.perf_counter() - t0
+
+    print(f"\n{'stage':<26}{'status':<9}{'start':>8}{'wall':>9}")
+    for r in results:
+        print(f"{r.name:<26}{r.status:<9}{r.started:>7.1f}s{r.seconds:>8.1f}s")
+    print(f"Total wall time: {total:.1f}s (sum of stages: {sum(r.seconds for r in results):.1f}s)")
+
+    out = ROOT / "results" / "pipeline_timing.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8") as f:
+        json.dump(
+            {"total_seconds": round(total, 3), "stages": [vars(r) | {"seconds": round(r.seconds, 3)} for r in results]},
+            f,
+            indent=2,
+        )
+
+    failed = [r for r in results if r.status not in ("ok", "cached")]
+    if failed:
+        raise SystemExit(f"{len(failed)} stage(s) did not complete: {', '.join(r.name for r in failed)}")
+
+
+if __name__ == "__main__":
+    main()
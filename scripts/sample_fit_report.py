@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the fit-on-sample mode of topic_modeling_bertopic.py with a full fit.
+
+On a stratified subset small enough to fit in full, both modes are run on the same
+embeddings. The report gives ARI over all documents, ARI over documents that both modes
+clustered, separate ARIs for the sampled and the centroid-assigned documents, topic
+counts, outlier rates and wall time, in results/validation/sample_fit_report.json.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.data_utils import load_main_or_sample, stratified_sample  # noqa: E402
+from utils.embedding_store import EmbeddingStore, embed_documents  # noqa: E402
+from utils.encoding_pool import EncodingPool  # noqa: E402
+from utils.pipeline import load_script  # noqa: E402
+
+
+def summary(topics: np.ndarray, seconds: float) -> dict:
+    return {
+        "num_topics": int(len(set(topics.tolist()) - {-1})),
+        "outlier_rate": float((topics == -1).mean()),
+        "seconds": round(seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subset", type=int, default=50_000, help="Papers fitted by both modes.")
+    parser.add_argument("--sample-frac", type=float, default=0.2, help="Share of the subset used for the sample fit.")
+    args = parser.parse_args()
+
+    modeling = load_script(ROOT / "scripts" / "topic_modeling_bertopic.py")
+    df = load_main_or_sample(columns=["arxiv_id", "year", "primary_category", "text"])
+    df = df.iloc[stratified_sample(df, args.subset, seed=7)].reset_index(drop=True)
+    texts = df["text"].tolist()
+    with EncodingPool(modeling.EMBEDDING_MODEL) as encoder:
+        embeddings, _ = embed_documents(
+            df["arxiv_id"].tolist(), texts, EmbeddingStore(modeling.EMBEDDING_MODEL), encoder
+        )
+
+    t0 = time.perf_counter()
+    full, _ = modeling.build_topic_model().fit_transform(texts, embeddings)
+    full_s = time.perf_counter() - t0
+    full = np.asarray(full)
+
+    sample_size = int(len(df) * args.sample_frac)
+    t0 = time.perf_counter()
+    _, sampled, sample = modeling.fit_on_sample(df, texts, embeddings, sample_size)
+    sample_s = time.perf_counter() - t0
+
+    in_sample = np.zeros(len(df), dtype=bool)
+    in_sample[sample] = True
+    both = (full != -1) & (sampled != -1)
+    report = {
+        "documents": len(df),
+        "sample_size": int(in_sample.sum()),
+        "full_fit": summary(full, full_s),
+        "sample_fit": summary(sampled, sample_s),
+        "ari_all": float(adjusted_rand_score(full, sampled)),
+        "ari_clustered_in_both": float(adjusted_rand_score(full[both], sampled[both])) if both.any() else None,
+        "ari_sampled_documents": float(adjusted_rand_score(full[in_sample], sampled[in_sample])),
+        "ari_assigned_documents": (
+            float(adjusted_rand_score(full[~in_sample], sampled[~in_sample])) if (~in_sample).any() else None
+        ),
+    }
+
+    out = ROOT / "results" / "validation" / "sample_fit_report.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
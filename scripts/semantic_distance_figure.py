@@ -2,35 +2,30 @@
 """
 Create semantic distance distribution figure (paper Figure 4).
 """
+import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 
 
-def calculate_distances(embeddings: np.ndarray, clusters: np.ndarray, topic_ids: list[int]) -> tuple[np.ndarray, np.ndarray]:
-    centroids = {}
-    for t in topic_ids:
-        centroids[t] = embeddings[clusters == t].mean(axis=0)
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.embedding_matrix import EmbeddingMatrix, centroid_distances, topic_centroids  # noqa: E402
+from utils.storage_utils import read_table  # noqa: E402
 
-    clustered = []
-    for emb, t in zip(embeddings[clusters != -1], clusters[clusters != -1]):
-        clustered.append(1 - cosine_similarity([centroids[t]], [emb])[0, 0])
 
-    centroid_matrix = np.array([centroids[t] for t in topic_ids])
-    unclustered = []
-    for emb in embeddings[clusters == -1]:
-        d = 1 - cosine_similarity([emb], centroid_matrix)[0]
-        unclustered.append(np.min(d))
-    return np.array(clustered), np.array(unclustered)
+def calculate_distances(embeddings, clusters: np.ndarray, topic_ids: list[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered: distance to own centroid; unclustered: distance to nearest centroid (blocked)."""
+    centroids = topic_centroids(embeddings, clusters, topic_ids)
+    return centroid_distances(embeddings, clusters, topic_ids, centroids)
 
 
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
-    embeddings = np.load(root / "models" / "embeddings.npy")
-    doc_topics = pd.read_csv(root / "results" / "topics" / "document_topics.csv")
+    root = ROOT
+    # Memory-mapped (float16 by default): only one block of rows is decoded at a time.
+    embeddings = EmbeddingMatrix(root / "models" / "embeddings.npy")
+    doc_topics = read_table(root / "results" / "topics" / "document_topics.parquet", columns=["topic"])
     clusters = doc_topics["topic"].values
     topic_ids = sorted([t for t in np.unique(clusters) if t != -1])
 
@@ -2,14 +2,19 @@
 """
 Analyze sensitivity results and identify elbow point for min_cluster_size.
 """
+import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
-import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.storage_utils import read_table, table_exists  # noqa: E402
 
 
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
+    root = ROOT
     candidates = [
         root / "results" / "validation" / "sensitivity_analysis_min_cluster_size.csv",
         root / "Sensitive Analysis" / "results" / "sensitivity_analysis_systematic.csv",
@@ -17,13 +22,17 @@ def main() -> None:
     ]
     source = None
     for path in candidates:
-        if path.exists():
+        if table_exists(path):
             source = path
             break
     if source is None:
         raise FileNotFoundError("No sensitivity analysis CSV found.")
 
-    df = pd.read_csv(source).sort_values("min_cluster_size")
+    df = read_table(source)
+    if "min_samples" in df.columns and (df["min_samples"] == df["min_cluster_size"]).any():
+        # Sweeps over several min_samples values: use the modeling default (min_samples = min_cluster_size).
+        df = df[df["min_samples"] == df["min_cluster_size"]]
+    df = df.sort_values("min_cluster_size")
     df = df[df["num_topics"] > 1].copy()
     df["topics_diff"] = df["num_topics"].diff()
     df["topics_diff2_abs"] = df["topics_diff"].diff().abs()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Parallel min_cluster_size / min_samples sensitivity sweep for the BERTopic model.
+
+Every setting refits BERTopic exactly as topic_modeling_bertopic.py does, except:
+- the UMAP reduction comes from the reduction cache, computed at most once;
+- settings that share min_samples share one HDBSCAN mutual-reachability / single-linkage
+  tree, via hdbscan's joblib `memory` cache, so only the condensed-tree cut is redone per
+  min_cluster_size;
+- settings are spread over a process pool, one min_samples group per task.
+
+Tree reuse needs explicit --min-samples values: the default ('none', min_samples equal to
+min_cluster_size, as in the modeling stage) gives every setting its own tree.
+
+Topic counts, outlier rate and C_v coherence per setting are written to
+results/validation/sensitivity_analysis_min_cluster_size for sensitivity_elbow_analysis.py.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.coherence import topic_coherence  # noqa: E402
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.embedding_store import EmbeddingStore, embed_documents  # noqa: E402
+from utils.encoding_pool import EncodingPool, encoder_id  # noqa: E402
+from utils.path_utils import token_corpus_dir  # noqa: E402
+from utils.pipeline import load_script  # noqa: E402
+from utils.reduction_cache import CachedUMAP, reduction_cache_dir  # noqa: E402
+from utils.storage_utils import write_table  # noqa: E402
+from utils.token_corpus import TokenCorpus, load_token_corpus  # noqa: E402
+
+
+MIN_CLUSTER_SIZES = [20, 30, 40, 50, 60, 70, 80, 90, 100, 120, 150]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-cluster-sizes", type=int, nargs="+", default=MIN_CLUSTER_SIZES)
+    parser.add_argument(
+        "--min-samples",
+        nargs="+",
+        default=["none"],
+        help=(
+            "min_samples values; 'none' uses min_cluster_size (the modeling default), which gives "
+            "every setting its own HDBSCAN tree. Pass integers to share one tree per value."
+        ),
+    )
+    parser.add_argument("--nr-topics", default="auto", help="BERTopic nr_topics ('auto', 'none' or an integer).")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--no-coherence", action="store_true", help="Skip C_v coherence (the slowest metric).")
+    return parser.parse_args()
+
+
+def _nr_topics(value: str):
+    if value == "none":
+        return None
+    return value if value == "auto" else int(value)
+
+
+def evaluate_group(
+    embeddings_path: str, settings: list[tuple[int, int | None]], nr_topics, memory_dir: str, coherence: bool
+) -> list[dict]:
+    """Fit BERTopic for every (min_cluster_size, min_samples) setting of one min_samples group."""
+    from bertopic import BERTopic
+    from hdbscan import HDBSCAN
+
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    texts = load_main_or_sample(columns=["text"])["text"].tolist()
+    corpus = TokenCorpus.load(token_corpus_dir()) if coherence else None
+
+    rows = []
+    for min_cluster_size, min_samples in settings:
+        t0 = time.perf_counter()
+        hdbscan_model = HDBSCAN(
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            metric="euclidean",
+            cluster_selection_method="eom",
+            prediction_data=False,
+            memory=memory_dir,
+        )
+        topic_model = BERTopic(
+            embedding_model=None,
+            umap_model=CachedUMAP(),
+            hdbscan_model=hdbscan_model,
+            min_topic_size=min_cluster_size,
+            nr_topics=nr_topics,
+            calculate_probabilities=False,
+        )
+        topics, _ = topic_model.fit_transform(texts, embeddings)
+        topics = np.asarray(topics)
+        row = {
+            "min_cluster_size": min_cluster_size,
+            "min_samples": min_samples if min_samples is not None else min_cluster_size,
+            "num_clusters": int(hdbscan_model.labels_.max() + 1),
+            "num_topics": int(len(set(topics.tolist()) - {-1})),
+            "outlier_rate": float((topics == -1).mean()),
+        }
+        if coherence:
+            topic_words = [
+                [w for w, _ in topic_model.get_topic(t)] for t in sorted(set(topics.tolist()) - {-1})
+            ]
+            row["coherence_cv"] = (
+                float(topic_coherence(topic_words, corpus, workers=1)["c_v"].mean()) if topic_words else float("nan")
+            )
+        row["seconds"] = round(time.perf_counter() - t0, 2)
+        rows.append(row)
+        print(f"min_cluster_size={min_cluster_size:>4} min_samples={row['min_samples']:>4}: {row['num_topics']} topics")
+    return rows
+
+
+def main() -> None:
+    args = parse_args()
+    min_samples = [None if v == "none" else int(v) for v in args.min_samples]
+
+    # Same encoder (and quantization mode) as the modeling stage, so its stored vectors are reused.
+    modeling = load_script(ROOT / "scripts" / "topic_modeling_bertopic.py")
+    quantization = modeling.encoder_quantization()
+    df = load_main_or_sample(columns=["arxiv_id", "text"])
+    with EncodingPool(modeling.EMBEDDING_MODEL, quantization=quantization) as encoder:
+        embeddings, _ = embed_documents(
+            df["arxiv_id"].tolist(),
+            df["text"].tolist(),
+            EmbeddingStore(encoder_id(modeling.EMBEDDING_MODEL, quantization)),
+            encoder,
+        )
+
+    if not args.no_coherence:
+        load_token_corpus()  # (re)tokenize once here; workers memory-map the saved corpus
+
+    # Computes and caches the reduction once; every fit in the sweep then loads it.
+    umap_model = CachedUMAP().fit(embeddings)
+    print(f"UMAP reduction: {'cached' if umap_model.cache_hit else 'computed'} ({umap_model.path})")
+
+    # Settings with the same effective min_samples share one mutual-reachability tree.
+    groups: dict[int, list[tuple[int, int | None]]] = {}
+    for ms in min_samples:
+        for mcs in args.min_cluster_sizes:
+            groups.setdefault(ms if ms is not None else mcs, []).append((mcs, ms))
+    if all(len(settings) == 1 for settings in groups.values()):
+        print("No settings share min_samples, so no HDBSCAN tree is reused; pass --min-samples to share them")
+
+    cache_dir = reduction_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        # Workers memory-map one float32 copy instead of each receiving the matrix.
+        embeddings_path = str(Path(tmp) / "embeddings.npy")
+        np.save(embeddings_path, np.asarray(embeddings, dtype=np.float32))
+        del embeddings
+        memory_dir = str(cache_dir / "hdbscan_memory")
+        nr_topics = _nr_topics(args.nr_topics)
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(evaluate_group, embeddings_path, settings, nr_topics, memory_dir, not args.no_coherence)
+                for settings in groups.values()
+            ]
+            rows = [row for future in futures for row in future.result()]
+
+    results = pd.DataFrame(rows).sort_values(["min_samples", "min_cluster_size"]).reset_index(drop=True)
+    out = ROOT / "results" / "validation" / "sensitivity_analysis_min_cluster_size.parquet"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    write_table(results, out)
+    print(results.to_string(index=False))
+    print(f"Saved sweep results to {out.with_suffix('')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Most similar papers by embedding, from a persistent vector index over the embedding store.
+
+The index (models/vector_index) is rebuilt when the corpus or embedding model changes.
+Corpora up to --exact-max-rows papers use exact blocked search; larger ones use an IVF
+index with about 4*sqrt(N) lists, where --nprobe sets the recall/latency trade-off.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.embedding_shards import corpus_fingerprint  # noqa: E402
+from utils.embedding_store import EmbeddingStore, embed_documents, text_hashes  # noqa: E402
+from utils.encoding_pool import EncodingPool  # noqa: E402
+from utils.storage_utils import write_table  # noqa: E402
+from utils.vector_index import VectorIndex, vector_index_dir  # noqa: E402
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+
+def load_index(exact_max_rows: int, rebuild: bool) -> VectorIndex:
+    df = load_main_or_sample(columns=["arxiv_id", "text"])
+    ids, texts = df["arxiv_id"].astype(str).tolist(), df["text"].tolist()
+    fingerprint = corpus_fingerprint(ids, text_hashes(texts))
+    path = vector_index_dir()
+    if not rebuild and (path / "meta.json").exists():
+        index = VectorIndex.load(path)
+        if index.meta.get("corpus_fingerprint") == fingerprint and index.meta.get("model_id") == EMBEDDING_MODEL:
+            return index
+
+    with EncodingPool(EMBEDDING_MODEL) as encoder:
+        embeddings, _ = embed_documents(ids, texts, EmbeddingStore(EMBEDDING_MODEL), encoder)
+    nlist = 0 if len(ids) <= exact_max_rows else int(4 * len(ids) ** 0.5)
+    print(f"Building {'IVF' if nlist else 'exact'} index over {len(ids):,} papers")
+    index = VectorIndex.build(embeddings, ids, nlist=nlist, model_id=EMBEDDING_MODEL, corpus_fingerprint=fingerprint)
+    index.save(path)
+    return VectorIndex.load(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arxiv_ids", nargs="+")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF lists scored per query.")
+    parser.add_argument("--exact-max-rows", type=int, default=200_000)
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--out", type=Path, help="Optional table path for the results.")
+    args = parser.parse_args()
+
+    index = load_index(args.exact_max_rows, args.rebuild)
+    similar = index.similar(args.arxiv_ids, k=args.k, nprobe=args.nprobe)
+    print(similar.to_string(index=False))
+    if args.out:
+        write_table(similar, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """
 Analyze topic prevalence over time and estimate trend significance.
 """
+import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
@@ -9,13 +10,18 @@ import pandas as pd
 from scipy import stats
 
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.storage_utils import read_table, table_exists, write_table  # noqa: E402
+
+
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
-    doc_topics = pd.read_csv(root / "results" / "topics" / "document_topics.csv")
+    root = ROOT
+    doc_topics = read_table(root / "results" / "topics" / "document_topics.parquet", columns=["topic", "year"])
     labels_path = root / "results" / "topics" / "topic_labels_updated.csv"
-    if not labels_path.exists():
-        labels_path = root / "results" / "validation" / "topic_labels.csv"
-    labels_df = pd.read_csv(labels_path)
+    if not table_exists(labels_path):
+        labels_path = root / "results" / "validation" / "topic_labels.parquet"
+    labels_df = read_table(labels_path, columns=["topic_id", "label"])
 
     temporal_dir = root / "results" / "temporal"
     fig_dir = root / "figures" / "temporal"
@@ -39,7 +45,7 @@ def main() -> None:
                 }
             )
     prevalence = pd.DataFrame(yearly_rows)
-    prevalence.to_csv(temporal_dir / "topic_prevalence_over_time.csv", index=False)
+    write_table(prevalence, temporal_dir / "topic_prevalence_over_time.parquet")
 
     trends = []
     for topic_id in sorted(prevalence["topic_id"].unique()):
@@ -54,8 +60,8 @@ def main() -> None:
         )
 
     trends_df = pd.DataFrame(trends)
-    trends_df.to_csv(temporal_dir / "all_trends.csv", index=False)
-    trends_df[trends_df["significant"]].to_csv(temporal_dir / "significant_trends.csv", index=False)
+    write_table(trends_df, temporal_dir / "all_trends.parquet")
+    write_table(trends_df[trends_df["significant"]], temporal_dir / "significant_trends.parquet")
 
     top10 = trends_df.nlargest(10, "slope")
     plt.figure(figsize=(14, 8))
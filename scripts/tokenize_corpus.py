@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Tokenize the corpus once for every stage that needs token streams.
+
+Writes data/processed/tokens/: an int32 token-id array with document offsets, the
+vocabulary with document and term frequencies, and a descriptor naming the source dataset.
+Validation stages memory-map it instead of re-splitting the text column.
+"""
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.path_utils import token_corpus_dir  # noqa: E402
+from utils.token_corpus import build_token_corpus  # noqa: E402
+
+
+def main() -> None:
+    corpus = build_token_corpus()
+    print(
+        f"Tokenized {len(corpus):,} documents: {corpus.num_tokens:,} tokens, "
+        f"{len(corpus.vocabulary):,} distinct ({token_corpus_dir()})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,76 +2,181 @@
 """
 Run BERTopic with min_cluster_size = 60 and save model outputs.
 """
+import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from bertopic import BERTopic
 from hdbscan import HDBSCAN
-from sentence_transformers import SentenceTransformer
 
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
-from utils.data_utils import load_main_or_sample  # noqa: E402
-
-
-def main() -> None:
-    df = load_main_or_sample()
-    texts = df["text"].tolist()
-
-    models_dir = ROOT / "models"
-    results_dir = ROOT / "results" / "topics"
-    figures_dir = ROOT / "figures" / "topics"
-    for p in [models_dir, results_dir, figures_dir]:
-        p.mkdir(parents=True, exist_ok=True)
-
-    emb_path = models_dir / "embeddings.npy"
-    embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-
-    if emb_path.exists():
-        embeddings = np.load(emb_path)
-    else:
-        embeddings = embedding_model.encode(
-            texts,
-            show_progress_bar=True,
-            batch_size=32,
-            convert_to_numpy=True,
-        )
-        np.save(emb_path, embeddings)
+from utils.data_utils import load_main_or_sample, stratified_sample  # noqa: E402
+from utils.embedding_matrix import save_embedding_matrix, storage_fidelity, topic_centroids  # noqa: E402
+from utils.embedding_store import EmbeddingStore, embed_documents  # noqa: E402
+from utils.encoder_fidelity import quantized_report_path  # noqa: E402
+from utils.encoding_pool import EncodingPool, encoder_id  # noqa: E402
+from utils.reduction_cache import CachedUMAP  # noqa: E402
+from utils.storage_utils import write_table  # noqa: E402
+from utils.topic_artifact import assign_to_centroids, distance_cutoffs, export_topic_artifact  # noqa: E402
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+# Storage for the embeddings.npy snapshot read by downstream stages: float32, float16 or int8.
+EMBEDDING_STORAGE = "float16"
+# Opt-in int8 dynamic quantization of the encoder (PIPELINE_ENCODER_QUANTIZATION=int8); it is
+# used only when scripts/quantized_encoder_report.py has passed for this model, otherwise fp32 is used.
+ENCODER_QUANTIZATION = os.environ.get("PIPELINE_ENCODER_QUANTIZATION") or None
+MIN_CLUSTER_SIZE = 60
+# Opt-in scalable mode for very large corpora: fit on a stratified sample (year x primary
+# category) of this many papers and assign the rest to the nearest topic centroid.
+FIT_SAMPLE_SIZE = None
+
+
+def encoder_quantization() -> str | None:
+    if ENCODER_QUANTIZATION is None:
+        return None
+    path = quantized_report_path()
+    report = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    if report.get("candidate_model") == encoder_id(EMBEDDING_MODEL, ENCODER_QUANTIZATION) and report.get("passed"):
+        return ENCODER_QUANTIZATION
+    print(f"Quantized encoder not validated ({path} missing or failed); using fp32")
+    return None
+
+
+def build_topic_model(min_cluster_size: int = MIN_CLUSTER_SIZE) -> BERTopic:
+    # Reduced embeddings are reused across runs with the same embeddings and UMAP params.
+    umap_model = CachedUMAP()
 
     hdbscan_model = HDBSCAN(
-        min_cluster_size=60,
+        min_cluster_size=min_cluster_size,
         min_samples=None,
         metric="euclidean",
         cluster_selection_method="eom",
         prediction_data=True,
     )
 
-    topic_model = BERTopic(
-        embedding_model=embedding_model,
+    # Embeddings are precomputed, so BERTopic does not need (or load) the encoder;
+    # new documents are embedded through the store before calling transform(), which
+    # loads the fitted UMAP saved in the reduction cache.
+    return BERTopic(
+        embedding_model=None,
+        umap_model=umap_model,
         hdbscan_model=hdbscan_model,
-        min_topic_size=60,
+        min_topic_size=min_cluster_size,
         nr_topics="auto",
         calculate_probabilities=False,
         verbose=True,
     )
 
-    topics, _ = topic_model.fit_transform(texts, embeddings)
+
+def fit_on_sample(
+    df: pd.DataFrame,
+    texts: list[str],
+    embeddings: np.ndarray,
+    sample_size: int,
+    batch_size: int = 100_000,
+    workers: int | None = None,
+) -> tuple[BERTopic, np.ndarray, np.ndarray]:
+    """
+    Fit on a stratified sample, then assign every other document to its nearest topic
+    centroid (or -1 beyond the topic's 95th-percentile member distance) in parallel batches.
+    min_cluster_size is scaled by the sample fraction so topics keep their corpus-level size.
+    Returns the model, the topic of every document and the row positions of the sample.
+
+    `topic_model.transform()` could label the rest too, but it would project every remaining
+    paper through UMAP and HDBSCAN's approximate_predict. Centroid assignment is one matrix
+    product per batch and uses the same cut-offs as assign_new_papers.py.
+    """
+    sample = stratified_sample(df, sample_size)
+    min_cluster_size = max(15, round(MIN_CLUSTER_SIZE * len(sample) / len(df)))
+    print(f"Fitting on a stratified sample of {len(sample):,} / {len(df):,} papers, min_cluster_size={min_cluster_size}")
+    topic_model = build_topic_model(min_cluster_size)
+    sample_topics, _ = topic_model.fit_transform([texts[i] for i in sample], embeddings[sample])
+    sample_topics = np.asarray(sample_topics)
+
+    centroid_ids = sorted(set(sample_topics.tolist()) - {-1})
+    sample_embeddings = embeddings[sample]
+    centroids = topic_centroids(sample_embeddings, sample_topics, centroid_ids)
+    thresholds = distance_cutoffs(sample_embeddings, sample_topics, centroid_ids, centroids)
+    topics = np.full(len(df), -1, dtype=np.int64)
+    topics[sample] = sample_topics
+    rest = np.setdiff1d(np.arange(len(df)), sample)
+    batches = [rest[i : i + batch_size] for i in range(0, len(rest), batch_size)]
+    # BLAS releases the GIL, so batches assign concurrently on threads without copying embeddings.
+    with ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1)) as executor:
+        assigned = executor.map(
+            lambda rows: assign_to_centroids(embeddings[rows], centroids, centroid_ids, thresholds)[0], batches
+        )
+        for rows, batch_topics in zip(batches, assigned):
+            topics[rows] = batch_topics
+    return topic_model, topics, sample
+
+
+def main() -> None:
+    df = load_main_or_sample(columns=["arxiv_id", "year", "primary_category", "text"])
+    texts = df["text"].tolist()
+
+    models_dir = ROOT / "models"
+    results_dir = ROOT / "results" / "topics"
+    figures_dir = ROOT / "figures" / "topics"
+    for p in [models_dir, results_dir, figures_dir]:
+        p.mkdir(parents=True, exist_ok=True)
+
+    # Only papers whose (arxiv_id, text) is new for this model are encoded; the worker
+    # processes (one model replica each) start only when there is something to encode.
+    quantization = encoder_quantization()
+    model_id = encoder_id(EMBEDDING_MODEL, quantization)
+    store = EmbeddingStore(model_id)
+    with EncodingPool(EMBEDDING_MODEL, quantization=quantization) as encoder:
+        embeddings, n_encoded = embed_documents(
+            df["arxiv_id"].tolist(), texts, store, encoder, show_progress_bar=True
+        )
+    print(f"Embeddings: {n_encoded:,} encoded, {len(texts) - n_encoded:,} reused from {store.dir}")
+
+    if FIT_SAMPLE_SIZE and len(df) > FIT_SAMPLE_SIZE:
+        topic_model, topics, _ = fit_on_sample(df, texts, embeddings, FIT_SAMPLE_SIZE)
+    else:
+        topic_model = build_topic_model()
+        topics, _ = topic_model.fit_transform(texts, embeddings)
+        print(f"UMAP reduction: {'reused from cache' if topic_model.umap_model.cache_hit else 'computed and cached'}")
+    topics = np.asarray(topics)
 
     topic_model.save(models_dir / "bertopic_model")
+    # Model-free copy of the topics so validation/reporting never load BERTopic.
+    export_topic_artifact(
+        topic_model, topics, embeddings, models_dir / "topic_artifact", embedding_model=model_id
+    )
     topic_info = topic_model.get_topic_info()
-    topic_info.to_csv(results_dir / "topic_info.csv", index=False)
+    # Counts over every document (in sample-fit mode BERTopic only counted the sample).
+    topic_info["Count"] = topic_info["Topic"].map(pd.Series(topics).value_counts()).fillna(0).astype(int)
+    write_table(topic_info, results_dir / "topic_info.parquet")
 
     doc_topics = pd.DataFrame(
         {"arxiv_id": df["arxiv_id"], "topic": topics, "year": df["year"]}
     )
-    doc_topics.to_csv(results_dir / "document_topics.csv", index=False)
-
-    outliers = df[doc_topics["topic"] == -1].copy()
-    outliers.to_csv(results_dir / "outlier_papers_for_review.csv", index=False)
+    write_table(doc_topics, results_dir / "document_topics.parquet")
+
+    # Compact, memory-mapped snapshot aligned with document_topics for the downstream
+    # stages, plus the accuracy impact of each storage type on centroids and distances.
+    save_embedding_matrix(models_dir / "embeddings.npy", embeddings, storage=EMBEDDING_STORAGE)
+    report = storage_fidelity(embeddings, doc_topics["topic"].to_numpy())
+    report["selected_storage"] = EMBEDDING_STORAGE
+    validation_dir = ROOT / "results" / "validation"
+    validation_dir.mkdir(parents=True, exist_ok=True)
+    with (validation_dir / "embedding_storage_report.json").open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    outlier_ids = doc_topics.loc[doc_topics["topic"] == -1, "arxiv_id"]
+    papers = load_main_or_sample()
+    outliers = papers[papers["arxiv_id"].isin(outlier_ids)]
+    write_table(outliers, results_dir / "outlier_papers_for_review.parquet")
 
     fig = topic_model.visualize_barchart(top_n_topics=min(15, len(set(topics)) - 1), height=500)
     fig.write_html(figures_dir / "topic_sizes.html")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Per-topic and global topic-quality metrics from cached artifacts.
+
+- topic diversity of the topic words, and per-topic word exclusivity;
+- cosine silhouette of clustered papers, on a per-topic stratified sample;
+- intra-topic dispersion: cosine distance of each paper to its topic centroid.
+
+Embeddings are read block by block from the memory-mapped snapshot, and the silhouette
+never forms a full distance matrix, so the run stays short at a million documents. Per-topic
+C_v / NPMI / UMass scores from topic_validation.py are joined when present. Writes
+results/validation/topic_validation_23topics (the table the paper bundle includes) and
+topic_quality.json.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.embedding_matrix import EmbeddingMatrix  # noqa: E402
+from utils.storage_utils import read_table, table_exists, write_table  # noqa: E402
+from utils.topic_artifact import TopicArtifact  # noqa: E402
+from utils.topic_quality import dispersion, silhouette_sample, silhouette_scores, topic_diversity  # noqa: E402
+
+
+DIVERSITY_TOP_N = 10
+SILHOUETTE_SAMPLE_SIZE = 10000
+SILHOUETTE_MIN_PER_TOPIC = 50
+# File name expected by generate_paper_outputs.py.
+VALIDATION_TABLE = "topic_validation_23topics"
+
+
+def main() -> None:
+    validation_dir = ROOT / "results" / "validation"
+    validation_dir.mkdir(parents=True, exist_ok=True)
+    artifact = TopicArtifact(ROOT / "models" / "topic_artifact")
+    embeddings = EmbeddingMatrix(ROOT / "models" / "embeddings.npy")
+    labels = read_table(ROOT / "results" / "topics" / "document_topics.parquet", columns=["topic"])["topic"].to_numpy()
+    if len(labels) != len(embeddings):
+        raise ValueError(f"document_topics has {len(labels):,} rows but the embeddings have {len(embeddings):,}")
+    topic_ids = sorted(artifact.topic_ids)
+    timings = {}
+
+    t0 = time.perf_counter()
+    diversity, exclusivity = topic_diversity(artifact.topic_words(), top_n=DIVERSITY_TOP_N)
+    timings["diversity"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    table = dispersion(embeddings, labels, topic_ids)
+    timings["dispersion"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sample = silhouette_sample(labels, topic_ids, SILHOUETTE_SAMPLE_SIZE, SILHOUETTE_MIN_PER_TOPIC)
+    if len(topic_ids) > 1:
+        scores = silhouette_scores(embeddings[sample], labels[sample])
+    else:
+        scores = np.full(len(sample), np.nan)
+    by_topic = pd.Series(scores).groupby(labels[sample])
+    timings["silhouette"] = time.perf_counter() - t0
+
+    table["exclusivity"] = pd.Series(exclusivity)
+    table["silhouette"] = by_topic.mean()
+    table["silhouette_sample"] = by_topic.size()
+    table = table.rename_axis("topic_id").reset_index()
+    table["silhouette_sample"] = table["silhouette_sample"].fillna(0).astype("int64")
+
+    coherence_path = validation_dir / "topic_coherence.parquet"
+    if table_exists(coherence_path):
+        table = table.merge(read_table(coherence_path), on="topic_id", how="left")
+    labels_path = validation_dir / "topic_labels.parquet"
+    if table_exists(labels_path):
+        table = read_table(labels_path, columns=["topic_id", "label"]).merge(table, on="topic_id", how="right")
+    write_table(table, validation_dir / f"{VALIDATION_TABLE}.parquet")
+
+    clustered = table["size"].sum()
+    summary = {
+        "num_topics": len(topic_ids),
+        "num_documents": int(len(labels)),
+        "topic_diversity": diversity,
+        "diversity_top_n": DIVERSITY_TOP_N,
+        "silhouette": float(np.mean(scores)) if len(sample) > 0 and len(topic_ids) > 1 else None,
+        "silhouette_sample_size": int(len(sample)),
+        "dispersion_mean": float((table["dispersion_mean"] * table["size"]).sum() / clustered) if clustered else None,
+        "seconds": {k: round(v, 3) for k, v in timings.items()},
+    }
+    if "c_v" in table.columns:
+        summary["coherence_cv"] = float(table["c_v"].mean())
+    with (validation_dir / "topic_quality.json").open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"Topic diversity (top {DIVERSITY_TOP_N}): {diversity:.3f}")
+    if summary["silhouette"] is not None:
+        print(f"Silhouette (cosine, {len(sample):,} sampled papers): {summary['silhouette']:.3f}")
+    if summary["dispersion_mean"] is not None:
+        print(f"Mean distance to topic centroid: {summary['dispersion_mean']:.3f}")
+    print(f"Saved {VALIDATION_TABLE} and topic_quality.json to {validation_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,60 @@
 #!/usr/bin/env python3
 """
 Compute topic coherence and generate initial labels.
+
+Coherence (C_v, plus NPMI and UMass) is computed per topic by utils.coherence, which
+reproduces gensim's CoherenceModel scores from sparse co-occurrence counts of the topic
+words only, over the pre-tokenized corpus from tokenize_corpus.py.
 """
 import json
 import sys
 from pathlib import Path
 
 import pandas as pd
-from bertopic import BERTopic
-from gensim.corpora import Dictionary
-from gensim.models.coherencemodel import CoherenceModel
 
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
-from utils.data_utils import load_main_or_sample  # noqa: E402
+from utils.coherence import topic_coherence  # noqa: E402
+from utils.storage_utils import write_table  # noqa: E402
+from utils.token_corpus import load_token_corpus  # noqa: E402
+from utils.topic_artifact import TopicArtifact  # noqa: E402
 
 
 def main() -> None:
-    df = load_main_or_sample()
-    model_path = ROOT / "models" / "bertopic_model"
-    topics_path = ROOT / "results" / "topics" / "topic_info.csv"
+    corpus = load_token_corpus()
     validation_dir = ROOT / "results" / "validation"
     validation_dir.mkdir(parents=True, exist_ok=True)
 
-    if not model_path.exists():
-        raise FileNotFoundError(f"Missing model path: {model_path}")
-    if not topics_path.exists():
-        raise FileNotFoundError(f"Missing topic info: {topics_path}")
-
-    topic_model = BERTopic.load(model_path)
-    topic_info = pd.read_csv(topics_path)
+    artifact = TopicArtifact(ROOT / "models" / "topic_artifact")
 
-    texts = df["text"].str.split().tolist()
-    dictionary = Dictionary(texts)
     topics_words = []
 
-    for topic_id in range(len(topic_info) - 1):
-        words = [word for word, _ in topic_model.get_topic(topic_id)]
+    for topic_id in artifact.topic_ids:
+        words = [word for word, _ in artifact.get_topic(topic_id)]
         topics_words.append(words)
 
-    coherence_model = CoherenceModel(
-        topics=topics_words,
-        texts=texts,
-        dictionary=dictionary,
-        coherence="c_v",
-        processes=1,
-    )
-    coherence_score = coherence_model.get_coherence()
+    scores = topic_coherence(topics_words, corpus, measures=("c_v", "c_npmi", "u_mass"))
+    coherence_score = float(scores["c_v"].mean())
+    scores.insert(0, "topic_id", artifact.topic_ids)
+    write_table(scores, validation_dir / "topic_coherence.parquet")
 
     with (validation_dir / "coherence_scores.json").open("w", encoding="utf-8") as f:
-        json.dump({"coherence_cv": coherence_score}, f, indent=2)
+        json.dump(
+            {
+                "coherence_cv": coherence_score,
+                "coherence_npmi": float(scores["c_npmi"].mean()),
+                "coherence_umass": float(scores["u_mass"].mean()),
+            },
+            f,
+            indent=2,
+        )
 
     labels = []
-    for topic_id in range(len(topic_info) - 1):
-        top_words = [word for word, _ in topic_model.get_topic(topic_id)[:3]]
+    for topic_id in artifact.topic_ids:
+        top_words = [word for word, _ in artifact.get_topic(topic_id, top_n=3)]
         labels.append({"topic_id": topic_id, "label": f"Topic {topic_id}: {', '.join(top_words)}"})
-    pd.DataFrame(labels).to_csv(validation_dir / "topic_labels.csv", index=False)
+    write_table(pd.DataFrame(labels), validation_dir / "topic_labels.parquet")
 
     print(f"Coherence (C_v): {coherence_score:.3f}")
     print(f"Saved validation outputs to {validation_dir}")
@@ -2,15 +2,21 @@
 """
 Create yearly proportion figure for unclustered papers (paper Figure 5).
 """
+import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import pandas as pd
 
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from utils.storage_utils import read_table, write_table  # noqa: E402
+
+
 def main() -> None:
-    root = Path(__file__).resolve().parents[1]
-    doc_topics = pd.read_csv(root / "results" / "topics" / "document_topics.csv")
+    root = ROOT
+    doc_topics = read_table(root / "results" / "topics" / "document_topics.parquet", columns=["topic", "year"])
     doc_topics = doc_topics[(doc_topics["year"] >= 1996) & (doc_topics["year"] <= 2025)].copy()
 
     rows = []
@@ -38,8 +44,7 @@ def main() -> None:
     plt.close()
 
     out = root / "results" / "temporal"
-    out.mkdir(parents=True, exist_ok=True)
-    yearly.to_csv(out / "unclustered_temporal_trend.csv", index=False)
+    write_table(yearly, out / "unclustered_temporal_trend.parquet")
     print(f"Saved temporal figure and data to {fig_dir} and {out}.")
 
 
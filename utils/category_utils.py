@@ -0,0 +1,100 @@
+# Vectorized ArXiv category matching shared by preprocessing and analysis scripts.
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+CS_CATEGORIES = ["cs.LG", "cs.CV", "cs.RO", "stat.ML", "cs.CL", "cs.AI", "cs.NE", "cs.IR"]
+ASTRO_CATEGORIES = ["astro-ph", "physics.bio-ph", "q-bio", "physics.geo-ph", "physics.space-ph"]
+
+TokenPredicate = Callable[[str], bool]
+
+
+def contains_any(tags: list[str]) -> TokenPredicate:
+    """Match a category token that contains any of `tags` as a substring."""
+    return lambda token: any(tag in token for tag in tags)
+
+
+def startswith_any(prefixes: list[str]) -> TokenPredicate:
+    return lambda token: token.startswith(tuple(prefixes))
+
+
+def equals_any(values: list[str]) -> TokenPredicate:
+    values = set(values)
+    return lambda token: token in values
+
+
+def either(*predicates: TokenPredicate) -> TokenPredicate:
+    return lambda token: any(p(token) for p in predicates)
+
+
+class CategoryMatrix:
+    """
+    Parse a whitespace-separated `categories` column once into a sparse one-hot matrix.
+
+    Rows are factorized first, so only the distinct category strings are tokenized
+    (a few thousand, even for millions of papers). Rules are evaluated once per
+    vocabulary token and broadcast back to rows with sparse/boolean array operations.
+    """
+
+    def __init__(self, categories: pd.Series) -> None:
+        codes, uniques = pd.factorize(categories.fillna("").astype(str), use_na_sentinel=False)
+        token_lists = [u.split() for u in uniques]
+        lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+        flat = [tok for toks in token_lists for tok in toks]
+
+        vocabulary, token_ids = np.unique(np.array(flat, dtype=object), return_inverse=True)
+        self.vocabulary = vocabulary.astype(str)
+        token_ids = token_ids.ravel()
+        combo_rows = np.repeat(np.arange(len(token_lists)), lengths)
+        self.combo_matrix = sparse.csr_matrix(
+            (np.ones(len(flat), dtype=np.int8), (combo_rows, token_ids)),
+            shape=(len(token_lists), len(self.vocabulary)),
+        )
+        starts = np.cumsum(lengths) - lengths
+        nonempty = lengths > 0
+        self.combo_primary = np.full(len(token_lists), -1, dtype=np.int64)
+        self.combo_primary[nonempty] = token_ids[starts[nonempty]]
+        self.codes = codes
+        self.index = categories.index
+
+    def token_mask(self, predicate: TokenPredicate) -> np.ndarray:
+        """Evaluate a predicate once per distinct category token."""
+        return np.fromiter((predicate(t) for t in self.vocabulary), dtype=bool, count=len(self.vocabulary))
+
+    def any_token(self, predicate: TokenPredicate) -> pd.Series:
+        """True where any of the row's categories satisfies the predicate."""
+        hits = (self.combo_matrix @ self.token_mask(predicate).astype(np.int8)) > 0
+        return pd.Series(hits[self.codes], index=self.index)
+
+    def primary_token(self, predicate: TokenPredicate) -> pd.Series:
+        """True where the row's first listed category satisfies the predicate."""
+        mask = self.token_mask(predicate)
+        hits = np.zeros(len(self.combo_primary), dtype=bool)
+        has_primary = self.combo_primary >= 0
+        hits[has_primary] = mask[self.combo_primary[has_primary]]
+        return pd.Series(hits[self.codes], index=self.index)
+
+    def one_hot(self) -> sparse.csr_matrix:
+        """Row-by-category indicator matrix aligned with the input rows."""
+        return self.combo_matrix[self.codes]
+
+
+def category_flags(categories: pd.Series) -> pd.DataFrame:
+    """
+    Compute the category rules used across the pipeline in one vectorized pass.
+
+    - is_cs_primary: first category is a CS/ML category (substring match on CS_CATEGORIES)
+    - has_astro_secondary: any category matches ASTRO_CATEGORIES (substring match)
+    - is_astro_related: any category is astro-ph* or physics.space-ph
+    """
+    matrix = CategoryMatrix(categories)
+    return pd.DataFrame(
+        {
+            "is_cs_primary": matrix.primary_token(contains_any(CS_CATEGORIES)),
+            "has_astro_secondary": matrix.any_token(contains_any(ASTRO_CATEGORIES)),
+            "is_astro_related": matrix.any_token(either(startswith_any(["astro-ph"]), equals_any(["physics.space-ph"]))),
+        }
+    )
@@ -0,0 +1,204 @@
+# Topic coherence (C_v, NPMI, UMass) from sparse sliding-window co-occurrence counts.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.token_corpus import TokenCorpus
+
+
+EPSILON = 1e-12
+# gensim's default window per measure; None means the whole document is one window.
+WINDOW_SIZES = {"c_v": 110, "c_npmi": 10, "u_mass": None}
+
+
+def encode_tokens(texts: list[list[str]], vocabulary: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Flatten tokenized texts to (ids, offsets); ids index `vocabulary`, -1 for other tokens."""
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    ids = pd.Index(vocabulary).get_indexer(list(chain.from_iterable(texts))).astype(np.int32)
+    return ids, offsets
+
+
+def window_counts(
+    ids: np.ndarray, offsets: np.ndarray, n_words: int, window_size: int | None
+) -> tuple[np.ndarray, int]:
+    """
+    Co-occurrence counts of the `n_words` relevant words over boolean sliding windows.
+    Returns (counts, num_windows); counts[i, j] is the number of windows that contain both
+    words and the diagonal holds single-word counts.
+
+    Windows are counted the way gensim's WordOccurrenceAccumulator counts them: a document of
+    L tokens yields max(L - window_size + 1, 1) windows, and when a token slides out of the
+    window its word is marked absent even if another occurrence is still inside, until the
+    word enters again at the right edge. Each word's presence is therefore a set of window
+    intervals; the intervals are cut into runs where no word enters or leaves, and the counts
+    come from one sparse product over those runs.
+    """
+    ids = np.asarray(ids)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    w = int(lengths.max(initial=0)) + 1 if window_size is None else int(window_size)
+    n_windows = np.maximum(lengths - w + 1, 1)
+    window_offsets = np.concatenate([[0], np.cumsum(n_windows)])
+
+    pos = np.flatnonzero(ids >= 0)
+    if len(pos) == 0:
+        return np.zeros((n_words, n_words), dtype=np.int64), int(window_offsets[-1])
+    words = ids[pos].astype(np.int64)
+    order = np.lexsort((pos, words))
+    pos, words = pos[order], words[order]
+    doc = np.searchsorted(offsets, pos, side="right") - 1
+    p = pos - offsets[doc]
+
+    # An occurrence at p enters with window max(p - w + 1, 0) and stays until the first
+    # occurrence of the same word at or after that window's start slides out.
+    enter = np.maximum(p - w + 1, 0)
+    key = words * len(ids) + pos
+    first = np.searchsorted(key, words * len(ids) + offsets[doc] + enter)
+    start = window_offsets[doc] + enter
+    end = window_offsets[doc] + np.minimum(p[first] + 1, n_windows[doc])
+
+    # Starts and ends are non-decreasing per word, so overlapping intervals are consecutive.
+    new = np.ones(len(start), dtype=bool)
+    new[1:] = (words[1:] != words[:-1]) | (start[1:] > end[:-1])
+    group = np.cumsum(new) - 1
+    g_word = words[new]
+    g_start = start[new]
+    g_end = np.zeros(len(g_word), dtype=np.int64)
+    np.maximum.at(g_end, group, end)
+
+    bounds = np.unique(np.concatenate([g_start, g_end]))
+    lo = np.searchsorted(bounds, g_start)
+    span = np.searchsorted(bounds, g_end) - lo
+    rows = np.repeat(lo - np.cumsum(span) + span, span) + np.arange(span.sum())
+    presence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, np.repeat(g_word, span))), shape=(len(bounds) - 1, n_words)
+    )
+    weighted = sparse.diags_array(np.diff(bounds), dtype=np.int64) @ presence
+    return (presence.T @ weighted).toarray(), int(window_offsets[-1])
+
+
+def _block_counts(ids, offsets, n_words, window_size):
+    return window_counts(ids, offsets - offsets[0], n_words, window_size)
+
+
+def cooccurrence_counts(
+    ids: np.ndarray,
+    offsets: np.ndarray,
+    n_words: int,
+    window_size: int | None,
+    workers: int = 1,
+    block_tokens: int = 2_000_000,
+) -> tuple[np.ndarray, int]:
+    """`window_counts` over blocks of whole documents, spread over `workers` processes."""
+    n_docs = len(offsets) - 1
+    block = offsets[:-1] // block_tokens
+    cuts = np.concatenate([[0], np.flatnonzero(np.diff(block)) + 1, [n_docs]])
+    blocks = [
+        (ids[offsets[a] : offsets[b]], offsets[a : b + 1], n_words, window_size) for a, b in zip(cuts[:-1], cuts[1:])
+    ]
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as executor:
+            results = list(executor.map(_block_counts, *zip(*blocks)))
+    else:
+        results = [_block_counts(*b) for b in blocks]
+    num_windows = 0
+    counts = np.zeros((n_words, n_words), dtype=np.int64)
+    for block_counts, block_windows in results:
+        counts += block_counts
+        num_windows += block_windows
+    return counts, num_windows
+
+
+def npmi(counts: np.ndarray, num_windows: int) -> np.ndarray:
+    """Normalized PMI between every pair of words, with gensim's epsilon smoothing."""
+    prob = counts / float(num_windows)
+    single = np.diag(prob)
+    joint = prob + EPSILON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log(joint / np.outer(single, single)) / -np.log(joint)
+
+
+def _cv(m: np.ndarray) -> float:
+    # Each word's NPMI context vector against the summed vector of the whole topic.
+    topic = m.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sims = (m @ topic) / (np.linalg.norm(m, axis=1) * np.linalg.norm(topic))
+    return float(sims.mean())
+
+
+def _npmi_mean(m: np.ndarray) -> float:
+    off = ~np.eye(len(m), dtype=bool)
+    return float(m[off].mean()) if off.any() else float("nan")
+
+
+def _umass(counts: np.ndarray, num_docs: int) -> float:
+    # Pairs (w_i, w_j) with j < i, conditioned on the earlier word.
+    i, j = np.tril_indices(len(counts), k=-1)
+    if len(i) == 0:
+        return float("nan")
+    return float(np.mean(np.log((counts[i, j] / num_docs + EPSILON) / (counts[j, j] / num_docs))))
+
+
+def topic_coherence(
+    topics: list[list[str]],
+    texts: list[list[str]] | TokenCorpus,
+    measures: tuple[str, ...] = ("c_v",),
+    vocabulary: set[str] | None = None,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Per-topic coherence of `topics` (lists of top words) over a tokenized corpus.
+
+    `texts` is a list of token lists or a pre-tokenized `TokenCorpus`. Measures follow
+    gensim's CoherenceModel: "c_v" (boolean sliding window of 110, one-set segmentation,
+    indirect cosine over NPMI context vectors), "c_npmi" (window of 10, mean NPMI of word
+    pairs) and "u_mass" (document co-occurrence, mean log conditional probability of each
+    word given the words ranked above it).
+    As gensim drops topic words missing from its dictionary, words that never occur in the
+    texts, or are outside `vocabulary` when given, are ignored; a topic left without words
+    scores NaN. Returns one row per topic with a column per measure; the model-level score
+    is the column mean.
+    """
+    unknown = set(measures) - set(WINDOW_SIZES)
+    if unknown:
+        raise ValueError(f"Unsupported coherence measures: {sorted(unknown)}")
+    workers = workers or os.cpu_count() or 1
+
+    words = list(dict.fromkeys(w for topic in topics for w in topic if vocabulary is None or w in vocabulary))
+    if isinstance(texts, TokenCorpus):
+        # Map corpus token ids onto positions in `words` (-1 for every other token).
+        word_ids = texts.lookup(words)
+        remap = np.full(len(texts.vocabulary), -1, dtype=np.int32)
+        remap[word_ids[word_ids >= 0]] = np.flatnonzero(word_ids >= 0)
+        ids, offsets = remap[texts.token_ids], np.asarray(texts.offsets)
+    else:
+        ids, offsets = encode_tokens(texts, words)
+
+    stats = {}
+    for window_size in {WINDOW_SIZES[m] for m in measures}:
+        stats[window_size] = cooccurrence_counts(ids, offsets, len(words), window_size, workers=workers)
+
+    position = {w: i for i, w in enumerate(words)}
+    present = np.diag(next(iter(stats.values()))[0]) > 0
+    rows = []
+    for topic in topics:
+        idx = np.array([position[w] for w in topic if w in position and present[position[w]]], dtype=np.int64)
+        row = {}
+        for measure in measures:
+            if len(idx) == 0:
+                row[measure] = float("nan")
+                continue
+            counts, num_windows = stats[WINDOW_SIZES[measure]]
+            sub = counts[np.ix_(idx, idx)]
+            if measure == "u_mass":
+                row[measure] = _umass(sub, num_windows)
+            else:
+                m = npmi(sub, num_windows)
+                row[measure] = _cv(m) if measure == "c_v" else _npmi_mean(m)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(measures))
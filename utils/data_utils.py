@@ -1,7 +1,24 @@
+import json
+import os
 from pathlib import Path
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from utils.path_utils import processed_data_path, sample_data_path
+from utils.path_utils import processed_data_path, raw_data_path, raw_shards_dir, sample_data_path
+from utils.shard_utils import has_shards, iter_shards, shard_signature
+from utils.storage_utils import (
+    file_sha256,
+    read_table,
+    resolve_table,
+    source_is_current,
+    source_stamp,
+    table_columns,
+    table_exists,
+)
 
 
 REQUIRED_COLUMNS = [
@@ -18,33 +35,144 @@ REQUIRED_COLUMNS = [
 ]
 
 
-def load_main_or_sample() -> pd.DataFrame:
+DERIVED_COLUMNS = ["text", "text_word_count"]
+
+
+def dataset_path() -> Path:
+    """Full processed dataset when available; otherwise the sample data."""
+    if table_exists(processed_data_path()):
+        return resolve_table(processed_data_path())
+    if sample_data_path().exists():
+        return sample_data_path()
+    raise FileNotFoundError(
+        "Missing both processed dataset and sample_data.csv. "
+        "Place full data in data/processed/ or keep data/sample_data.csv."
+    )
+
+
+def derived_cache_path(source: Path) -> Path:
+    return source.parent / ".cache" / f"{source.stem}.derived.parquet"
+
+
+def _derive(df: pd.DataFrame) -> pd.DataFrame:
+    text = df["title"].fillna("") + " " + df["abstract"].fillna("")
+    return pd.DataFrame({"text": text, "text_word_count": text.str.split().str.len().astype("int32")})
+
+
+def _write_derived(cache: Path, table: pa.Table, meta: dict) -> None:
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"pipeline": json.dumps(meta)})
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, cache)
+
+
+def load_derived_columns(source: Path, columns: list[str], n_rows: int | None = None) -> pd.DataFrame:
+    """
+    Return derived columns for `source`, memoized in a sidecar Parquet file.
+
+    The sidecar records the SHA-256 of the source file and is rebuilt when it no longer
+    matches. The hash is only recomputed when the file's size or mtime has changed; if the
+    content still matches (e.g. after a touch or copy), the recorded stamp is refreshed so
+    later calls skip the hash again.
+    """
+    cache = derived_cache_path(source)
+    if cache.exists():
+        meta = json.loads(pq.read_schema(cache).metadata[b"pipeline"])
+        recorded = meta["stamp"]
+        if source_is_current(meta, source) and (n_rows is None or meta["rows"] == n_rows):
+            if meta["stamp"] == recorded:
+                return pq.read_table(cache, columns=columns).to_pandas()
+            table = pq.read_table(cache)
+            _write_derived(cache, table, meta)
+            return table.select(columns).to_pandas()
+
+    derived = _derive(read_table(source, columns=["title", "abstract"]))
+    meta = {"source": source.name, "sha256": file_sha256(source), "stamp": source_stamp(source), "rows": len(derived)}
+    _write_derived(cache, pa.Table.from_pandas(derived, preserve_index=False), meta)
+    return derived[columns]
+
+
+def load_main_or_sample(
+    columns: list[str] | None = None,
+    dtypes: dict | None = None,
+    dtype_backend: str | None = None,
+) -> pd.DataFrame:
     """
     Load full processed dataset when available; otherwise use sample data.
+
+    `columns` projects the read to what the caller needs (default: every column plus
+    `text`/`text_word_count`); only the requested source columns are validated and read.
+    Derived columns missing from the source are served from a hash-checked sidecar cache.
+    `dtypes` casts columns after loading; dtype_backend="pyarrow" returns an Arrow-backed,
+    memory-mapped frame.
     """
-    primary = processed_data_path()
-    fallback = sample_data_path()
+    source = dataset_path()
+    available = table_columns(source)
+    wanted = columns if columns is not None else list(dict.fromkeys(available + DERIVED_COLUMNS))
+
+    derived = [c for c in wanted if c in DERIVED_COLUMNS and c not in available]
+    stored = [c for c in wanted if c not in derived]
+    required = REQUIRED_COLUMNS if columns is None else [c for c in stored if c in REQUIRED_COLUMNS]
+    missing = [c for c in required + stored if c not in available]
+    if missing:
+        raise ValueError(f"Dataset is missing required columns: {sorted(set(missing))}")
 
-    if primary.exists():
-        df = pd.read_csv(primary)
-    elif fallback.exists():
-        df = pd.read_csv(fallback)
+    if not derived:
+        df = read_table(source, columns=stored, dtype_backend=dtype_backend)
+    elif not stored:
+        df = load_derived_columns(source, derived)
     else:
-        raise FileNotFoundError(
-            "Missing both processed dataset and sample_data.csv. "
-            "Place full data in data/processed/ or keep data/sample_data.csv."
-        )
+        df = read_table(source, columns=stored, dtype_backend=dtype_backend)
+        extra = load_derived_columns(source, derived, n_rows=len(df))
+        extra.index = df.index
+        df = pd.concat([df, extra], axis=1)[wanted]
+    return df.astype(dtypes) if dtypes else df
 
-    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-    if missing:
-        raise ValueError(f"Dataset is missing required columns: {missing}")
 
-    if "text" not in df.columns:
-        df["text"] = df["title"].fillna("") + " " + df["abstract"].fillna("")
-    if "text_word_count" not in df.columns:
-        df["text_word_count"] = df["text"].str.split().str.len()
+def stratified_sample(
+    df: pd.DataFrame, n: int, by: tuple[str, ...] = ("year", "primary_category"), seed: int = 42
+) -> np.ndarray:
+    """
+    Sorted row positions of a ~n-row sample in which every `by` stratum keeps its share of
+    the data (and at least one row), so small years or categories are never dropped.
+    """
+    if n >= len(df):
+        return np.arange(len(df))
+    frac = n / len(df)
+    rng = np.random.default_rng(seed)
+    groups = df.groupby(list(by), observed=True, dropna=False, sort=False).indices.values()
+    picks = [rng.choice(idx, size=max(1, round(len(idx) * frac)), replace=False) for idx in groups]
+    return np.sort(np.concatenate(picks))
+
 
-    return df
+def raw_store_signature() -> dict:
+    """
+    What the raw store currently holds: the committed shards, or the legacy raw CSV's
+    size and mtime. Raises FileNotFoundError when there is no raw store.
+    """
+    if has_shards(raw_shards_dir()):
+        return shard_signature(raw_shards_dir())
+    if raw_data_path().exists():
+        return {"legacy_csv": source_stamp(raw_data_path())}
+    raise FileNotFoundError(f"Missing raw data: {raw_shards_dir()} or {raw_data_path()}")
+
+
+def iter_raw_frames(columns: list[str] | None = None, chunksize: int | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Lazily yield raw collection records: the sharded store when it exists,
+    otherwise the legacy single-file raw CSV. With `chunksize`, no yielded
+    frame has more than that many rows.
+    """
+    if has_shards(raw_shards_dir()):
+        yield from iter_shards(raw_shards_dir(), columns=columns, chunksize=chunksize)
+    elif raw_data_path().exists():
+        if chunksize:
+            yield from pd.read_csv(raw_data_path(), usecols=columns, chunksize=chunksize)
+        else:
+            yield pd.read_csv(raw_data_path(), usecols=columns)
+    else:
+        raise FileNotFoundError(f"Missing raw data: {raw_shards_dir()} or {raw_data_path()}")
 
 
 def ensure_parent(path: Path) -> None:
@@ -0,0 +1,177 @@
+# MinHash/LSH near-duplicate detection for abstracts (cross-lists, replacements, journal twins).
+import re
+import zlib
+from concurrent.futures import Executor
+
+import numpy as np
+import pandas as pd
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+HASH_SEED = 1729
+
+
+def _permutations(num_perm: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text: str, ngram: int = 3) -> np.ndarray:
+    """Stable 32-bit hashes of the word n-grams of a lower-cased text."""
+    tokens = TOKEN_PATTERN.findall(str(text).lower())
+    if len(tokens) < ngram:
+        tokens = tokens + [""] * (ngram - len(tokens))
+    shingles = {" ".join(tokens[i : i + ngram]) for i in range(len(tokens) - ngram + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(texts: list[str], num_perm: int = 128, ngram: int = 3, seed: int = HASH_SEED) -> np.ndarray:
+    """
+    MinHash signatures (n_texts x num_perm, uint32) using multiply-shift hashing,
+    which is deterministic across processes and runs.
+    """
+    a, b = _permutations(num_perm, seed)
+    out = np.empty((len(texts), num_perm), dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for i, text in enumerate(texts):
+            hashes = shingle_hashes(text, ngram)
+            permuted = (a[:, None] * hashes[None, :] + b[:, None]) >> np.uint64(32)
+            out[i] = permuted.min(axis=1)
+    return out
+
+
+class NearDuplicateIndex:
+    """
+    Streaming LSH index over MinHash signatures.
+
+    Signatures are split into `bands` bands; documents sharing any band bucket are
+    candidates, and a candidate is confirmed when the estimated Jaccard similarity
+    (fraction of equal signature slots) reaches `threshold`. Only representatives
+    (first-seen documents) are indexed, so each lookup touches a handful of buckets
+    instead of every earlier document.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self.ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _store(self, signature: np.ndarray, doc_id: str) -> int:
+        n = len(self.ids)
+        if n == len(self._signatures):
+            self._signatures = np.resize(self._signatures, (2 * n, self.num_perm))
+        self._signatures[n] = signature
+        self.ids.append(doc_id)
+        return n
+
+    def _keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> tuple[int | None, float]:
+        """Best indexed match at or above the threshold, as (position, similarity)."""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return None, 0.0
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[positions] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None, float(similarity[best])
+        return int(positions[best]), float(similarity[best])
+
+    def add(self, signature: np.ndarray, doc_id: str) -> None:
+        position = self._store(signature, doc_id)
+        for bucket, key in zip(self._buckets, self._keys(signature)):
+            bucket.setdefault(key, []).append(position)
+
+    def match_or_add(self, signatures: np.ndarray, doc_ids: list[str]) -> pd.DataFrame:
+        """
+        Resolve a batch in order: documents matching an indexed representative are
+        reported as duplicates, all others become representatives themselves.
+        Returns the duplicate rows (arxiv_id, representative_id, similarity).
+        """
+        duplicates = []
+        for signature, doc_id in zip(signatures, doc_ids):
+            position, similarity = self.query(signature)
+            if position is None:
+                self.add(signature, doc_id)
+            else:
+                duplicates.append(
+                    {"arxiv_id": doc_id, "representative_id": self.ids[position], "similarity": round(similarity, 4)}
+                )
+        return pd.DataFrame(duplicates, columns=["arxiv_id", "representative_id", "similarity"])
+
+
+class NearDuplicateFilter:
+    """
+    Drop near-duplicate texts across a stream of chunks and collect the duplicate groups.
+    Signatures are computed in parallel when an executor is given; LSH lookups run in-process.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.8,
+        ngram: int = 3,
+        executor: Executor | None = None,
+        batch_size: int = 2000,
+    ) -> None:
+        self.index = NearDuplicateIndex(num_perm=num_perm, bands=bands, threshold=threshold)
+        self.ngram = ngram
+        self.executor = executor
+        self.batch_size = batch_size
+        self._groups: list[pd.DataFrame] = []
+
+    def signatures(self, texts: list[str]) -> np.ndarray:
+        if self.executor is None or len(texts) <= self.batch_size:
+            return minhash_signatures(texts, self.index.num_perm, self.ngram)
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        n = len(batches)
+        parts = self.executor.map(minhash_signatures, batches, [self.index.num_perm] * n, [self.ngram] * n)
+        return np.vstack(list(parts))
+
+    def filter(self, df: pd.DataFrame, column: str = "text") -> pd.DataFrame:
+        if df.empty:
+            return df
+        signatures = self.signatures(df[column].tolist())
+        duplicates = self.index.match_or_add(signatures, df["arxiv_id"].astype(str).tolist())
+        if not duplicates.empty:
+            self._groups.append(duplicates)
+        return df[~df["arxiv_id"].astype(str).isin(duplicates["arxiv_id"])]
+
+    def groups(self) -> pd.DataFrame:
+        """Duplicate-group map: every removed paper with the representative that was kept."""
+        if not self._groups:
+            return pd.DataFrame(columns=["arxiv_id", "representative_id", "similarity"])
+        return pd.concat(self._groups, ignore_index=True)
+
+
+def expand_duplicates(assignments: pd.DataFrame, groups: pd.DataFrame, key: str = "arxiv_id") -> pd.DataFrame:
+    """
+    Re-expand per-paper assignments (e.g. document_topics) to the removed near-duplicates.
+    Each duplicate inherits its representative's row; `duplicate_of` marks the added rows.
+    """
+    if groups.empty:
+        return assignments.assign(duplicate_of=pd.NA)
+    copies = groups[["arxiv_id", "representative_id"]].merge(
+        assignments.drop(columns=[key]).assign(representative_id=assignments[key].astype(str)),
+        on="representative_id",
+        how="inner",
+    )
+    copies = copies.rename(columns={"arxiv_id": key, "representative_id": "duplicate_of"})
+    expanded = pd.concat([assignments.assign(duplicate_of=pd.NA), copies[assignments.columns.tolist() + ["duplicate_of"]]])
+    return expanded.reset_index(drop=True)
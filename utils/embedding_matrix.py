@@ -0,0 +1,255 @@
+# Compact, memory-mapped embedding matrices (float32 / float16 / per-row int8) with row slicing.
+import json
+import os
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+
+
+STORAGE_TYPES = ("float32", "float16", "int8")
+
+
+def _meta_path(path: Path) -> Path:
+    return Path(path).with_suffix(".json")
+
+
+def _scales_path(path: Path) -> Path:
+    return Path(path).with_suffix(".scales.npy")
+
+
+def quantize(vectors: np.ndarray, storage: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """Encode float vectors as `storage`; int8 uses one symmetric scale per row."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if storage == "float32":
+        return vectors, None
+    if storage == "float16":
+        return vectors.astype(np.float16), None
+    if storage == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown embedding storage {storage!r}; expected one of {STORAGE_TYPES}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    out = np.asarray(codes, dtype=np.float32)
+    return out * scales[:, None] if scales is not None else out
+
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def save_embedding_matrix(path: Path, vectors: np.ndarray, storage: str = "float16") -> Path:
+    """
+    Write `vectors` as `path` (.npy codes) plus a `.json` descriptor and, for int8, a
+    `.scales.npy` file. The descriptor is written last, so readers never see a partial matrix.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    codes, scales = quantize(vectors, storage)
+    _save_npy(path, codes)
+    if scales is not None:
+        _save_npy(_scales_path(path), scales)
+    elif _scales_path(path).exists():
+        _scales_path(path).unlink()
+    _write_meta(path, storage, codes)
+    return path
+
+
+def _write_meta(path: Path, storage: str, codes: np.ndarray) -> None:
+    meta = {"storage": storage, "rows": int(codes.shape[0]), "dim": int(codes.shape[1])}
+    tmp = _meta_path(path).with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, _meta_path(path))
+
+
+def append_embedding_matrix(path: Path, vectors: np.ndarray) -> Path:
+    """
+    Append rows to a saved matrix in its own storage type. Existing codes (and int8 scales)
+    are copied as stored, not decoded and re-quantized, so old rows are unchanged.
+    """
+    path = Path(path)
+    if not path.exists():
+        return save_embedding_matrix(path, vectors)
+    current = EmbeddingMatrix(path)
+    storage = current.storage
+    codes, scales = quantize(vectors, storage)
+    all_codes = np.concatenate([np.asarray(current.codes), codes.astype(current.codes.dtype)])
+    all_scales = None if scales is None else np.concatenate([np.asarray(current.scales), scales])
+    del current  # release the memory maps before replacing the files
+    _save_npy(path, all_codes)
+    if all_scales is not None:
+        _save_npy(_scales_path(path), all_scales)
+    _write_meta(path, storage, all_codes)
+    return path
+
+
+class EmbeddingMatrix:
+    """
+    Read-only, memory-mapped view of a saved embedding matrix.
+
+    Indexing (`m[i]`, `m[a:b]`, `m[index_array]`, boolean masks) returns float32 rows and
+    only touches the pages for those rows, so several processes share one page-cached copy.
+    Plain `.npy` files without a descriptor (the legacy float32 format) are read as float32.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.codes = np.load(self.path, mmap_mode="r")
+        meta_path = _meta_path(self.path)
+        if meta_path.exists():
+            with meta_path.open("r", encoding="utf-8") as f:
+                self.storage = json.load(f)["storage"]
+        else:
+            self.storage = str(self.codes.dtype)
+        self.scales = np.load(_scales_path(self.path), mmap_mode="r") if self.storage == "int8" else None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.codes.shape
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def __getitem__(self, key) -> np.ndarray:
+        if isinstance(key, (int, np.integer)):
+            return self[[key]][0]
+        scales = None if self.scales is None else np.asarray(self.scales[key])
+        return dequantize(self.codes[key], scales)
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return self[start:stop]
+
+    def iter_blocks(self, block_size: int = 65536) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield (start, float32 block) over the whole matrix."""
+        for start in range(0, len(self), block_size):
+            yield start, self[start : start + block_size]
+
+    def to_array(self) -> np.ndarray:
+        return self[:]
+
+
+def _topic_rows(labels: np.ndarray, topic_ids: list[int]) -> np.ndarray:
+    """Row of each label in `topic_ids` (sorted), or -1 for labels not listed."""
+    ids = np.asarray(topic_ids)
+    if not len(ids):
+        return np.full(len(labels), -1, dtype=np.int64)
+    rows = np.searchsorted(ids, labels).clip(0, len(ids) - 1)
+    return np.where(ids[rows] == labels, rows, -1)
+
+
+def normalize_rows(x: np.ndarray) -> np.ndarray:
+    """Float32 rows scaled to unit L2 norm; all-zero rows are left as they are."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def topic_centroids(embeddings, labels: np.ndarray, topic_ids: list[int], block_size: int = 65536) -> np.ndarray:
+    """
+    Mean embedding per topic (`topic_ids` sorted), accumulated block by block;
+    works on arrays and EmbeddingMatrix alike.
+    """
+    sums = np.zeros((len(topic_ids), embeddings.shape[1]), dtype=np.float64)
+    counts = np.zeros(len(topic_ids), dtype=np.int64)
+    for start in range(0, len(embeddings), block_size):
+        block = np.asarray(embeddings[start : start + block_size], dtype=np.float32)
+        block_labels = labels[start : start + block_size]
+        rows = _topic_rows(block_labels, topic_ids)
+        keep = np.flatnonzero(rows >= 0)
+        onehot = sparse.csr_matrix(
+            (np.ones(len(keep)), (rows[keep], np.arange(len(keep)))), shape=(len(topic_ids), len(keep))
+        )
+        sums += onehot @ block[keep]
+        counts += np.bincount(rows[keep], minlength=len(topic_ids))
+    return (sums / np.maximum(counts, 1)[:, None]).astype(np.float32)
+
+
+def centroid_distances(
+    embeddings, labels: np.ndarray, topic_ids: list[int], centroids: np.ndarray, block_size: int = 65536
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine distance of each clustered document to its own topic centroid, and of each
+    outlier (label -1) to its nearest centroid, computed with blocked matrix products.
+    Every label other than -1 must be in `topic_ids`. Without topics there are no
+    centroids, so both arrays are empty.
+    """
+    labels = np.asarray(labels)
+    if len(centroids) != len(topic_ids):
+        raise ValueError(f"{len(centroids)} centroids for {len(topic_ids)} topic ids")
+    unknown = np.setdiff1d(labels[labels != -1], topic_ids)
+    if len(unknown):
+        raise ValueError(f"Labels without a centroid: {unknown[:10].tolist()}")
+    if not len(topic_ids):
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    unit_centroids = normalize_rows(centroids)
+    clustered, unclustered = [], []
+    for start in range(0, len(embeddings), block_size):
+        block = normalize_rows(embeddings[start : start + block_size])
+        block_labels = labels[start : start + block_size]
+        sims = block @ unit_centroids.T
+        in_topic = block_labels != -1
+        rows = _topic_rows(block_labels[in_topic], topic_ids)
+        clustered.append(1 - sims[in_topic][np.arange(len(rows)), rows])
+        unclustered.append(1 - sims[~in_topic].max(axis=1))
+    return np.concatenate(clustered), np.concatenate(unclustered)
+
+
+def storage_fidelity(
+    vectors: np.ndarray, labels: np.ndarray, storages=STORAGE_TYPES, max_rows: int = 50000, seed: int = 0
+) -> dict:
+    """
+    Accuracy impact of each storage type relative to float32 on a reference subset:
+    per-row cosine agreement, topic centroid agreement, change in the centroid distances
+    used by the semantic distance figure, and nearest-centroid agreement for outliers.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    labels = np.asarray(labels)
+    if len(vectors) > max_rows:
+        idx = np.sort(np.random.default_rng(seed).choice(len(vectors), size=max_rows, replace=False))
+        vectors, labels = vectors[idx], labels[idx]
+    topic_ids = sorted(t for t in np.unique(labels) if t != -1)
+    ref_centroids = topic_centroids(vectors, labels, topic_ids)
+    ref_clustered, ref_unclustered = centroid_distances(vectors, labels, topic_ids, ref_centroids)
+    unit_ref = normalize_rows(vectors)
+    outliers = labels == -1
+    ref_nearest = (unit_ref[outliers] @ normalize_rows(ref_centroids).T).argmax(axis=1) if topic_ids else None
+
+    report = {"reference_rows": int(len(vectors)), "dim": int(vectors.shape[1]), "storages": {}}
+    for storage in storages:
+        codes, scales = quantize(vectors, storage)
+        approx = dequantize(codes, scales)
+        row_cos = np.sum(unit_ref * normalize_rows(approx), axis=1)
+        centroids = topic_centroids(approx, labels, topic_ids)
+        centroid_cos = np.sum(normalize_rows(ref_centroids) * normalize_rows(centroids), axis=1)
+        clustered, unclustered = centroid_distances(approx, labels, topic_ids, centroids)
+        entry = {
+            "bytes_per_vector": int(codes.itemsize * codes.shape[1] + (4 if scales is not None else 0)),
+            "row_cosine_mean": float(row_cos.mean()),
+            "row_cosine_min": float(row_cos.min()),
+            "centroid_cosine_min": float(centroid_cos.min()) if len(centroid_cos) else None,
+            "clustered_distance_max_abs_error": float(np.abs(clustered - ref_clustered).max()) if len(clustered) else None,
+            "unclustered_distance_max_abs_error": (
+                float(np.abs(unclustered - ref_unclustered).max()) if len(unclustered) else None
+            ),
+            "clustered_mean_distance_delta": float(clustered.mean() - ref_clustered.mean()) if len(clustered) else None,
+        }
+        if ref_nearest is not None and outliers.any():
+            nearest = (normalize_rows(approx)[outliers] @ normalize_rows(centroids).T).argmax(axis=1)
+            entry["outlier_nearest_topic_agreement"] = float((nearest == ref_nearest).mean())
+        report["storages"][storage] = entry
+    return report
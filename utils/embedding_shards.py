@@ -0,0 +1,164 @@
+# Deterministic k-of-N embedding shards on a shared filesystem, merged into the EmbeddingStore.
+import hashlib
+import json
+import os
+import socket
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.embedding_store import EmbeddingStore, model_slug
+from utils.path_utils import project_root
+from utils.storage_utils import read_table, write_table
+
+
+def embedding_shards_dir(model_id: str) -> Path:
+    return project_root() / "models" / "embedding_shards" / model_slug(model_id)
+
+
+def shard_of(ids: list[str], num_shards: int) -> np.ndarray:
+    """
+    Shard index per document from a CRC32 of its arxiv_id. Assignment depends only on
+    the id, so every node computes the same split and it is stable as the corpus grows.
+    """
+    crcs = (zlib.crc32(str(i).encode("utf-8")) for i in ids)
+    return np.fromiter(crcs, dtype=np.int64, count=len(ids)) % num_shards
+
+
+def corpus_fingerprint(ids: list[str], hashes: list[str]) -> str:
+    """Hash of the (arxiv_id, text hash) list, so shards from different corpus versions never merge."""
+    digest = hashlib.sha256()
+    for i, h in zip(ids, hashes):
+        digest.update(f"{i}\t{h}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def shard_name(shard: int, num_shards: int) -> str:
+    return f"shard-{shard:04d}-of-{num_shards:04d}"
+
+
+def write_shard(
+    out_dir: Path,
+    shard: int,
+    num_shards: int,
+    model_id: str,
+    fingerprint: str,
+    ids: list[str],
+    hashes: list[str],
+    vectors: np.ndarray,
+    assigned: int,
+) -> Path:
+    """
+    Write one self-describing shard: `<name>.npy` vectors, `<name>.keys.parquet` keys in the
+    same row order, and `<name>.json` (model, shard k/N, corpus fingerprint, rows, dim,
+    host). The descriptor is written last, so a shard without one is incomplete.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = shard_name(shard, num_shards)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not len(ids):
+        vectors = vectors.reshape(0, vectors.shape[1] if vectors.ndim == 2 else 0)
+    tmp = out_dir / f"{name}.npy.tmp"
+    with tmp.open("wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp, out_dir / f"{name}.npy")
+    write_table(pd.DataFrame({"arxiv_id": ids, "text_hash": hashes}), out_dir / f"{name}.keys.parquet", csv=False)
+
+    descriptor = {
+        "model_id": model_id,
+        "shard": shard,
+        "num_shards": num_shards,
+        "corpus_fingerprint": fingerprint,
+        "assigned": int(assigned),
+        "rows": int(len(ids)),
+        "dim": int(vectors.shape[1]) if len(ids) else None,
+        "host": socket.gethostname(),
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    tmp = out_dir / f"{name}.json.tmp"
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(descriptor, f, indent=2)
+    os.replace(tmp, out_dir / f"{name}.json")
+    return out_dir / f"{name}.json"
+
+
+def read_descriptor(out_dir: Path, shard: int, num_shards: int) -> dict | None:
+    path = Path(out_dir) / f"{shard_name(shard, num_shards)}.json"
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_shards(
+    out_dir: Path,
+    num_shards: int,
+    ids: list[str],
+    hashes: list[str],
+    store: EmbeddingStore,
+) -> int:
+    """
+    Validate the N shards in `out_dir` against the corpus and add their vectors to `store`.
+
+    Checks: every shard 0..N-1 is complete and was produced for this model and corpus
+    fingerprint; vector rows match key rows; each key belongs to the corpus and to the
+    shard it was written by; no key appears twice; and every corpus document is either
+    already in the store or in a shard. Nothing is added unless all checks pass.
+    Returns the number of vectors added.
+    """
+    fingerprint = corpus_fingerprint(ids, hashes)
+    corpus = pd.MultiIndex.from_arrays([pd.Index(ids, dtype=str), pd.Index(hashes, dtype=str)])
+    expected_shard = pd.Series(shard_of(ids, num_shards), index=corpus)
+    expected_shard = expected_shard[~expected_shard.index.duplicated()]
+
+    problems, parts = [], []
+    for k in range(num_shards):
+        descriptor = read_descriptor(out_dir, k, num_shards)
+        if descriptor is None:
+            problems.append(f"shard {k} is missing or incomplete")
+            continue
+        for field, want in [("model_id", store.model_id), ("corpus_fingerprint", fingerprint)]:
+            if descriptor[field] != want:
+                problems.append(f"shard {k} has {field}={descriptor[field]!r}, expected {want!r}")
+        name = shard_name(k, num_shards)
+        keys = read_table(Path(out_dir) / f"{name}.keys.parquet", columns=["arxiv_id", "text_hash"])
+        vectors = np.load(Path(out_dir) / f"{name}.npy", mmap_mode="r")
+        if len(keys) != descriptor["rows"] or vectors.shape[0] != descriptor["rows"]:
+            problems.append(f"shard {k}: {len(keys)} keys and {vectors.shape[0]} vectors for {descriptor['rows']} rows")
+            continue
+        index = pd.MultiIndex.from_frame(keys.astype(str))
+        owner = expected_shard.reindex(index)
+        if owner.isna().any():
+            problems.append(f"shard {k}: {int(owner.isna().sum())} documents are not in the corpus")
+        elif (owner != k).any():
+            problems.append(f"shard {k}: {int((owner != k).sum())} documents belong to other shards")
+        parts.append((index, vectors))
+
+    if not problems:
+        dims = {v.shape[1] for _, v in parts if len(v)} | ({store.dim} if store.dim is not None else set())
+        if len(dims) > 1:
+            problems.append(f"inconsistent vector dimensions {sorted(dims)}")
+        sharded = pd.MultiIndex.from_arrays(
+            [
+                pd.Index(np.concatenate([index.get_level_values(level) for index, _ in parts]), dtype=str)
+                for level in range(2)
+            ]
+        )
+        if sharded.has_duplicates:
+            problems.append(f"{int(sharded.duplicated().sum())} documents appear in more than one shard row")
+        covered = corpus.isin(sharded) | store.contains(ids, hashes)
+        if not covered.all():
+            problems.append(f"{int((~covered).sum())} corpus documents are in no shard and not in the store")
+    if problems:
+        raise ValueError("Cannot merge embedding shards:\n  " + "\n  ".join(problems))
+
+    added = 0
+    for index, vectors in parts:
+        if len(index):
+            store.add(index.get_level_values(0).tolist(), index.get_level_values(1).tolist(), np.asarray(vectors))
+            added += len(index)
+    return added
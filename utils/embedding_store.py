@@ -0,0 +1,185 @@
+# Document-keyed, incremental embedding store: (arxiv_id, text hash, model id) -> vector.
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+from utils.path_utils import project_root
+from utils.storage_utils import read_table, write_table
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def embedding_store_dir() -> Path:
+    return project_root() / "models" / "embedding_store"
+
+
+def text_hashes(texts: list[str]) -> list[str]:
+    """Stable content hash per text, so edited abstracts are re-encoded."""
+    return [hashlib.sha1(str(t).encode("utf-8")).hexdigest()[:16] for t in texts]
+
+
+def model_slug(model_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._+-]+", "__", model_id)
+
+
+class Encoder(Protocol):
+    def encode(self, texts: list[str], **kwargs) -> np.ndarray: ...
+
+
+class EmbeddingStore:
+    """
+    Append-only embedding store for one model id.
+
+    Vectors live in numbered segments (`seg-00000.npy` plus a `.keys.parquet` file with
+    arxiv_id/text_hash per row). Each new batch of documents becomes a new segment, and
+    `manifest.json` is rewritten atomically after the segment files are in place, so an
+    interrupted write never exposes partial data. Segments are memory-mapped on read.
+    """
+
+    def __init__(self, model_id: str, root: Path | None = None) -> None:
+        self.model_id = model_id
+        self.dir = Path(root or embedding_store_dir()) / model_slug(model_id)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self._index: pd.DataFrame | None = None
+        self._segments: dict[str, np.ndarray] = {}
+        self._remove_orphans()
+
+    def _load_manifest(self) -> dict:
+        path = self.dir / MANIFEST_NAME
+        if not path.exists():
+            return {"model_id": self.model_id, "dim": None, "segments": []}
+        with path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["model_id"] != self.model_id:
+            raise ValueError(f"{self.dir} holds embeddings for {manifest['model_id']}, not {self.model_id}")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        path = self.dir / MANIFEST_NAME
+        tmp = path.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, path)
+
+    def _remove_orphans(self) -> None:
+        listed = {s["file"] for s in self.manifest["segments"]}
+        for path in self.dir.glob("seg-*"):
+            if path.name.split(".")[0] not in listed:
+                path.unlink()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def dim(self) -> int | None:
+        return self.manifest["dim"]
+
+    @property
+    def index(self) -> pd.DataFrame:
+        """arxiv_id, text_hash -> (segment, row); later segments win for repeated keys."""
+        if self._index is None:
+            frames = []
+            for seg in self.manifest["segments"]:
+                keys = read_table(self.dir / f"{seg['file']}.keys.parquet", columns=["arxiv_id", "text_hash"])
+                keys["segment"] = seg["file"]
+                keys["row"] = np.arange(len(keys))
+                frames.append(keys)
+            if frames:
+                index = pd.concat(frames, ignore_index=True)
+                index = index.drop_duplicates(["arxiv_id", "text_hash"], keep="last")
+            else:
+                index = pd.DataFrame(columns=["arxiv_id", "text_hash", "segment", "row"])
+            self._index = index.set_index(["arxiv_id", "text_hash"])
+        return self._index
+
+    def _segment(self, name: str) -> np.ndarray:
+        if name not in self._segments:
+            self._segments[name] = np.load(self.dir / f"{name}.npy", mmap_mode="r")
+        return self._segments[name]
+
+    def contains(self, ids: list[str], hashes: list[str]) -> np.ndarray:
+        keys = pd.MultiIndex.from_arrays([pd.Index(ids, dtype=str), pd.Index(hashes, dtype=str)])
+        return keys.isin(self.index.index)
+
+    def add(self, ids: list[str], hashes: list[str], vectors: np.ndarray) -> None:
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}")
+        number = max((int(s["file"].split("-")[1]) for s in self.manifest["segments"]), default=-1) + 1
+        name = f"seg-{number:05d}"
+        tmp = self.dir / f"{name}.npy.tmp"
+        with tmp.open("wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp, self.dir / f"{name}.npy")
+        keys = pd.DataFrame({"arxiv_id": [str(i) for i in ids], "text_hash": list(hashes)})
+        write_table(keys, self.dir / f"{name}.keys.parquet", csv=False)
+
+        self.manifest["dim"] = int(vectors.shape[1])
+        self.manifest["segments"].append(
+            {"file": name, "rows": int(len(ids)), "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+        )
+        self._write_manifest()
+        self._index = None
+
+    def get(self, ids: list[str], hashes: list[str]) -> np.ndarray:
+        """Vectors aligned to the requested order; raises KeyError for unknown documents."""
+        keys = pd.MultiIndex.from_arrays([pd.Index(ids, dtype=str), pd.Index(hashes, dtype=str)])
+        located = self.index.reindex(keys)
+        missing = located["segment"].isna()
+        if missing.any():
+            raise KeyError(f"{int(missing.sum())} documents are not in the embedding store, e.g. {ids[int(np.argmax(missing))]}")
+        out = np.empty((len(ids), self.dim), dtype=np.float32)
+        segments = located["segment"].to_numpy()
+        rows = located["row"].to_numpy(dtype=np.int64)
+        for name in pd.unique(segments):
+            mask = segments == name
+            out[mask] = self._segment(name)[rows[mask]]
+        return out
+
+    def compact(self) -> None:
+        """Rewrite every indexed vector into a single segment, dropping repeated copies of a key."""
+        index = self.index.reset_index()
+        if len(self.manifest["segments"]) <= 1:
+            return
+        vectors = self.get(index["arxiv_id"].tolist(), index["text_hash"].tolist())
+        old = [s["file"] for s in self.manifest["segments"]]
+        self.add(index["arxiv_id"].tolist(), index["text_hash"].tolist(), vectors)
+        self.manifest["segments"] = self.manifest["segments"][-1:]
+        self._write_manifest()
+        self._segments = {}
+        for name in old:
+            for path in self.dir.glob(f"{name}.*"):
+                path.unlink()
+
+
+def embed_documents(
+    ids: list[str],
+    texts: list[str],
+    store: EmbeddingStore,
+    encoder: Encoder,
+    **encode_kwargs,
+) -> tuple[np.ndarray, int]:
+    """
+    Return embeddings aligned to `ids`, encoding only documents whose (arxiv_id, text hash)
+    is not yet in the store. Returns (embeddings, number of documents encoded).
+    """
+    ids = [str(i) for i in ids]
+    hashes = text_hashes(texts)
+    missing = ~store.contains(ids, hashes)
+    todo = pd.DataFrame({"arxiv_id": ids, "text_hash": hashes, "text": list(texts)})[missing]
+    todo = todo.drop_duplicates(["arxiv_id", "text_hash"])
+    if len(todo):
+        vectors = encoder.encode(todo["text"].tolist(), convert_to_numpy=True, **encode_kwargs)
+        store.add(todo["arxiv_id"].tolist(), todo["text_hash"].tolist(), vectors)
+    return store.get(ids, hashes), len(todo)
@@ -0,0 +1,96 @@
+# Fidelity of an approximate encoder (e.g. int8-quantized) against fp32 reference embeddings.
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics import adjusted_rand_score
+
+from utils.coherence import topic_coherence
+from utils.embedding_matrix import normalize_rows
+from utils.path_utils import project_root
+
+
+def quantized_report_path() -> Path:
+    return project_root() / "results" / "validation" / "quantized_encoder_report.json"
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """Per-document cosine between the reference and candidate embedding of the same text."""
+    reference = normalize_rows(reference)
+    cos = np.sum(reference * normalize_rows(candidate), axis=1)
+    return {
+        "mean": float(cos.mean()),
+        "p01": float(np.quantile(cos, 0.01)),
+        "min": float(cos.min()),
+    }
+
+
+def nearest_topics(vectors: np.ndarray, centroids: np.ndarray, topic_ids: list[int]) -> np.ndarray:
+    """Topic id of the most cosine-similar centroid for every vector."""
+    sims = normalize_rows(vectors) @ normalize_rows(centroids).T
+    return np.asarray(topic_ids)[sims.argmax(axis=1)]
+
+
+def topic_words(texts: list[str], labels: np.ndarray, top_n: int = 10) -> dict[int, list[str]]:
+    """
+    Top c-TF-IDF words per topic (tf x log(1 + mean words per topic / word frequency)),
+    the BERTopic weighting, computed from the documents assigned to each topic.
+    """
+    vectorizer = CountVectorizer(stop_words="english")
+    counts = vectorizer.fit_transform(texts)
+    topic_ids = sorted(set(labels.tolist()))
+    rows = pd.Index(topic_ids).get_indexer(labels)
+    onehot = sparse.csr_matrix(
+        (np.ones(len(labels)), (rows, np.arange(len(labels)))), shape=(len(topic_ids), len(labels))
+    )
+    tf = (onehot @ counts).toarray()
+    idf = np.log(1 + tf.sum(axis=1).mean() / np.maximum(tf.sum(axis=0), 1))
+    weights = tf / np.maximum(tf.sum(axis=1, keepdims=True), 1) * idf
+    vocabulary = vectorizer.get_feature_names_out()
+    return {t: vocabulary[np.argsort(-weights[i])[:top_n]].tolist() for i, t in enumerate(topic_ids)}
+
+
+def cv_coherence(words: dict[int, list[str]], texts: list[str]) -> float:
+    """Mean C_v coherence of the topic word lists over the tokenized texts."""
+    analyzer = CountVectorizer(stop_words="english").build_analyzer()
+    tokens = [analyzer(t) for t in texts]
+    topics = [w for w in words.values() if len(w) >= 2]
+    return float(topic_coherence(topics, tokens)["c_v"].mean())
+
+
+def encoder_fidelity(
+    reference: np.ndarray,
+    candidate: np.ndarray,
+    texts: list[str],
+    centroids: np.ndarray,
+    topic_ids: list[int],
+    top_n: int = 10,
+) -> dict:
+    """
+    Compare candidate embeddings with fp32 reference embeddings of the same texts:
+    cosine agreement, agreement of nearest-centroid topic assignments (ARI and exact match),
+    and the C_v coherence of topic words derived from each assignment.
+    """
+    ref_topics = nearest_topics(reference, centroids, topic_ids)
+    cand_topics = nearest_topics(candidate, centroids, topic_ids)
+    ref_coherence = cv_coherence(topic_words(texts, ref_topics, top_n), texts)
+    cand_coherence = cv_coherence(topic_words(texts, cand_topics, top_n), texts)
+    return {
+        "documents": int(len(texts)),
+        "cosine": cosine_agreement(reference, candidate),
+        "topic_ari": float(adjusted_rand_score(ref_topics, cand_topics)),
+        "topic_agreement": float((ref_topics == cand_topics).mean()),
+        "coherence_cv_reference": ref_coherence,
+        "coherence_cv_candidate": cand_coherence,
+        "coherence_cv_delta": cand_coherence - ref_coherence,
+    }
+
+
+def fidelity_passes(report: dict, min_cosine: float, min_ari: float, max_coherence_drop: float) -> bool:
+    return (
+        report["cosine"]["mean"] >= min_cosine
+        and report["topic_ari"] >= min_ari
+        and report["coherence_cv_delta"] >= -max_coherence_drop
+    )
@@ -0,0 +1,182 @@
+# Multi-process CPU sentence encoding with length-bucketed, token-budgeted batches.
+import multiprocessing as mp
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Tokens per batch (batch size x longest sequence in the batch) and the hard batch-size cap.
+DEFAULT_TOKEN_BUDGET = 8192
+DEFAULT_MAX_BATCH_SIZE = 128
+# all-mpnet-base-v2 truncates at 384 word pieces; longer texts cost the same as 384.
+DEFAULT_MAX_SEQ_LENGTH = 384
+QUANTIZATION_MODES = ("int8",)
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+_worker_model = None
+
+
+def estimate_token_lengths(texts: list[str], max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH) -> np.ndarray:
+    """
+    Cheap word-piece count estimate (words and punctuation x 1.3, plus [CLS]/[SEP]).
+    Only the ordering matters for bucketing, so the tokenizer is not needed here.
+    """
+    lengths = np.fromiter((len(_WORD.findall(str(t))) for t in texts), dtype=np.int64, count=len(texts))
+    return np.minimum(np.ceil(lengths * 1.3).astype(np.int64) + 2, max_seq_length)
+
+
+def length_batches(
+    lengths: np.ndarray,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> list[np.ndarray]:
+    """
+    Split documents into batches of similar length, longest first.
+
+    Each batch holds as many documents as fit in `token_budget` padded tokens (batch size
+    x longest member), capped at `max_batch_size`. Short abstracts therefore travel in
+    large batches and long ones in small batches, and padding stays minimal.
+    """
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    batches, start = [], 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        size = int(min(max(token_budget // longest, 1), max_batch_size))
+        batches.append(order[start : start + size])
+        start += size
+    return batches
+
+
+def encoder_id(model_name: str, quantization: str | None = None) -> str:
+    """Embedding-store model id; quantized encoders get their own id so vectors never mix."""
+    if quantization is None:
+        return model_name
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization {quantization!r}; expected one of {QUANTIZATION_MODES}")
+    return f"{model_name}+{quantization}-dynamic"
+
+
+def parse_encoder_id(model_id: str) -> tuple[str, str | None]:
+    """Inverse of `encoder_id`: (model name, quantization mode or None)."""
+    for mode in QUANTIZATION_MODES:
+        if model_id.endswith(f"+{mode}-dynamic"):
+            return model_id[: -len(f"+{mode}-dynamic")], mode
+    return model_id, None
+
+
+def load_sentence_transformer(model_name: str, quantization: str | None = None, **model_kwargs):
+    """
+    CPU SentenceTransformer. quantization="int8" applies PyTorch dynamic quantization to
+    every nn.Linear (int8 weights, activations quantized on the fly); embeddings, layer
+    norms and pooling stay in fp32.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    encoder_id(model_name, quantization)  # validate the mode before loading weights
+    model = SentenceTransformer(model_name, device="cpu", **model_kwargs)
+    if quantization == "int8":
+        import torch
+
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.eval()
+
+
+def _init_worker(loader, model_name: str, model_kwargs: dict, threads: int) -> None:
+    global _worker_model
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = loader(model_name, **model_kwargs)
+
+
+def _encode_batch(texts: list[str], kwargs: dict) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=len(texts), **kwargs), dtype=np.float32)
+
+
+class EncodingPool:
+    """
+    Encoder (see `utils.embedding_store.Encoder`) that fans length-bucketed batches out
+    over a process pool holding one model replica per worker.
+
+    Intra-op threads are split evenly across workers so replicas do not oversubscribe
+    the cores. Workers start on the first `encode()` call, so runs where every document
+    is already in the embedding store never load the model. Output rows follow the
+    input order. Use as a context manager, or call `close()`, to stop the workers.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int | None = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
+        loader=load_sentence_transformer,
+        **model_kwargs,
+    ) -> None:
+        self.model_name = model_name
+        self.workers = max(1, workers or min(4, os.cpu_count() or 1))
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.max_seq_length = max_seq_length
+        self.loader = loader
+        self.model_kwargs = model_kwargs
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def threads_per_worker(self) -> int:
+        return max(1, (os.cpu_count() or 1) // self.workers)
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a parent that already runs torch/BLAS threads can deadlock.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.loader, self.model_name, self.model_kwargs, self.threads_per_worker),
+            )
+        return self._executor
+
+    def encode(self, texts: list[str], **kwargs) -> np.ndarray:
+        texts = [str(t) for t in texts]
+        show_progress = kwargs.pop("show_progress_bar", False)
+        kwargs.pop("batch_size", None)  # chosen per bucket from the token budget
+        kwargs["convert_to_numpy"] = True
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batches = length_batches(
+            estimate_token_lengths(texts, self.max_seq_length), self.token_budget, self.max_batch_size
+        )
+        executor = self._start()
+        futures = [executor.submit(_encode_batch, [texts[i] for i in batch], kwargs) for batch in batches]
+
+        out = None
+        for n, (batch, future) in enumerate(zip(batches, futures), start=1):
+            vectors = future.result()
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[batch] = vectors
+            if show_progress and (n % 50 == 0 or n == len(batches)):
+                print(f"  encoded {n}/{len(batches)} batches")
+        return out
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "EncodingPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_executor": None}
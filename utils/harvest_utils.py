@@ -0,0 +1,257 @@
+# Concurrent, rate-limited harvesting helpers for the ArXiv Atom API.
+import json
+import os
+import random
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ATOM_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "arxiv": "http://arxiv.org/schemas/atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+ARXIV_EPOCH = datetime(1991, 1, 1)
+
+
+def windowed_query(query: str, window_start: str, window_end: str) -> str:
+    """
+    Restrict a search to a submittedDate window (ISO timestamps, minute resolution).
+    A fixed upper bound keeps page offsets stable when a run is resumed.
+    """
+    start = datetime.fromisoformat(window_start.rstrip("Z"))
+    end = datetime.fromisoformat(window_end.rstrip("Z"))
+    return f"({query}) AND submittedDate:[{start:%Y%m%d%H%M} TO {end:%Y%m%d%H%M}]"
+
+
+def load_checkpoints(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoints(path: Path, checkpoints: dict) -> None:
+    """Write checkpoints atomically so a crash never leaves a truncated file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(checkpoints, f, indent=2)
+    os.replace(tmp, path)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker.
+    `rate` tokens are added per second, up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HarvestStats:
+    """Request counters for the harvest report."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int = 0, retry: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes += nbytes
+            self.retries += int(retry)
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "megabytes": round(self.bytes / 1e6, 3),
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(self.requests / elapsed, 3) if elapsed else 0.0,
+        }
+
+
+def parse_feed(xml_text: str) -> tuple[int, list[dict]]:
+    """
+    Parse one Atom feed page into (total_results, entries).
+    Entries use the same field names as the ArXiv client results.
+    """
+    root = ET.fromstring(xml_text)
+    total_text = root.findtext("opensearch:totalResults", default="0", namespaces=ATOM_NS)
+    entries = []
+    for entry in root.findall("atom:entry", ATOM_NS):
+        entry_id = entry.findtext("atom:id", default="", namespaces=ATOM_NS).strip()
+        published = entry.findtext("atom:published", default="", namespaces=ATOM_NS).strip()
+        primary = entry.find("arxiv:primary_category", ATOM_NS)
+        categories = [c.get("term", "") for c in entry.findall("atom:category", ATOM_NS)]
+        entries.append(
+            {
+                "entry_id": entry_id,
+                "title": re.sub(r"\s+", " ", entry.findtext("atom:title", default="", namespaces=ATOM_NS)).strip(),
+                "summary": entry.findtext("atom:summary", default="", namespaces=ATOM_NS).strip(),
+                "authors": [a.findtext("atom:name", default="", namespaces=ATOM_NS) for a in entry.findall("atom:author", ATOM_NS)],
+                "published": published,
+                "primary_category": primary.get("term", "") if primary is not None else (categories[0] if categories else ""),
+                "categories": categories,
+            }
+        )
+    return int(total_text or 0), entries
+
+
+class ArxivHarvester:
+    """
+    Fetch ArXiv search pages concurrently behind one shared token bucket.
+    A pooled HTTP session is reused by all worker threads.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ARXIV_API_URL,
+        page_size: int = 100,
+        max_results: int = 10000,
+        rate: float = 1 / 3,
+        burst: float = 1.0,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff: float = 3.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.base_url = base_url
+        self.page_size = page_size
+        self.max_results = max_results
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = HarvestStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _sleep_before_retry(self, attempt: int, retry_after: str | None = None) -> None:
+        delay = self.backoff * (2**attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        time.sleep(delay + random.uniform(0, self.backoff))
+
+    def fetch_page(self, search_query: str, start: int) -> tuple[int, list[dict]]:
+        """
+        Fetch a single result page, retrying transient failures with exponential backoff.
+        """
+        params = {
+            "search_query": search_query,
+            "start": start,
+            "max_results": min(self.page_size, self.max_results - start),
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        }
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                self.stats.record(len(response.content), retry=attempt > 0)
+                if response.status_code in RETRYABLE_STATUS:
+                    retry_after = response.headers.get("Retry-After")
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                total, entries = parse_feed(response.text)
+                # The API occasionally returns an empty page mid-result set; treat it as transient.
+                if not entries and start < min(total, self.max_results):
+                    raise requests.HTTPError(f"Empty page at start={start} (total={total})")
+                return total, entries
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError, ET.ParseError) as exc:
+                if isinstance(exc, requests.HTTPError) and exc.response is not None:
+                    if exc.response.status_code not in RETRYABLE_STATUS:
+                        raise
+                last_error = exc
+                if attempt < self.max_retries:
+                    self._sleep_before_retry(attempt, retry_after)
+        raise RuntimeError(f"Giving up on {search_query!r} start={start}: {last_error}")
+
+    def iter_pages(
+        self, searches: dict[str, str], start_offsets: dict[str, int] | None = None
+    ) -> Iterator[tuple[str, int, int, list[dict]]]:
+        """
+        Yield (label, start, total, entries) for every page of every search.
+
+        Pages are fetched ahead concurrently but yielded in query order and page order,
+        so callers can deduplicate, write and checkpoint results deterministically.
+        `start_offsets` resumes individual searches from a saved page cursor.
+        """
+        labels = list(searches)
+        offsets = start_offsets or {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            first_pages = {
+                label: pool.submit(self.fetch_page, searches[label], offsets.get(label, 0)) for label in labels
+            }
+
+            def tasks():
+                for label in labels:
+                    first = offsets.get(label, 0)
+                    yield label, first, first_pages[label]
+                    total, _ = first_pages[label].result()
+                    for start in range(first + self.page_size, min(total, self.max_results), self.page_size):
+                        yield label, start, None
+
+            task_iter = tasks()
+            window: deque = deque()
+
+            def fill() -> None:
+                while len(window) < 2 * self.max_workers:
+                    task = next(task_iter, None)
+                    if task is None:
+                        return
+                    label, start, future = task
+                    if future is None:
+                        future = pool.submit(self.fetch_page, searches[label], start)
+                    window.append((label, start, future))
+
+            fill()
+            while window:
+                label, start, future = window.popleft()
+                total, entries = future.result()
+                fill()
+                yield label, start, total, entries
@@ -0,0 +1,134 @@
+# Persistent, version-aware ArXiv ID index backed by SQLite.
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+
+ID_PATTERN = re.compile(r"^(.*?)(?:v(\d+))?$")
+SQLITE_MAX_VARIABLES = 900
+
+
+def split_arxiv_id(arxiv_id: str) -> tuple[str, int]:
+    """Split `2301.01234v2` into (`2301.01234`, 2); unversioned IDs get version 0."""
+    base, version = ID_PATTERN.match(str(arxiv_id).strip()).groups()
+    return base, int(version or 0)
+
+
+def split_arxiv_ids(ids: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Vectorized `split_arxiv_id` for a Series of IDs."""
+    parts = ids.astype(str).str.strip().str.extract(ID_PATTERN)
+    return parts[0], parts[1].fillna(0).astype(int)
+
+
+class ArxivIdIndex:
+    """
+    On-disk map from base ArXiv ID to the latest version seen.
+
+    Lookups are primary-key hits, so checking a paper is O(1) and never requires
+    loading the raw store. Writes stay in an open transaction until `commit()`,
+    which lets callers tie index durability to their own data commits. A small
+    key/value table records which raw store contents the index covers.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "base_id TEXT PRIMARY KEY, version INTEGER NOT NULL, arxiv_id TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+
+    def __enter__(self) -> "ArxivIdIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM papers")
+        self.conn.execute("DELETE FROM meta")
+        self.conn.commit()
+
+    def get_meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key: str, value) -> None:
+        """Store a JSON value; like ID writes, it becomes durable at the next `commit()`."""
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, sort_keys=True)),
+        )
+
+    def latest_version(self, base_id: str) -> int | None:
+        row = self.conn.execute("SELECT version FROM papers WHERE base_id = ?", (base_id,)).fetchone()
+        return row[0] if row else None
+
+    def is_new(self, arxiv_id: str) -> bool:
+        """True when the paper is unknown or this is a newer version than the indexed one."""
+        base, version = split_arxiv_id(arxiv_id)
+        known = self.latest_version(base)
+        return known is None or version > known
+
+    def add(self, arxiv_id: str) -> None:
+        self.add_many([arxiv_id])
+
+    def add_many(self, arxiv_ids: Iterable[str]) -> None:
+        rows = []
+        for arxiv_id in arxiv_ids:
+            base, version = split_arxiv_id(arxiv_id)
+            rows.append((base, version, str(arxiv_id)))
+        self.conn.executemany(
+            "INSERT INTO papers (base_id, version, arxiv_id) VALUES (?, ?, ?) "
+            "ON CONFLICT(base_id) DO UPDATE SET version = excluded.version, arxiv_id = excluded.arxiv_id "
+            "WHERE excluded.version > papers.version",
+            rows,
+        )
+
+    def latest_versions(self, base_ids: Iterable[str]) -> dict[str, int]:
+        """Batched lookup of the latest indexed version for many base IDs."""
+        base_ids = list(base_ids)
+        found = {}
+        for i in range(0, len(base_ids), SQLITE_MAX_VARIABLES):
+            batch = base_ids[i : i + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                self.conn.execute(f"SELECT base_id, version FROM papers WHERE base_id IN ({placeholders})", batch)
+            )
+        return found
+
+
+def keep_latest_versions(df: pd.DataFrame, index: ArxivIdIndex | None = None) -> pd.DataFrame:
+    """
+    Drop rows superseded by a newer version of the same paper.
+
+    When an index is given, rows older than the indexed latest version are dropped
+    even if the newer version is not in `df`. Remaining duplicates of a base ID keep
+    the highest version; original row order is preserved.
+    """
+    base, version = split_arxiv_ids(df["arxiv_id"])
+    keep = pd.Series(True, index=df.index)
+    if index is not None:
+        latest = base.map(index.latest_versions(base.unique()))
+        keep = latest.isna() | (version >= latest)
+    ranked = pd.DataFrame({"base": base[keep], "version": version[keep]})
+    winners = ranked.sort_values("version", ascending=False, kind="stable").drop_duplicates("base").index
+    return df.loc[df.index.isin(winners)]
@@ -14,9 +14,25 @@ def raw_data_path() -> Path:
     return data_dir() / "raw" / "arxiv_astrobiology_raw.csv"
 
 
+def raw_shards_dir() -> Path:
+    return data_dir() / "raw" / "shards"
+
+
+def id_index_path() -> Path:
+    return data_dir() / "raw" / "arxiv_ids.sqlite"
+
+
 def processed_data_path() -> Path:
-    return data_dir() / "processed" / "preprocessed_papers.csv"
+    return data_dir() / "processed" / "preprocessed_papers.parquet"
 
 
 def sample_data_path() -> Path:
     return data_dir() / "sample_data.csv"
+
+
+def duplicate_groups_path() -> Path:
+    return data_dir() / "processed" / "duplicate_groups.parquet"
+
+
+def token_corpus_dir() -> Path:
+    return data_dir() / "processed" / "tokens"
@@ -0,0 +1,165 @@
+# In-process DAG runner for the analysis scripts.
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+from utils.stage_cache import StageCache, code_paths
+from utils.storage_utils import in_memory_artifacts
+
+
+# pyplot keeps global figure state, so stages that draw with it never overlap.
+PYPLOT_LOCK = threading.Lock()
+
+
+def load_script(path: Path) -> ModuleType:
+    """Import a script by file path so its `main()` can run in this process."""
+    path = Path(path)
+    spec = importlib.util.spec_from_file_location(f"pipeline_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step. `inputs`/`outputs` are artifact paths relative to the project root;
+    a stage depends on every stage that declares one of its inputs as an output.
+    `optional_inputs` only order the stage: it still runs if their producer fails.
+    `env` names environment variables that change the stage's outputs.
+    """
+
+    name: str
+    script: str
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    optional_inputs: list[str] = field(default_factory=list)
+    groups: list[str] = field(default_factory=list)
+    env: list[str] = field(default_factory=list)
+    uses_pyplot: bool = False
+
+    def entry_point(self, root: Path) -> Callable[[], None]:
+        return load_script(root / self.script).main
+
+    def cache(self, root: Path) -> StageCache:
+        """Fingerprint over declared inputs, `env` settings, the stage script and the shared utils code."""
+        return StageCache(
+            f"stage:{self.name}",
+            inputs=[root / p for p in self.inputs + self.optional_inputs],
+            outputs=[root / p for p in self.outputs],
+            params={name: os.environ.get(name) for name in self.env},
+            code=code_paths(root / self.script),
+        )
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    seconds: float = 0.0
+    started: float = 0.0
+    error: str = ""
+
+
+def dependencies(stages: list[Stage], optional: bool = True) -> dict[str, set[str]]:
+    """Stage name -> names of the stages producing its inputs (and optional inputs, unless disabled)."""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is produced by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+    deps = {}
+    for s in stages:
+        inputs = s.inputs + (s.optional_inputs if optional else [])
+        deps[s.name] = {producers[i] for i in inputs if i in producers and producers[i] != s.name}
+    return deps
+
+
+def topological_order(stages: list[Stage]) -> list[str]:
+    deps = dependencies(stages)
+    order, done = [], set()
+    while len(order) < len(stages):
+        ready = [s.name for s in stages if s.name not in done and deps[s.name] <= done]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle among: {sorted(set(deps) - done)}")
+        order.extend(ready)
+        done.update(ready)
+    return order
+
+
+def run_stages(
+    stages: list[Stage],
+    root: Path,
+    max_workers: int = 4,
+    use_cache: bool = True,
+    log: Callable[[str], None] = print,
+) -> list[StageResult]:
+    """
+    Run stages in dependency order in one process, starting each as soon as its inputs are ready.
+
+    Tables and arrays are passed between stages through the in-memory artifact memo, so a
+    downstream stage reuses what an upstream stage wrote instead of re-reading it. Stages
+    whose required dependencies failed are skipped. With `use_cache`, a stage whose
+    fingerprint (input contents, code) matches its last successful run is not re-run; since
+    inputs are hashed after upstream stages finish, upstream changes invalidate it.
+    """
+    deps = dependencies(stages)
+    required = dependencies(stages, optional=False)
+    topological_order(stages)
+    by_name = {s.name: s for s in stages}
+    results: dict[str, StageResult] = {}
+    t0 = time.perf_counter()
+
+    def run(stage: Stage) -> StageResult:
+        started = time.perf_counter() - t0
+        cache = stage.cache(root) if use_cache else None
+        if cache is not None and cache.is_fresh():
+            return StageResult(stage.name, "cached", time.perf_counter() - t0 - started, started)
+        entry = stage.entry_point(root)
+        lock = PYPLOT_LOCK if stage.uses_pyplot else None
+        if lock:
+            lock.acquire()
+        try:
+            tick = time.perf_counter()
+            entry()
+            seconds = time.perf_counter() - tick
+            if cache is not None:
+                cache.commit()
+            return StageResult(stage.name, "ok", seconds, started)
+        finally:
+            if lock:
+                lock.release()
+
+    with in_memory_artifacts(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running: dict[Future, str] = {}
+        pending = [s.name for s in stages]
+        while pending or running:
+            for name in list(pending):
+                failed = [d for d in required[name] if d in results and results[d].status not in ("ok", "cached")]
+                if failed:
+                    results[name] = StageResult(name, "skipped", error=f"upstream failed: {', '.join(sorted(failed))}")
+                    pending.remove(name)
+                    log(f"[skip] {name} ({results[name].error})")
+                elif all(d in results for d in deps[name]):
+                    pending.remove(name)
+                    log(f"[start] {name}")
+                    running[pool.submit(run, by_name[name])] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    log(f"[{'cached' if results[name].status == 'cached' else 'done'}] {name} in {results[name].seconds:.1f}s")
+                except (Exception, SystemExit) as exc:
+                    results[name] = StageResult(name, "failed", error=f"{type(exc).__name__}: {exc}")
+                    log(f"[fail] {name}: {results[name].error}")
+    return [results[s.name] for s in stages]
@@ -0,0 +1,134 @@
+# Persistent UMAP reductions keyed by (embedding content, UMAP parameters).
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from utils.path_utils import project_root
+
+
+# BERTopic's default UMAP settings, spelled out so they become part of the cache key.
+UMAP_PARAMS = {"n_neighbors": 15, "n_components": 5, "min_dist": 0.0, "metric": "cosine", "low_memory": False}
+
+
+def reduction_cache_dir() -> Path:
+    return project_root() / "models" / "reduction_cache"
+
+
+def array_fingerprint(x: np.ndarray, block_rows: int = 65536) -> str:
+    """SHA-256 of a float32 matrix (shape + contents), hashed block by block."""
+    digest = hashlib.sha256(f"{x.shape}".encode("ascii"))
+    for start in range(0, len(x), block_rows):
+        digest.update(np.ascontiguousarray(x[start : start + block_rows], dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def reduction_key(fingerprint: str, params: dict) -> str:
+    payload = json.dumps({"embeddings": fingerprint, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+class CachedUMAP:
+    """
+    Drop-in `umap_model` for BERTopic that stores the reduced embeddings on disk.
+
+    `fit(X)` looks up `models/reduction_cache/<key>.npy`, where the key hashes the contents
+    of X and the UMAP parameters. On a hit UMAP is not run (or even imported). `transform(X)`
+    on the fitted embeddings returns the stored reduction, so re-clustering the same
+    embeddings with other HDBSCAN or `nr_topics` settings skips dimensionality reduction.
+    The fitted UMAP model is saved next to the reduction (`<key>.umap.joblib`) and loaded
+    the first time unseen embeddings are transformed.
+    """
+
+    def __init__(self, cache_dir: Path | None = None, **params) -> None:
+        self.cache_dir = Path(cache_dir or reduction_cache_dir())
+        self.params = {**UMAP_PARAMS, **params}
+        self.embedding_: np.ndarray | None = None
+        self.model_ = None
+        self.cache_hit: bool | None = None
+        self.path: Path | None = None
+        self.model_path: Path | None = None
+        self._fingerprint: str | None = None
+        self._fit_input = None
+
+    def _paths(self, key: str) -> tuple[Path, Path, Path]:
+        return self.cache_dir / f"{key}.npy", self.cache_dir / f"{key}.umap.joblib", self.cache_dir / f"{key}.json"
+
+    def fit(self, X, y=None) -> "CachedUMAP":
+        X = np.asarray(X)
+        self._fingerprint = array_fingerprint(X)
+        self._fit_input = X
+        data_path, model_path, meta_path = self._paths(reduction_key(self._fingerprint, self.params))
+        self.path = data_path
+        self.model_path = model_path
+        # The descriptor is written last, so a present .json means a complete reduction.
+        if meta_path.exists() and data_path.exists():
+            self.embedding_ = np.load(data_path)
+            self.model_ = None
+            self.cache_hit = True
+            return self
+
+        from umap import UMAP
+
+        t0 = time.perf_counter()
+        self.model_ = UMAP(**self.params).fit(X, y=y)
+        self.embedding_ = np.asarray(self.model_.embedding_, dtype=np.float32)
+        self.cache_hit = False
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = data_path.with_name(data_path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.save(f, self.embedding_)
+        os.replace(tmp, data_path)
+        self._save_model(model_path)
+        meta = {
+            "embeddings_sha256": self._fingerprint,
+            "params": self.params,
+            "rows": int(X.shape[0]),
+            "input_dim": int(X.shape[1]),
+            "seconds": round(time.perf_counter() - t0, 3),
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        tmp = meta_path.with_name(meta_path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, meta_path)
+        return self
+
+    def _save_model(self, path: Path) -> None:
+        import joblib
+
+        tmp = path.with_name(path.name + ".tmp")
+        joblib.dump(self.model_, tmp)
+        os.replace(tmp, path)
+
+    def _load_model(self):
+        if self.model_ is None:
+            if self.model_path is None or not self.model_path.exists():
+                raise ValueError(
+                    f"No fitted UMAP model stored for the cached reduction {self.path}; it predates "
+                    "model persistence. Delete it and re-fit to transform unseen embeddings."
+                )
+            import joblib
+
+            self.model_ = joblib.load(self.model_path)
+        return self.model_
+
+    def transform(self, X) -> np.ndarray:
+        if X is self._fit_input:
+            return self.embedding_
+        X = np.asarray(X)
+        if self.embedding_ is not None and len(X) == len(self.embedding_) and array_fingerprint(X) == self._fingerprint:
+            return self.embedding_
+        return np.asarray(self._load_model().transform(X), dtype=np.float32)
+
+    def fit_transform(self, X, y=None) -> np.ndarray:
+        return self.fit(X, y=y).embedding_
+
+    def __getstate__(self) -> dict:
+        # Do not pickle the (large) training embeddings with a saved BERTopic model.
+        return {**self.__dict__, "_fit_input": None}
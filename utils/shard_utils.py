@@ -0,0 +1,123 @@
+# Size-bounded CSV shards with an atomic manifest for streaming raw records.
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def load_manifest(shard_dir: Path) -> dict:
+    path = shard_dir / MANIFEST_NAME
+    if not path.exists():
+        return {"shards": []}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(shard_dir: Path, manifest: dict) -> None:
+    path = shard_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ShardWriter:
+    """
+    Buffer records and write them as numbered CSV shards of at most `max_rows` rows.
+
+    Each shard is written to a temporary file and renamed into place before the
+    manifest is updated, so readers only ever see complete shards. Files that are
+    not listed in the manifest (left behind by a crash) are removed on start-up.
+    """
+
+    def __init__(self, shard_dir: Path, max_rows: int = 50000, prefix: str = "part") -> None:
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max(1, max_rows)
+        self.prefix = prefix
+        self.manifest = load_manifest(self.shard_dir)
+        self._buffer: list[dict] = []
+        self._remove_orphans()
+
+    def _remove_orphans(self) -> None:
+        listed = {s["file"] for s in self.manifest["shards"]}
+        for path in self.shard_dir.glob(f"{self.prefix}-*.csv*"):
+            if path.name not in listed:
+                path.unlink()
+
+    def reset(self) -> None:
+        """Drop every shard and start an empty store."""
+        self._buffer = []
+        self.manifest = {"shards": []}
+        _write_manifest(self.shard_dir, self.manifest)
+        self._remove_orphans()
+
+    @property
+    def buffered_rows(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(s["rows"] for s in self.manifest["shards"]) + len(self._buffer)
+
+    def would_overflow(self, n_rows: int) -> bool:
+        return bool(self._buffer) and len(self._buffer) + n_rows > self.max_rows
+
+    def add(self, records: list[dict]) -> None:
+        self._buffer.extend(records)
+        while len(self._buffer) >= self.max_rows:
+            self._write_shard(self._buffer[: self.max_rows])
+            self._buffer = self._buffer[self.max_rows :]
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_shard(self._buffer)
+            self._buffer = []
+
+    def _write_shard(self, records: list[dict]) -> None:
+        index = max((int(s["file"].split("-")[1].split(".")[0]) for s in self.manifest["shards"]), default=-1) + 1
+        name = f"{self.prefix}-{index:05d}.csv"
+        df = pd.DataFrame(records)
+        tmp = self.shard_dir / f"{name}.tmp"
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, self.shard_dir / name)
+
+        ids = df["arxiv_id"].astype(str) if "arxiv_id" in df.columns else pd.Series(dtype=str)
+        self.manifest["shards"].append(
+            {
+                "file": name,
+                "rows": int(len(df)),
+                "min_id": ids.min() if len(ids) else None,
+                "max_id": ids.max() if len(ids) else None,
+                "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+        )
+        self.manifest["total_rows"] = sum(s["rows"] for s in self.manifest["shards"])
+        _write_manifest(self.shard_dir, self.manifest)
+
+
+def iter_shards(
+    shard_dir: Path, columns: list[str] | None = None, chunksize: int | None = None
+) -> Iterator[pd.DataFrame]:
+    """Lazily yield the shards listed in the manifest, optionally split into `chunksize` rows."""
+    for shard in load_manifest(shard_dir)["shards"]:
+        path = Path(shard_dir) / shard["file"]
+        if chunksize:
+            yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+        else:
+            yield pd.read_csv(path, usecols=columns)
+
+
+def has_shards(shard_dir: Path) -> bool:
+    return (Path(shard_dir) / MANIFEST_NAME).exists()
+
+
+def shard_signature(shard_dir: Path) -> dict:
+    """The committed shards (file and row count) listed in the manifest."""
+    return {"shards": [[s["file"], s["rows"]] for s in load_manifest(Path(shard_dir))["shards"]]}
@@ -0,0 +1,153 @@
+# Content-fingerprinted stage cache: skip work only when inputs, parameters and code are unchanged.
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from utils.path_utils import project_root
+from utils.storage_utils import file_sha256, resolve_table
+
+
+MANIFEST_VERSION = 1
+_manifests: dict[Path, "CacheManifest"] = {}
+_manifests_lock = threading.Lock()
+
+
+def default_manifest_path() -> Path:
+    return project_root() / "results" / "stage_manifest.json"
+
+
+def code_paths(*scripts: Path) -> list[Path]:
+    """Code that defines a stage: its script(s) plus the shared utils package."""
+    return [Path(s) for s in scripts] + [project_root() / "utils"]
+
+
+class CacheManifest:
+    """
+    JSON manifest of stage fingerprints and of file content hashes.
+
+    File hashes are memoized by (size, mtime), so unchanged multi-GB inputs such as
+    embeddings are hashed once rather than on every run. Writes are atomic.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self.data = {"version": MANIFEST_VERSION, "stages": {}, "files": {}}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            if loaded.get("version") == MANIFEST_VERSION:
+                self.data = loaded
+
+    def save(self) -> None:
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".json.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def file_hash(self, path: Path) -> str:
+        path = Path(path).resolve()
+        stat = path.stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        with self.lock:
+            known = self.data["files"].get(str(path))
+            if known and known["stamp"] == stamp:
+                return known["sha256"]
+        digest = file_sha256(path)
+        with self.lock:
+            self.data["files"][str(path)] = {"stamp": stamp, "sha256": digest}
+        return digest
+
+    def artifact_hash(self, path: Path) -> str:
+        """Content hash of a file, a directory tree, or a logical table (`name` -> .parquet/.csv)."""
+        path = Path(path)
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts):
+                digest.update(str(child.relative_to(path)).encode("utf-8"))
+                digest.update(self.file_hash(child).encode("ascii"))
+            return digest.hexdigest()
+        if path.is_file():
+            return self.file_hash(path)
+        table = resolve_table(path) if path.suffix in ("", ".parquet", ".csv") else None
+        if table is not None:
+            return self.file_hash(table)
+        return "missing"
+
+
+def manifest(path: Path | None = None) -> CacheManifest:
+    """Shared manifest instance per file, so concurrent stages update one object."""
+    path = Path(path or default_manifest_path()).resolve()
+    with _manifests_lock:
+        if path not in _manifests:
+            _manifests[path] = CacheManifest(path)
+        return _manifests[path]
+
+
+class StageCache:
+    """
+    Fingerprint of one stage = hash(input contents, parameters, code contents).
+
+    `is_fresh()` is true only when the recorded fingerprint matches and every output still
+    exists with the content recorded at `commit()`. Because inputs are hashed by content,
+    re-running an upstream stage that changes its outputs invalidates downstream stages.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inputs: list[Path],
+        outputs: list[Path],
+        params: dict | None = None,
+        code: list[Path] | None = None,
+        manifest_path: Path | None = None,
+    ) -> None:
+        self.name = name
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params or {}
+        self.code = [Path(p) for p in (code or [])]
+        self.manifest = manifest(manifest_path)
+
+    def _key(self, path: Path) -> str:
+        try:
+            return str(path.resolve().relative_to(project_root()))
+        except ValueError:
+            return str(path)
+
+    def fingerprint(self) -> str:
+        payload = {
+            "inputs": {self._key(p): self.manifest.artifact_hash(p) for p in self.inputs},
+            "params": self.params,
+            "code": {self._key(p): self.manifest.artifact_hash(p) for p in self.code},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def is_fresh(self) -> bool:
+        with self.manifest.lock:
+            entry = self.manifest.data["stages"].get(self.name)
+        if not entry or entry["fingerprint"] != self.fingerprint():
+            return False
+        return all(self.manifest.artifact_hash(p) == entry["outputs"].get(self._key(p)) for p in self.outputs)
+
+    def commit(self) -> None:
+        """Record the current fingerprint and output hashes after the stage has produced its outputs."""
+        entry = {
+            "fingerprint": self.fingerprint(),
+            "params": self.params,
+            "outputs": {self._key(p): self.manifest.artifact_hash(p) for p in self.outputs},
+            "updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        with self.manifest.lock:
+            self.manifest.data["stages"][self.name] = entry
+        self.manifest.save()
+
+    def invalidate(self) -> None:
+        with self.manifest.lock:
+            self.manifest.data["stages"].pop(self.name, None)
+        self.manifest.save()
@@ -0,0 +1,275 @@
+# Columnar (Parquet) storage for processed papers and analysis results.
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+CATEGORICAL_COLUMNS = ["primary_category", "source_query", "nasa_goal"]
+INTEGER_COLUMNS = {"year": "int16", "topic": "int32", "topic_id": "int32", "text_word_count": "int32"}
+COMPRESSION = "zstd"
+
+# In-process artifact memo, active only inside `in_memory_artifacts()` (used by the pipeline runner).
+_memory: dict | None = None
+_memory_lock = threading.Lock()
+
+
+@contextmanager
+def in_memory_artifacts() -> Iterator[None]:
+    """
+    Keep tables written or read, and arrays read, inside the block in memory.
+    Later reads of the same artifact are served without touching disk; writes still go to disk.
+    """
+    global _memory
+    previous, _memory = _memory, {}
+    try:
+        yield
+    finally:
+        _memory = previous
+
+
+def _memo_key(path: Path) -> str:
+    return str(Path(path).resolve().with_suffix(""))
+
+
+def _remember(path: Path, value, variant=None) -> None:
+    if _memory is None:
+        return
+    with _memory_lock:
+        if variant is None:
+            # A full write or read supersedes every projected copy of the artifact.
+            for key in [k for k in _memory if k[0] == _memo_key(path)]:
+                del _memory[key]
+        _memory[(_memo_key(path), variant)] = value
+
+
+def _recall(path: Path, variant=None):
+    if _memory is None:
+        return None
+    with _memory_lock:
+        return _memory.get((_memo_key(path), variant))
+
+
+def csv_export_enabled() -> bool:
+    """CSV copies are written next to Parquet files unless PIPELINE_EXPORT_CSV=0."""
+    return os.environ.get("PIPELINE_EXPORT_CSV", "1") != "0"
+
+
+def _candidates(path: Path) -> list[Path]:
+    path = Path(path)
+    return [path.with_suffix(".parquet"), path.with_suffix(".csv")]
+
+
+def resolve_table(path: Path) -> Path | None:
+    """
+    Return the file backing a logical table path, or None.
+    Parquet is preferred; the CSV copy is read only when no Parquet file exists or when
+    `path` names the .csv file explicitly.
+    """
+    path = Path(path)
+    candidates = _candidates(path)
+    if path.suffix == ".csv":
+        candidates.reverse()
+    return next((p for p in candidates if p.exists()), None)
+
+
+def table_exists(path: Path) -> bool:
+    return resolve_table(path) is not None
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) and not df[col].isna().any():
+            df[col] = df[col].astype(dtype)
+    for col in CATEGORICAL_COLUMNS:
+        # Stored as dictionary-encoded strings so chunked writes share one schema.
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_stamp(path: Path) -> dict:
+    """Size and mtime of a file: a cheap change check before hashing its contents."""
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def source_is_current(meta: dict, source: Path) -> bool:
+    """
+    True when `meta` (the "sha256" and "stamp" recorded for a file) still describes `source`.
+    The hash is only recomputed when the stamp changed; if the contents still match,
+    `meta["stamp"]` is refreshed in place for the caller to persist.
+    """
+    stamp = source_stamp(source)
+    if meta.get("stamp") == stamp:
+        return True
+    if meta.get("sha256") != file_sha256(source):
+        return False
+    meta["stamp"] = stamp
+    return True
+
+
+def table_columns(path: Path) -> list[str]:
+    """Column names of a logical table, read from the Parquet schema or CSV header only."""
+    source = resolve_table(path)
+    if source is None:
+        raise FileNotFoundError(f"Missing table: {Path(path).with_suffix('.parquet')} or .csv")
+    if source.suffix == ".csv":
+        return pd.read_csv(source, nrows=0).columns.tolist()
+    return pq.read_schema(source).names
+
+
+def read_table(
+    path: Path,
+    columns: list[str] | None = None,
+    dtypes: dict | None = None,
+    dtype_backend: str | None = None,
+) -> pd.DataFrame:
+    """
+    Read a logical table (`name.parquet` or `name.csv`) with optional column projection.
+    Low-cardinality text columns come back as pandas categoricals from Parquet.
+    With dtype_backend="pyarrow" the frame is Arrow-backed and Parquet files are memory-mapped.
+    """
+    full = _recall(path)
+    if full is not None and dtype_backend is None:
+        df = full if columns is None else full[columns]
+        return df.astype(dtypes) if dtypes else df.copy()
+    variant = (tuple(columns) if columns is not None else None, dtype_backend)
+    cached = _recall(path, variant)
+    if cached is not None:
+        return cached.astype(dtypes) if dtypes else cached.copy()
+
+    source = resolve_table(path)
+    if source is None:
+        raise FileNotFoundError(f"Missing table: {Path(path).with_suffix('.parquet')} or .csv")
+    if source.suffix == ".csv":
+        if dtype_backend == "pyarrow":
+            df = pd.read_csv(source, usecols=columns, engine="pyarrow", dtype_backend="pyarrow")
+        else:
+            df = pd.read_csv(source, usecols=columns, dtype=dtypes)
+            dtypes = None
+    else:
+        schema_names = pq.read_schema(source).names
+        dictionary = [c for c in CATEGORICAL_COLUMNS if c in schema_names and (columns is None or c in columns)]
+        if dtype_backend == "pyarrow":
+            table = pq.read_table(source, columns=columns, memory_map=True)
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            df = pq.read_table(source, columns=columns, read_dictionary=dictionary).to_pandas()
+    if columns is not None:
+        df = df[columns]
+    _remember(path, df, None if variant == (None, None) else variant)
+    return df.astype(dtypes) if dtypes else df.copy()
+
+
+def write_table(df: pd.DataFrame, path: Path, csv: bool | None = None) -> Path:
+    """
+    Write a typed, compressed Parquet table and, optionally, a CSV copy.
+    Returns the Parquet path.
+    """
+    target = Path(path).with_suffix(".parquet")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # The CSV copy is written first so the Parquet file is never older than it.
+    if csv if csv is not None else csv_export_enabled():
+        df.to_csv(target.with_suffix(".csv"), index=False)
+    tmp = target.with_suffix(".parquet.tmp")
+    typed = _typed(df)
+    typed.to_parquet(tmp, index=False, compression=COMPRESSION)
+    os.replace(tmp, target)
+    if _memory is not None:
+        for col in CATEGORICAL_COLUMNS:
+            if col in typed.columns:
+                typed[col] = typed[col].astype("category")
+        _remember(target, typed.reset_index(drop=True))
+    return target
+
+
+def load_array(path: Path, mmap_mode: str | None = None) -> np.ndarray:
+    """np.load with the in-process artifact memo; memoized arrays are returned read-only."""
+    cached = _recall(path)
+    if cached is not None:
+        return cached
+    array = np.load(path, mmap_mode=mmap_mode)
+    if _memory is not None:
+        array.setflags(write=False)
+        _remember(path, array)
+    return array
+
+
+class TableWriter:
+    """
+    Append DataFrame chunks to one Parquet file (plus an optional CSV copy).
+    Output goes to temporary files that replace the targets on `close()`.
+    """
+
+    def __init__(self, path: Path, csv: bool | None = None) -> None:
+        self.target = Path(path).with_suffix(".parquet")
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        self.csv = csv_export_enabled() if csv is None else csv
+        self._tmp = self.target.with_suffix(".parquet.tmp")
+        self._csv_tmp = self.target.with_suffix(".csv.tmp")
+        self._writer: pq.ParquetWriter | None = None
+        self._csv_handle = self._csv_tmp.open("w", encoding="utf-8", newline="") if self.csv else None
+        self._columns_only: pd.DataFrame | None = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._csv_handle is not None:
+            df.to_csv(self._csv_handle, index=False, header=self._writer is None and self._columns_only is None)
+        if df.empty:
+            # Empty chunks carry no reliable column types; keep them only as a schema fallback.
+            if self._columns_only is None:
+                self._columns_only = df
+            return
+        table = pa.Table.from_pandas(_typed(df), preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._tmp, table.schema, compression=COMPRESSION)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._csv_handle is not None:
+            self._csv_handle.close()
+            os.replace(self._csv_tmp, self.target.with_suffix(".csv"))
+        if self._writer is None and self._columns_only is not None:
+            _typed(self._columns_only).to_parquet(self._tmp, index=False, compression=COMPRESSION)
+            os.replace(self._tmp, self.target)
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._tmp, self.target)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._csv_handle is not None:
+            self._csv_handle.close()
+        for tmp in (self._tmp, self._csv_tmp):
+            if tmp.exists():
+                tmp.unlink()
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,215 @@
+# Pre-tokenized corpus: one token-id array plus document offsets, with vocabulary and document frequencies.
+import json
+import os
+import shutil
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.data_utils import dataset_path, load_main_or_sample
+from utils.path_utils import token_corpus_dir
+from utils.storage_utils import file_sha256, load_array, read_table, source_is_current, source_stamp, write_table
+
+
+CORPUS_VERSION = 1
+TOKENIZER = "whitespace"
+
+
+def _grow(counts: np.ndarray, size: int) -> np.ndarray:
+    return counts if len(counts) >= size else np.concatenate([counts, np.zeros(size - len(counts), dtype=counts.dtype)])
+
+
+class TokenCorpus:
+    """
+    Whitespace-tokenized documents (`text.split()`) as int32 token ids into `vocabulary`,
+    with `offsets[i]:offsets[i + 1]` spanning document i.
+
+    Token ids are assigned in the order gensim's `Dictionary` assigns them (documents in
+    order, each document's new tokens sorted), so ids and `doc_freq` equal those of
+    `Dictionary(texts)`. After `load()` the id array is memory-mapped.
+    """
+
+    def __init__(
+        self,
+        token_ids: np.ndarray,
+        offsets: np.ndarray,
+        vocabulary: np.ndarray,
+        doc_freq: np.ndarray,
+        term_freq: np.ndarray,
+        meta: dict | None = None,
+    ) -> None:
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.doc_freq = doc_freq
+        self.term_freq = term_freq
+        self.meta = meta or {}
+        self._index: pd.Index | None = None
+
+    @classmethod
+    def build(cls, texts: Iterable[str], block_size: int = 20_000, **meta) -> "TokenCorpus":
+        """Tokenize `texts` block by block; only one block of Python token lists exists at a time."""
+        vocab: dict[str, int] = {}
+        id_blocks, lengths = [], []
+        doc_freq = np.zeros(0, dtype=np.int64)
+        term_freq = np.zeros(0, dtype=np.int64)
+        texts = iter(texts)
+        while True:
+            block = [t.split() if isinstance(t, str) else [] for t in islice(texts, block_size)]
+            if not block:
+                break
+            block_lengths = np.fromiter(map(len, block), dtype=np.int64, count=len(block))
+            codes, uniques = pd.factorize(pd.Series(list(chain.from_iterable(block)), dtype=object), sort=False)
+            docs = np.repeat(np.arange(len(block)), block_lengths)
+
+            # New tokens get ids by (first document, token), matching gensim's doc2bow.
+            first_doc = np.full(len(uniques), len(block), dtype=np.int64)
+            np.minimum.at(first_doc, codes, docs)
+            known = np.fromiter((vocab.get(u, -1) for u in uniques), dtype=np.int64, count=len(uniques))
+            new = np.flatnonzero(known < 0)
+            new = new[np.lexsort((np.asarray(uniques, dtype=object)[new].astype(str), first_doc[new]))]
+            known[new] = np.arange(len(vocab), len(vocab) + len(new))
+            vocab.update(zip(np.asarray(uniques, dtype=object)[new].tolist(), known[new].tolist()))
+
+            ids = known[codes]
+            doc_freq = _grow(doc_freq, len(vocab))
+            term_freq = _grow(term_freq, len(vocab))
+            term_freq += np.bincount(ids, minlength=len(vocab))
+            pairs = np.unique(docs * len(uniques) + codes)
+            doc_freq += np.bincount(known[pairs % max(len(uniques), 1)], minlength=len(vocab))
+            id_blocks.append(ids.astype(np.int32))
+            lengths.append(block_lengths)
+
+        token_ids = np.concatenate(id_blocks) if id_blocks else np.zeros(0, dtype=np.int32)
+        lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        return cls(token_ids, offsets, np.array(list(vocab), dtype=object), doc_freq, term_freq, meta)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def num_tokens(self) -> int:
+        return int(self.offsets[-1])
+
+    def document(self, i: int) -> np.ndarray:
+        return self.token_ids[self.offsets[i] : self.offsets[i + 1]]
+
+    def tokens(self, i: int) -> list[str]:
+        return self.vocabulary[self.document(i)].tolist()
+
+    def lookup(self, words: list[str]) -> np.ndarray:
+        """Token ids of `words`, -1 for words not in the vocabulary."""
+        if self._index is None:
+            self._index = pd.Index(self.vocabulary)
+        return self._index.get_indexer(list(words))
+
+    def filter_extremes(self, no_below: int = 5, no_above: float = 0.5, keep_n: int | None = 100000) -> set[str]:
+        """Tokens kept by gensim's `Dictionary.filter_extremes` with the same arguments."""
+        limit = int(no_above * len(self))
+        good = np.flatnonzero((self.doc_freq >= no_below) & (self.doc_freq <= limit))
+        good = good[np.argsort(-self.doc_freq[good], kind="stable")]
+        if keep_n is not None:
+            good = good[:keep_n]
+        return set(self.vocabulary[good].tolist())
+
+    def save(self, path: Path) -> Path:
+        """Write the corpus directory next to `path` and rename it into place."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "token_ids.npy", self.token_ids)
+        np.save(tmp / "offsets.npy", self.offsets)
+        vocabulary = pd.DataFrame(
+            {"token": self.vocabulary.astype(str), "doc_freq": self.doc_freq, "term_freq": self.term_freq}
+        )
+        write_table(vocabulary, tmp / "vocabulary.parquet", csv=False)
+        with (tmp / "meta.json").open("w", encoding="utf-8") as f:
+            meta = {"version": CORPUS_VERSION, "tokenizer": TOKENIZER, "documents": len(self), **self.meta}
+            json.dump({**meta, "tokens": self.num_tokens, "vocabulary": len(self.vocabulary)}, f, indent=2)
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "TokenCorpus":
+        path = Path(path)
+        with (path / "meta.json").open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+        token_ids = load_array(path / "token_ids.npy", mmap_mode="r" if mmap else None)
+        offsets = load_array(path / "offsets.npy")
+        vocabulary = read_table(path / "vocabulary.parquet")
+        return cls(
+            token_ids,
+            offsets,
+            vocabulary["token"].to_numpy(dtype=object),
+            vocabulary["doc_freq"].to_numpy(dtype=np.int64),
+            vocabulary["term_freq"].to_numpy(dtype=np.int64),
+            meta,
+        )
+
+
+def _stamp_path(path: Path) -> Path:
+    # Kept outside the corpus directory so refreshing it never changes the stage's outputs.
+    path = Path(path)
+    return path.parent / ".cache" / f"{path.name}.stamp.json"
+
+
+def _write_stamp(path: Path, stamp: dict) -> None:
+    target = _stamp_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    os.replace(tmp, target)
+
+
+def corpus_is_current(path: Path, source: Path) -> bool:
+    """
+    True when the corpus at `path` was built from the current contents of `source`. The
+    source's size/mtime stamp lives in a sidecar next to the corpus and is refreshed there
+    when only the stamp changed, so the corpus directory itself stays untouched.
+    """
+    meta_path = Path(path) / "meta.json"
+    if not meta_path.exists():
+        return False
+    with meta_path.open("r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != CORPUS_VERSION or meta.get("source") != source.name:
+        return False
+    stamp_path = _stamp_path(path)
+    if stamp_path.exists():
+        with stamp_path.open("r", encoding="utf-8") as f:
+            recorded = json.load(f)
+    else:
+        recorded = meta.get("stamp")
+    check = {"sha256": meta["sha256"], "stamp": recorded}
+    if not source_is_current(check, source):
+        return False
+    if check["stamp"] != recorded or not stamp_path.exists():
+        _write_stamp(path, check["stamp"])
+    return True
+
+
+def build_token_corpus(path: Path | None = None) -> TokenCorpus:
+    """Tokenize the dataset's `text` column and save the corpus (default: data/processed/tokens)."""
+    source = dataset_path()
+    texts = load_main_or_sample(columns=["text"])["text"]
+    stamp = source_stamp(source)
+    corpus = TokenCorpus.build(texts, source=source.name, sha256=file_sha256(source))
+    path = corpus.save(path or token_corpus_dir())
+    _write_stamp(path, stamp)
+    return corpus
+
+
+def load_token_corpus(path: Path | None = None) -> TokenCorpus:
+    """The saved token corpus, memory-mapped; it is rebuilt first if the dataset has changed."""
+    path = Path(path or token_corpus_dir())
+    if not corpus_is_current(path, dataset_path()):
+        build_token_corpus(path)
+    return TokenCorpus.load(path)
@@ -0,0 +1,239 @@
+# Model-free topic artifact: words/weights, sizes, sparse c-TF-IDF and centroids.
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.embedding_matrix import centroid_distances, normalize_rows, topic_centroids
+from utils.storage_utils import read_table, write_table
+
+
+ARTIFACT_VERSION = 1
+# Per-topic cut-off for online assignment: this quantile of member-to-centroid cosine distances.
+ASSIGNMENT_QUANTILE = 0.95
+
+
+def distance_cutoffs(
+    embeddings, labels: np.ndarray, topic_ids: list[int], centroids: np.ndarray, block_size: int = 65536
+) -> np.ndarray:
+    """
+    Assignment cut-off per topic (`topic_ids` sorted, rows of `centroids`): the
+    ASSIGNMENT_QUANTILE of its members' cosine distance to the centroid.
+    """
+    labels = np.asarray(labels)
+    clustered, _ = centroid_distances(embeddings, labels, topic_ids, centroids, block_size=block_size)
+    quantiles = pd.Series(clustered).groupby(labels[labels != -1]).quantile(ASSIGNMENT_QUANTILE)
+    return quantiles.reindex(topic_ids).to_numpy(dtype=np.float32)
+
+
+def assign_to_centroids(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    centroid_ids: list[int],
+    max_distance: float | np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest-centroid topic for each vector, or -1 when its cosine distance exceeds
+    `max_distance` (a scalar or one cut-off per centroid). Returns (topics, distances).
+    """
+    sims = normalize_rows(vectors) @ normalize_rows(centroids).T
+    nearest = sims.argmax(axis=1)
+    distances = 1 - sims[np.arange(len(nearest)), nearest]
+    topics = np.asarray(centroid_ids)[nearest]
+    if max_distance is not None:
+        limit = np.asarray(max_distance)[nearest] if np.ndim(max_distance) else max_distance
+        topics = np.where(distances <= limit, topics, -1)
+    return topics, distances
+
+
+def rejection_rate(
+    embeddings,
+    centroids: np.ndarray,
+    centroid_ids: list[int],
+    thresholds: float | np.ndarray,
+    num_rows: int | None = None,
+    block_size: int = 65536,
+) -> float:
+    """
+    Share of `embeddings` (array or EmbeddingMatrix; the first `num_rows` rows when given)
+    that `assign_to_centroids` with `thresholds` sends to -1. On the fitted corpus this is
+    the baseline that drift in newly assigned papers is measured against.
+    """
+    num_rows = len(embeddings) if num_rows is None else min(num_rows, len(embeddings))
+    if not num_rows:
+        return 0.0
+    rejected = 0
+    for start in range(0, num_rows, block_size):
+        block = embeddings[start : min(start + block_size, num_rows)]
+        rejected += int((assign_to_centroids(block, centroids, centroid_ids, thresholds)[0] == -1).sum())
+    return rejected / num_rows
+
+
+def export_topic_artifact(topic_model, topics: list[int], embeddings: np.ndarray, out_dir: Path, **meta) -> Path:
+    """
+    Write everything downstream stages read from a fitted BERTopic model.
+
+    Only attributes of the fitted model are used, so this module never imports BERTopic.
+    Centroids are the mean document embedding per final topic; `distance_p95` in topics.parquet
+    is the 95th percentile of members' cosine distance to their centroid. meta.json records the
+    share of fitted documents those cut-offs reject (`assignment_rejection_rate`). The directory
+    is written next to `out_dir` and renamed into place, so readers never see a partial artifact.
+    """
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    topic_words = topic_model.get_topics()
+    topic_ids = sorted(topic_words)
+    rows = [
+        {"topic": t, "rank": rank, "word": word, "weight": float(weight)}
+        for t in topic_ids
+        for rank, (word, weight) in enumerate(topic_words[t])
+    ]
+    write_table(pd.DataFrame(rows, columns=["topic", "rank", "word", "weight"]), tmp / "topic_words.parquet", csv=False)
+
+    topics = np.asarray(topics)
+    centroid_ids = [t for t in topic_ids if t != -1]
+    centroids = topic_centroids(embeddings, topics, centroid_ids)
+    cutoffs = distance_cutoffs(embeddings, topics, centroid_ids, centroids)
+    np.save(tmp / "centroids.npy", centroids)
+    thresholds = dict(zip(centroid_ids, cutoffs.tolist()))
+
+    sizes = pd.Series(topics).value_counts()
+    info = topic_model.get_topic_info().set_index("Topic")
+    summary = pd.DataFrame(
+        {
+            "topic": topic_ids,
+            "size": [int(sizes.get(t, 0)) for t in topic_ids],
+            "name": [str(info["Name"].get(t, f"Topic {t}")) for t in topic_ids],
+            "distance_p95": [thresholds.get(t, np.nan) for t in topic_ids],
+        }
+    )
+    write_table(summary, tmp / "topics.parquet", csv=False)
+
+    sparse.save_npz(tmp / "c_tf_idf.npz", sparse.csr_matrix(topic_model.c_tf_idf_))
+    vocabulary = topic_model.vectorizer_model.get_feature_names_out()
+    write_table(pd.DataFrame({"word": vocabulary}), tmp / "vocabulary.parquet", csv=False)
+
+    with (tmp / "meta.json").open("w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": ARTIFACT_VERSION,
+                "topic_ids": topic_ids,
+                "centroid_topic_ids": centroid_ids,
+                "num_documents": int(len(topics)),
+                "assignment_rejection_rate": rejection_rate(embeddings, centroids, centroid_ids, cutoffs),
+                **meta,
+            },
+            f,
+            indent=2,
+        )
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return out_dir
+
+
+class TopicArtifact:
+    """
+    Read-only view of an exported topic artifact.
+    `get_topic()` mirrors `BERTopic.get_topic()`; heavy parts (c-TF-IDF, centroids) load lazily.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        if not (self.path / "meta.json").exists():
+            raise FileNotFoundError(f"Missing topic artifact: {self.path}")
+        with (self.path / "meta.json").open("r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.topics = read_table(self.path / "topics.parquet")
+        self._words: pd.DataFrame | None = None
+        self._c_tf_idf: sparse.csr_matrix | None = None
+        self._vocabulary: np.ndarray | None = None
+        self._centroids: np.ndarray | None = None
+
+    @property
+    def topic_ids(self) -> list[int]:
+        """Topic ids without the outlier topic (-1)."""
+        return [t for t in self.meta["topic_ids"] if t != -1]
+
+    @property
+    def sizes(self) -> dict[int, int]:
+        return dict(zip(self.topics["topic"].tolist(), self.topics["size"].tolist()))
+
+    @property
+    def words(self) -> pd.DataFrame:
+        if self._words is None:
+            self._words = read_table(self.path / "topic_words.parquet").sort_values(["topic", "rank"])
+        return self._words
+
+    def get_topic(self, topic_id: int, top_n: int | None = None) -> list[tuple[str, float]]:
+        rows = self.words[self.words["topic"] == topic_id]
+        if top_n is not None:
+            rows = rows.head(top_n)
+        return list(zip(rows["word"].tolist(), rows["weight"].tolist()))
+
+    def topic_words(self, top_n: int | None = None) -> dict[int, list[str]]:
+        """Word lists for every non-outlier topic."""
+        return {t: [w for w, _ in self.get_topic(t, top_n)] for t in self.topic_ids}
+
+    @property
+    def c_tf_idf(self) -> sparse.csr_matrix:
+        """Topic x vocabulary c-TF-IDF matrix; row i belongs to `meta['topic_ids'][i]`."""
+        if self._c_tf_idf is None:
+            self._c_tf_idf = sparse.load_npz(self.path / "c_tf_idf.npz").tocsr()
+        return self._c_tf_idf
+
+    @property
+    def vocabulary(self) -> np.ndarray:
+        if self._vocabulary is None:
+            self._vocabulary = read_table(self.path / "vocabulary.parquet")["word"].to_numpy()
+        return self._vocabulary
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """Mean embedding per topic; row i belongs to `meta['centroid_topic_ids'][i]`."""
+        if self._centroids is None:
+            self._centroids = np.load(self.path / "centroids.npy")
+        return self._centroids
+
+    def centroid(self, topic_id: int) -> np.ndarray:
+        return self.centroids[self.meta["centroid_topic_ids"].index(topic_id)]
+
+    @property
+    def outlier_rate(self) -> float:
+        """Share of fitted documents in the outlier topic (-1)."""
+        return self.sizes.get(-1, 0) / max(self.meta["num_documents"], 1)
+
+    @property
+    def rejection_rate(self) -> float:
+        """
+        Share of fitted documents that `assign()` with the default cut-offs sends to -1;
+        artifacts exported before it was recorded fall back to `outlier_rate`.
+        """
+        return self.meta.get("assignment_rejection_rate", self.outlier_rate)
+
+    def assignment_thresholds(self) -> np.ndarray | None:
+        """Per-centroid cosine-distance cut-offs (aligned with `centroids`), if the artifact has them."""
+        if "distance_p95" not in self.topics.columns:
+            return None
+        by_topic = self.topics.set_index("topic")["distance_p95"]
+        return by_topic.reindex(self.meta["centroid_topic_ids"]).to_numpy(dtype=np.float32)
+
+    def assign(
+        self, vectors: np.ndarray, max_distance: float | np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest-centroid topic for each vector, or -1 when its cosine distance exceeds
+        `max_distance` (a scalar or one cut-off per centroid; default: `assignment_thresholds()`).
+        Returns (topics, distance to the nearest centroid).
+        """
+        if max_distance is None:
+            max_distance = self.assignment_thresholds()
+        return assign_to_centroids(vectors, self.centroids, self.meta["centroid_topic_ids"], max_distance)
@@ -0,0 +1,82 @@
+# Topic-quality metrics: word diversity, sampled silhouette and intra-topic embedding dispersion.
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.embedding_matrix import centroid_distances, normalize_rows, topic_centroids
+
+
+def topic_diversity(words: dict[int, list[str]], top_n: int = 10) -> tuple[float, dict[int, float]]:
+    """
+    Topic diversity (share of distinct words among every topic's `top_n` words) and, per
+    topic, its exclusivity: the share of its top words found in no other topic's top words.
+    """
+    top = {t: list(dict.fromkeys(w))[:top_n] for t, w in words.items()}
+    counts = pd.Series([w for ws in top.values() for w in ws], dtype=object).value_counts()
+    total = sum(len(ws) for ws in top.values())
+    diversity = len(counts) / total if total else float("nan")
+    exclusivity = {t: float(np.mean([counts[w] == 1 for w in ws])) if ws else float("nan") for t, ws in top.items()}
+    return diversity, exclusivity
+
+
+def dispersion(embeddings, labels: np.ndarray, topic_ids: list[int], block_size: int = 65536) -> pd.DataFrame:
+    """
+    Cosine distance of each topic's documents to the topic centroid (mean and 95th
+    percentile), from two blocked passes over `embeddings` (array or EmbeddingMatrix).
+    """
+    labels = np.asarray(labels)
+    centroids = topic_centroids(embeddings, labels, topic_ids, block_size=block_size)
+    clustered, _ = centroid_distances(embeddings, labels, topic_ids, centroids, block_size=block_size)
+    grouped = pd.Series(clustered).groupby(labels[labels != -1])
+    return pd.DataFrame(
+        {"size": grouped.size(), "dispersion_mean": grouped.mean(), "dispersion_p95": grouped.quantile(0.95)}
+    ).reindex(topic_ids)
+
+
+def silhouette_sample(
+    labels: np.ndarray, topic_ids: list[int], sample_size: int = 10000, min_per_topic: int = 50, seed: int = 0
+) -> np.ndarray:
+    """
+    Sorted row positions of a silhouette sample over clustered documents: each topic
+    contributes its share of `sample_size`, but at least `min_per_topic` documents (or all
+    of them) so that small topics still get a score.
+    """
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    clustered = int(np.isin(labels, topic_ids).sum())
+    frac = min(1.0, sample_size / max(clustered, 1))
+    picks = []
+    for t in topic_ids:
+        members = np.flatnonzero(labels == t)
+        n = min(len(members), max(min_per_topic, round(len(members) * frac)))
+        picks.append(rng.choice(members, size=n, replace=False))
+    return np.sort(np.concatenate(picks)) if picks else np.empty(0, dtype=np.int64)
+
+
+def silhouette_scores(vectors: np.ndarray, labels: np.ndarray, block_size: int = 2048) -> np.ndarray:
+    """
+    Cosine silhouette of every row of `vectors` against the other rows, as in
+    `sklearn.metrics.silhouette_samples(metric="cosine")`, without the full distance matrix:
+    each block of rows is multiplied by all rows and the similarities are summed per label
+    with a sparse one-hot product. Rows alone in their label score 0.
+    """
+    unit = normalize_rows(vectors)
+    codes, uniques = pd.factorize(np.asarray(labels))
+    counts = np.bincount(codes, minlength=len(uniques)).astype(np.float64)
+    onehot = sparse.csr_matrix((np.ones(len(codes)), (np.arange(len(codes)), codes)), shape=(len(codes), len(uniques)))
+    scores = np.zeros(len(unit), dtype=np.float64)
+    for start in range(0, len(unit), block_size):
+        block = unit[start : start + block_size]
+        own = codes[start : start + block_size]
+        rows = np.arange(len(block))
+        # Summed cosine distance from each row to every label's members.
+        dist = counts - (onehot.T @ (block @ unit.T).T).T
+        self_dist = 1.0 - np.einsum("ij,ij->i", block, block, dtype=np.float64)
+        n_own = counts[own]
+        a = (dist[rows, own] - self_dist) / np.maximum(n_own - 1, 1)
+        mean_dist = dist / counts
+        mean_dist[rows, own] = np.inf
+        b = mean_dist.min(axis=1)
+        s = (b - a) / np.maximum(a, b)
+        scores[start : start + block_size] = np.where(n_own > 1, s, 0.0)
+    return scores
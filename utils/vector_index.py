@@ -0,0 +1,204 @@
+# Cosine nearest-neighbour index over document embeddings: exact blocked search and IVF.
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.embedding_matrix import normalize_rows
+from utils.path_utils import project_root
+from utils.storage_utils import read_table, write_table
+
+
+INDEX_VERSION = 1
+
+
+def vector_index_dir() -> Path:
+    return project_root() / "models" / "vector_index"
+
+
+def _merge_topk(scores: np.ndarray, rows: np.ndarray, new_scores: np.ndarray, new_rows: np.ndarray, k: int):
+    """Merge candidate (score, row) columns into the running per-query top-k."""
+    scores = np.concatenate([scores, new_scores], axis=1)
+    rows = np.concatenate([rows, new_rows], axis=1)
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, part, axis=1)
+        rows = np.take_along_axis(rows, part, axis=1)
+    return scores, rows
+
+
+def _train_centroids(vectors: np.ndarray, nlist: int, sample: int, seed: int) -> np.ndarray:
+    from sklearn.cluster import MiniBatchKMeans
+
+    rng = np.random.default_rng(seed)
+    idx = np.sort(rng.choice(len(vectors), size=min(len(vectors), sample), replace=False))
+    kmeans = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=1, random_state=seed)
+    kmeans.fit(np.asarray(vectors[idx], dtype=np.float32))
+    return normalize_rows(kmeans.cluster_centers_)
+
+
+class VectorIndex:
+    """
+    Cosine top-k search over unit-normalized vectors with `arxiv_id` labels.
+
+    With `nlist=0` every query is scored against all vectors in blocks (exact). With
+    `nlist>0` vectors are grouped into inverted lists around k-means centroids and stored
+    list by list; a query scores only the `nprobe` lists with the closest centroids, which
+    trades recall for latency. Vectors are kept as float16 by default and memory-mapped
+    after `load()`.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        centroids: np.ndarray | None = None,
+        offsets: np.ndarray | None = None,
+        meta: dict | None = None,
+    ) -> None:
+        self.vectors = vectors
+        self.ids = np.asarray(ids)
+        self.centroids = centroids
+        self.offsets = offsets
+        self.meta = meta or {}
+        self._positions: pd.Series | None = None
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        ids: list[str],
+        nlist: int = 0,
+        dtype: str = "float16",
+        train_sample: int = 100_000,
+        seed: int = 0,
+        block_size: int = 65536,
+        **meta,
+    ) -> "VectorIndex":
+        """Normalize `vectors` and, when `nlist > 0`, train the coarse quantizer and sort rows into lists."""
+        ids = np.asarray([str(i) for i in ids], dtype=object)
+        unit = np.empty(vectors.shape, dtype=dtype)
+        for start in range(0, len(vectors), block_size):
+            unit[start : start + block_size] = normalize_rows(vectors[start : start + block_size])
+        if not nlist:
+            return cls(unit, ids, meta={"nlist": 0, "dtype": dtype, **meta})
+
+        centroids = _train_centroids(unit, nlist, train_sample, seed)
+        lists = np.empty(len(unit), dtype=np.int64)
+        for start in range(0, len(unit), block_size):
+            block = np.asarray(unit[start : start + block_size], dtype=np.float32)
+            lists[start : start + block_size] = (block @ centroids.T).argmax(axis=1)
+        order = np.argsort(lists, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=nlist))])
+        return cls(unit[order], ids[order], centroids, offsets, meta={"nlist": nlist, "dtype": dtype, **meta})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def save(self, path: Path) -> Path:
+        """Write the index directory next to `path` and rename it into place."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "vectors.npy", self.vectors)
+        write_table(pd.DataFrame({"arxiv_id": self.ids}), tmp / "ids.parquet", csv=False)
+        if self.centroids is not None:
+            np.save(tmp / "centroids.npy", self.centroids)
+            np.save(tmp / "offsets.npy", self.offsets)
+        with (tmp / "meta.json").open("w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "rows": len(self), **self.meta}, f, indent=2)
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "VectorIndex":
+        path = Path(path)
+        with (path / "meta.json").open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        ids = read_table(path / "ids.parquet")["arxiv_id"].astype(str).to_numpy(dtype=object)
+        centroids = offsets = None
+        if (path / "centroids.npy").exists():
+            centroids = np.load(path / "centroids.npy")
+            offsets = np.load(path / "offsets.npy")
+        return cls(vectors, ids, centroids, offsets, meta)
+
+    def vectors_for(self, arxiv_ids: list[str]) -> np.ndarray:
+        """Stored (unit) vectors of indexed papers; raises KeyError for unknown ids."""
+        if self._positions is None:
+            self._positions = pd.Series(np.arange(len(self.ids)), index=self.ids)
+        positions = self._positions.reindex([str(i) for i in arxiv_ids])
+        if positions.isna().any():
+            raise KeyError(f"Not in the index: {positions[positions.isna()].index[0]}")
+        return np.asarray(self.vectors[positions.to_numpy(dtype=np.int64)], dtype=np.float32)
+
+    def _search_exact(self, queries: np.ndarray, k: int, block_size: int):
+        scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.vectors), block_size):
+            block = np.asarray(self.vectors[start : start + block_size], dtype=np.float32)
+            sims = queries @ block.T
+            kk = min(k, sims.shape[1])
+            part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+            scores, rows = _merge_topk(scores, rows, np.take_along_axis(sims, part, axis=1), part + start, k)
+        return scores, rows
+
+    def _search_ivf(self, queries: np.ndarray, k: int, nprobe: int):
+        probes = np.argpartition(-(queries @ self.centroids.T), min(nprobe, self.nlist) - 1, axis=1)[:, :nprobe]
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        # Visit each probed list once and score it against every query that probes it.
+        flat = probes.ravel()
+        order = np.argsort(flat, kind="stable")
+        lists, first = np.unique(flat[order], return_index=True)
+        for lst, q in zip(lists, np.split(order // probes.shape[1], first[1:])):
+            start, stop = int(self.offsets[lst]), int(self.offsets[lst + 1])
+            if start == stop:
+                continue
+            sims = queries[q] @ np.asarray(self.vectors[start:stop], dtype=np.float32).T
+            kk = min(k, sims.shape[1])
+            part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+            scores[q], rows[q] = _merge_topk(scores[q], rows[q], np.take_along_axis(sims, part, axis=1), part + start, k)
+        return scores, rows
+
+    def search(
+        self, queries: np.ndarray, k: int = 10, nprobe: int | None = None, block_size: int = 65536
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k most cosine-similar papers for each query row.
+        Returns (arxiv_ids, scores), both (n_queries, k) and sorted by decreasing similarity;
+        `nprobe` (IVF only, default 8) is the number of lists scored per query, and
+        `nprobe >= nlist` makes IVF search exact.
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        k = min(k, len(self))
+        if self.centroids is None:
+            scores, rows = self._search_exact(queries, k, block_size)
+        else:
+            scores, rows = self._search_ivf(queries, k, min(nprobe or 8, self.nlist))
+        order = np.argsort(-scores, axis=1, kind="stable")
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        ids = np.where(rows >= 0, self.ids[np.maximum(rows, 0)], None)
+        return ids, scores
+
+    def similar(self, arxiv_ids: list[str], k: int = 10, nprobe: int | None = None) -> pd.DataFrame:
+        """k most similar other papers for each indexed paper, as a long table."""
+        ids, scores = self.search(self.vectors_for(arxiv_ids), k=k + 1, nprobe=nprobe)
+        rows = []
+        for query, found, sims in zip(arxiv_ids, ids, scores):
+            hits = [(i, s) for i, s in zip(found, sims) if i is not None and i != str(query)][:k]
+            rows += [
+                {"arxiv_id": str(query), "rank": r, "similar_id": i, "cosine": float(s)} for r, (i, s) in enumerate(hits, 1)
+            ]
+        return pd.DataFrame(rows, columns=["arxiv_id", "rank", "similar_id", "cosine"])